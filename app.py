@@ -1,42 +1,43 @@
+import asyncio
 import gradio as gr
 import os
 from dotenv import load_dotenv
-import glob
 import math
 import json
 import pandas as pd
 import tempfile
+import threading
+import uvicorn
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.responses import FileResponse, PlainTextResponse, Response
 
 # .env 파일을 최상단에서 로드
 load_dotenv()
 
-# --- 시작 시 임시 이미지 폴더 정리 ---
-image_temp_dir = "image_temp"
-if os.path.exists(image_temp_dir):
-    files_to_delete = glob.glob(os.path.join(image_temp_dir, '*.png'))
-    for f in files_to_delete:
-        try:
-            os.remove(f)
-        except OSError as e:
-            print(f"Error removing file {f}: {e}")
-
 # --- 모듈에서 기능들을 가져옴 ---
 from modules.location_search.location import get_location_js
-from modules.location_search.search import find_nearby_places
+from modules.location_search.search import find_nearby_places_async, NEARBY_RADIUS_KM, NEARBY_MAX_RADIUS_KM
 from modules.area_search.controls import (
     AREA_CODES, CONTENT_TYPE_CODES, update_sigungu_dropdown
 )
-from modules.area_search.search import update_page_view
-from modules.area_search.details import get_details
+from modules.area_search.search import update_page_view_async
+from modules.area_search.details import get_details_stream
 from modules.area_search.export import export_to_csv
 from modules.trend_analyzer import (
     generate_trends_from_area_search,
     generate_trends_from_location_search,
-    analyze_single_item,
+    analyze_single_item_async,
     analyze_trends_for_titles
 )
-# 서울 관광 API 모듈
-from modules.seoul_search.seoul_api import get_all_seoul_data
+# 서울 관광 API 모듈 (프로세스 전역 스냅샷)
+from modules.seoul_search.snapshot import get_seoul_snapshot, make_result_handle, resolve_result_handle
+from modules.metrics import metrics
+from modules.async_client import close_async_clients
+from modules.plot_cache import plot_cache, PLOT_CACHE_DIR, PLOT_URL_PREFIX, PLOT_CACHE_CONTROL
+
+# --- 시작 시 그래프 캐시 용량 정리 (UI 구성을 기다리지 않도록 백그라운드 스레드에서) ---
+threading.Thread(target=plot_cache.enforce_limit, name="plot-cache-cleanup", daemon=True).start()
 
 
 # --- 서울시 관광 정보 검색 UI 및 기능 ---
@@ -44,23 +45,22 @@ from modules.seoul_search.seoul_api import get_all_seoul_data
 ROWS_PER_PAGE = 10
 PAGE_WINDOW_SIZE = 5
 
-# 카테고리 이름과 태그 키워드 매핑
-CATEGORY_TO_KEYWORDS = {
-    "관광지": ["관광", "명소", "유적"],
-    "문화시설": ["문화", "미술관", "박물관", "전시", "갤러리", "도서관"],
-    "행사/공연/축제": ["행사", "공연", "축제", "페스티벌"],
-    "여행코스": ["여행코스", "도보", "산책", "둘레길"],
-    "레포츠": ["레포츠", "스포츠", "공원", "체육"],
-    "숙박": ["숙박", "호텔", "모텔", "게스트하우스", "펜션"],
-    "쇼핑": ["쇼핑", "백화점", "시장", "면세점"],
-    "음식점": ["음식점", "맛집", "식당", "카페"],
-}
-
-def create_seoul_search_ui():
+# --- 큐 및 동시 실행 설정 ---
+# 비동기 핸들러는 이벤트 루프에서 실행되어 작업 스레드를 점유하지 않으므로 동시 실행 수를 넉넉히 둡니다.
+INTERACTIVE_CONCURRENCY = int(os.getenv("TOURLENS_INTERACTIVE_CONCURRENCY", "64"))
+# 가벼운 동기 핸들러(드롭다운 갱신, 서울 스냅샷 페이지 이동 등)의 기본 동시 실행 수
+DEFAULT_CONCURRENCY = int(os.getenv("TOURLENS_DEFAULT_CONCURRENCY", "16"))
+# 전체 수집/CSV 생성/목록 트렌드 저장처럼 무거운 작업은 모든 탭을 합쳐 동시에 몇 개만 실행
+BATCH_CONCURRENCY = int(os.getenv("TOURLENS_BATCH_CONCURRENCY", "2"))
+BATCH_CONCURRENCY_ID = "batch-jobs"
+QUEUE_MAX_SIZE = int(os.getenv("TOURLENS_QUEUE_MAX_SIZE", "256"))
+
+def create_seoul_search_ui(tab_name="서울시 관광지 검색 (신규)"):
     """서울시 관광정보 API용 UI 탭 (모든 기능 포함)"""
-    with gr.Blocks() as seoul_search_tab:
+    with gr.Tab(tab_name) as seoul_search_tab:
         # --- 상태 변수 ---
-        filtered_data_state = gr.State([])
+        # 세션에는 전체 레코드 대신 결과 핸들(카테고리 + ID 목록)만 저장
+        result_handle_state = gr.State(None)
         current_page_state = gr.State(1)
         total_pages_state = gr.State(1)
 
@@ -68,6 +68,7 @@ def create_seoul_search_ui():
         gr.Markdown("### 서울시 관광지 검색 (카테고리별 필터링)")
         with gr.Row():
             category_dropdown = gr.Dropdown(label="카테고리", choices=list(CONTENT_TYPE_CODES.keys()), value="전체")
+            tag_query_box = gr.Textbox(label="태그 검색어 (선택)", placeholder="예: 한옥, 야경")
             search_btn = gr.Button("검색하기", variant="primary")
         
         with gr.Row():
@@ -95,11 +96,11 @@ def create_seoul_search_ui():
         # --- 이벤트 핸들러 ---
         search_btn.click(
             fn=perform_search,
-            inputs=[category_dropdown],
-            outputs=[filtered_data_state, current_page_state, status_output, csv_file_output]
+            inputs=[category_dropdown, tag_query_box],
+            outputs=[result_handle_state, current_page_state, status_output, csv_file_output]
         ).then(
             fn=update_seoul_page_view,
-            inputs=[filtered_data_state, current_page_state],
+            inputs=[result_handle_state, current_page_state],
             outputs=[
                 places_radio, pagination_row, 
                 first_page_btn, prev_page_btn, next_page_btn, last_page_btn, 
@@ -109,14 +110,16 @@ def create_seoul_search_ui():
 
         export_csv_btn.click(
             fn=export_seoul_data_to_csv,
-            inputs=[filtered_data_state],
-            outputs=[csv_file_output]
+            inputs=[result_handle_state],
+            outputs=[csv_file_output],
+            concurrency_limit=BATCH_CONCURRENCY, concurrency_id=BATCH_CONCURRENCY_ID
         )
 
         run_list_trend_btn.click(
             fn=run_seoul_list_trend_analysis,
-            inputs=[filtered_data_state],
-            outputs=[status_output]
+            inputs=[result_handle_state],
+            outputs=[status_output],
+            concurrency_limit=BATCH_CONCURRENCY, concurrency_id=BATCH_CONCURRENCY_ID
         )
 
         page_change_triggers = [
@@ -130,7 +133,7 @@ def create_seoul_search_ui():
         for trigger in page_change_triggers:
             trigger.then(
                 fn=update_seoul_page_view,
-                inputs=[filtered_data_state, current_page_state],
+                inputs=[result_handle_state, current_page_state],
                 outputs=[
                     places_radio, pagination_row, 
                     first_page_btn, prev_page_btn, next_page_btn, last_page_btn, 
@@ -139,41 +142,41 @@ def create_seoul_search_ui():
             )
         
         places_radio.change(
-            fn=display_details_and_analysis,
-            inputs=[places_radio, filtered_data_state],
-            outputs=[raw_json_output, pretty_output, trend_plot_output, reviews_output, details_accordion]
+            fn=display_details_and_analysis_async,
+            inputs=[places_radio, result_handle_state],
+            outputs=[raw_json_output, pretty_output, trend_plot_output, reviews_output, details_accordion],
+            concurrency_limit=INTERACTIVE_CONCURRENCY
         )
 
     return seoul_search_tab
 
-def perform_search(category_name):
-    all_data = get_all_seoul_data()
-    if not all_data:
+def perform_search(category_name, tag_query=""):
+    snapshot = get_seoul_snapshot()
+    if not snapshot.items:
         gr.Warning("데이터를 가져오는 데 실패했습니다. API 상태를 확인하세요.")
-        return [], 1, "", None
+        return None, 1, "", None
 
-    if category_name == "전체":
-        filtered_list = all_data
-    else:
-        keywords = CATEGORY_TO_KEYWORDS.get(category_name, [])
-        filtered_list = [item for item in all_data if item['processed'].get('tags') and any(keyword in item['processed']['tags'] for keyword in keywords)]
+    # 스냅샷마다 한 번 만들어 둔 태그 역색인으로 조회
+    categories = [] if category_name == "전체" else [category_name]
+    result_ids = snapshot.search_ids(categories, tag_query)
     
-    if not filtered_list:
+    if not result_ids:
         gr.Info(f"'{category_name}' 카테고리에 해당하는 데이터가 없습니다.")
 
-    return filtered_list, 1, "", None
+    return make_result_handle(category_name, result_ids), 1, "", None
 
-def update_seoul_page_view(filtered_data, page_to_go):
-    if not filtered_data:
+def update_seoul_page_view(result_handle, page_to_go):
+    if not result_handle or not result_handle.get('ids'):
         return gr.update(choices=[], value=None), gr.update(visible=False), False, False, False, False, gr.update(choices=[], value=None), 1
 
     page_to_go = int(page_to_go)
-    total_count = len(filtered_data)
+    total_count = len(result_handle['ids'])
     total_pages = math.ceil(total_count / ROWS_PER_PAGE)
 
+    # 현재 페이지에 해당하는 ID만 스냅샷에서 꺼냄
     start_idx = (page_to_go - 1) * ROWS_PER_PAGE
     end_idx = start_idx + ROWS_PER_PAGE
-    page_items = filtered_data[start_idx:end_idx]
+    page_items = resolve_result_handle(result_handle, start_idx, end_idx)
 
     place_titles = [item['processed']['title'] for item in page_items if item.get('processed', {}).get('title')]
 
@@ -195,16 +198,8 @@ def update_seoul_page_view(filtered_data, page_to_go):
         total_pages
     )
 
-def display_details_and_analysis(selected_title, filtered_data, progress=gr.Progress(track_tqdm=True)):
-    if not selected_title:
-        return "", "", None, "", gr.update(open=False)
-
-    progress(0, desc="상세 정보 로딩 중...")
-    selected_item = next((item for item in filtered_data if item.get('processed', {}).get('title') == selected_title), None)
-
-    if not selected_item:
-        return "{}", "정보를 찾을 수 없습니다.", None, "", gr.update(open=True)
-
+def _seoul_detail_texts(selected_item):
+    """서울시 관광지 항목을 (Raw JSON 문자열, 포맷된 마크다운)으로 변환합니다."""
     raw_data = selected_item.get('raw', {})
     raw_json_str = json.dumps(raw_data, indent=2, ensure_ascii=False)
     
@@ -224,16 +219,32 @@ def display_details_and_analysis(selected_title, filtered_data, progress=gr.Prog
                 pretty_str_lines.append(f"**{friendly_name}**: [{cleaned_value}]({cleaned_value})")
             else:
                 pretty_str_lines.append(f"**{friendly_name}**: {cleaned_value}")
-    pretty_str = "\n\n".join(pretty_str_lines)
+    return raw_json_str, "\n\n".join(pretty_str_lines)
 
-    progress(0.5, desc="트렌드 및 후기 분석 중...")
-    trend_image, reviews_markdown = analyze_single_item(selected_title)
-    
-    progress(1, desc="완료")
-    return raw_json_str, pretty_str, trend_image, reviews_markdown, gr.update(open=True)
+async def display_details_and_analysis_async(selected_title, result_handle):
+    """상세 정보는 스냅샷에서 바로 보여주고, 트렌드와 후기는 분석이 끝나면 이어서 보냅니다."""
+    if not selected_title:
+        yield "", "", None, "", gr.update(open=False)
+        return
+
+    candidate_ids = result_handle.get('ids') if result_handle else None
+    # 스냅샷이 아직 없으면 디스크/API에서 불러오므로 작업 스레드에서 조회
+    snapshot = await asyncio.to_thread(get_seoul_snapshot)
+    selected_item = snapshot.get_by_title(selected_title, candidate_ids)
+
+    if not selected_item:
+        yield "{}", "정보를 찾을 수 없습니다.", None, "", gr.update(open=True)
+        return
 
-def export_seoul_data_to_csv(filtered_data, progress=gr.Progress(track_tqdm=True)):
+    raw_json_str, pretty_str = _seoul_detail_texts(selected_item)
+    yield raw_json_str, pretty_str, None, "트렌드 및 후기를 분석하는 중입니다...", gr.update(open=True)
+
+    trend_image, reviews_markdown = await analyze_single_item_async(selected_title)
+    yield raw_json_str, pretty_str, trend_image, reviews_markdown, gr.update(open=True)
+
+def export_seoul_data_to_csv(result_handle, progress=gr.Progress(track_tqdm=True)):
     """현재 필터링된 서울시 데이터를 CSV 파일로 내보냅니다."""
+    filtered_data = resolve_result_handle(result_handle)
     if not filtered_data:
         gr.Warning("내보낼 데이터가 없습니다.")
         return None
@@ -249,8 +260,9 @@ def export_seoul_data_to_csv(filtered_data, progress=gr.Progress(track_tqdm=True
         progress(1, desc="완료")
         return temp_f.name
 
-def run_seoul_list_trend_analysis(filtered_data, progress=gr.Progress(track_tqdm=True)):
+def run_seoul_list_trend_analysis(result_handle, progress=gr.Progress(track_tqdm=True)):
     """현재 필터링된 목록 전체에 대한 트렌드/후기 분석을 실행하고 파일로 저장합니다."""
+    filtered_data = resolve_result_handle(result_handle)
     if not filtered_data:
         return "분석할 데이터가 없습니다."
 
@@ -264,20 +276,31 @@ def run_seoul_list_trend_analysis(filtered_data, progress=gr.Progress(track_tqdm
 
 # --- 각 탭의 UI를 생성하는 함수들 ---
 
-def create_location_search_tab():
+def create_location_search_tab(tab_name="내 위치로 검색"):
     """'내 위치로 검색' 탭의 UI를 생성합니다."""
-    with gr.Blocks() as tab:
+    with gr.Tab(tab_name) as tab:
         gr.Markdown("### 내 위치 기반 관광지 검색")
         places_info_state_nearby = gr.State({})
+        nearby_query = gr.State(None)  # 페이지 이동 시 다시 쓸 [위도, 경도, 반경, 카테고리]
+        nearby_page = gr.State(1)
+        nearby_total_pages = gr.State(1)
         with gr.Row():
             get_loc_button = gr.Button("내 위치 가져오기")
             lat_box, lon_box = gr.Textbox(label="위도", interactive=False), gr.Textbox(label="경도", interactive=False)
+
+        with gr.Row():
+            radius_slider = gr.Slider(label="검색 반경 (km)", minimum=1, maximum=NEARBY_MAX_RADIUS_KM, step=1, value=NEARBY_RADIUS_KM)
+            category_dropdown_nearby = gr.Dropdown(label="카테고리", choices=list(CONTENT_TYPE_CODES.keys()), value="전체")
         
         with gr.Row():
             search_button_nearby = gr.Button("이 좌표로 주변 관광지 검색", variant="primary")
             run_trend_btn_nearby = gr.Button("현재 목록 트렌드 저장하기")
 
         radio_list_nearby = gr.Radio(label="관광지 목록", interactive=True)
+        page_info_nearby = gr.Markdown()
+        with gr.Row(visible=False) as pagination_row_nearby:
+            prev_page_btn_nearby = gr.Button("< 이전")
+            next_page_btn_nearby = gr.Button("다음 >")
         status_output_nearby = gr.Textbox(label="작업 상태", interactive=False)
         
         with gr.Accordion("상세 정보 보기", open=False):
@@ -286,14 +309,25 @@ def create_location_search_tab():
             info_raw_n, info_pretty_n = gr.Textbox(label="Raw JSON"), gr.Markdown()
         
         get_loc_button.click(fn=None, js=get_location_js, outputs=[lat_box, lon_box])
-        search_button_nearby.click(fn=find_nearby_places, inputs=[lat_box, lon_box], outputs=[radio_list_nearby, places_info_state_nearby])
-        run_trend_btn_nearby.click(fn=generate_trends_from_location_search, inputs=places_info_state_nearby, outputs=status_output_nearby)
-        radio_list_nearby.change(fn=get_details, inputs=[radio_list_nearby, places_info_state_nearby], outputs=[common_raw_n, common_pretty_n, intro_raw_n, intro_pretty_n, info_raw_n, info_pretty_n])
+        outputs_for_nearby = [nearby_query, nearby_page, nearby_total_pages, places_info_state_nearby, radio_list_nearby, page_info_nearby, prev_page_btn_nearby, next_page_btn_nearby, pagination_row_nearby]
+        search_button_nearby.click(fn=find_nearby_places_async, inputs=[lat_box, lon_box, radius_slider, category_dropdown_nearby], outputs=outputs_for_nearby, concurrency_limit=INTERACTIVE_CONCURRENCY)
+
+        # 페이지 이동은 검색할 때의 조건을 그대로 써서 공간 인덱스에서 바로 조회
+        async def go_prev_page_nearby(query, page):
+            return await find_nearby_places_async(*(query or [None, None, None, None]), page - 1)
+
+        async def go_next_page_nearby(query, page):
+            return await find_nearby_places_async(*(query or [None, None, None, None]), page + 1)
+
+        prev_page_btn_nearby.click(go_prev_page_nearby, inputs=[nearby_query, nearby_page], outputs=outputs_for_nearby, concurrency_limit=INTERACTIVE_CONCURRENCY)
+        next_page_btn_nearby.click(go_next_page_nearby, inputs=[nearby_query, nearby_page], outputs=outputs_for_nearby, concurrency_limit=INTERACTIVE_CONCURRENCY)
+        run_trend_btn_nearby.click(fn=generate_trends_from_location_search, inputs=places_info_state_nearby, outputs=status_output_nearby, concurrency_limit=BATCH_CONCURRENCY, concurrency_id=BATCH_CONCURRENCY_ID)
+        radio_list_nearby.change(fn=get_details_stream, inputs=[radio_list_nearby, places_info_state_nearby], outputs=[common_raw_n, common_pretty_n, intro_raw_n, intro_pretty_n, info_raw_n, info_pretty_n], concurrency_limit=INTERACTIVE_CONCURRENCY)
     return tab
 
-def create_area_search_tab():
+def create_area_search_tab(tab_name="지역/카테고리별 검색 (기존 TourAPI)"):
     """'지역/카테고리별 검색' 탭의 UI를 생성합니다."""
-    with gr.Blocks() as tab:
+    with gr.Tab(tab_name) as tab:
         gr.Markdown("### 지역/카테고리 기반 관광지 검색 (TourAPI)")
         current_area = gr.State(None)
         current_sigungu = gr.State(None)
@@ -332,27 +366,70 @@ def create_area_search_tab():
         outputs_for_page_change = [current_area, current_sigungu, current_category, current_page, total_pages, places_info_state_area, radio_list_area, page_numbers_radio, first_page_btn, prev_page_btn, next_page_btn, last_page_btn, pagination_row]
         
         area_dropdown.change(fn=update_sigungu_dropdown, inputs=area_dropdown, outputs=sigungu_dropdown)
-        search_by_area_btn.click(fn=update_page_view, inputs=[area_dropdown, sigungu_dropdown, category_dropdown, gr.Number(value=1, visible=False)], outputs=outputs_for_page_change)
+        search_by_area_btn.click(fn=update_page_view_async, inputs=[area_dropdown, sigungu_dropdown, category_dropdown, gr.Number(value=1, visible=False)], outputs=outputs_for_page_change, concurrency_limit=INTERACTIVE_CONCURRENCY)
         
-        export_csv_btn.click(fn=export_to_csv, inputs=[area_dropdown, sigungu_dropdown, category_dropdown], outputs=csv_file_output)
-        run_trend_btn_area.click(fn=generate_trends_from_area_search, inputs=[area_dropdown, sigungu_dropdown, category_dropdown], outputs=status_output_area)
+        export_csv_btn.click(fn=export_to_csv, inputs=[area_dropdown, sigungu_dropdown, category_dropdown], outputs=csv_file_output, concurrency_limit=BATCH_CONCURRENCY, concurrency_id=BATCH_CONCURRENCY_ID)
+        run_trend_btn_area.click(fn=generate_trends_from_area_search, inputs=[area_dropdown, sigungu_dropdown, category_dropdown], outputs=status_output_area, concurrency_limit=BATCH_CONCURRENCY, concurrency_id=BATCH_CONCURRENCY_ID)
+
+        # 페이지 이동 버튼 (비동기 핸들러이므로 lambda 대신 async 함수로 정의)
+        async def go_first_page(area, sigungu, cat):
+            return await update_page_view_async(area, sigungu, cat, 1)
+
+        async def go_prev_page(area, sigungu, cat, page):
+            return await update_page_view_async(area, sigungu, cat, page - 1)
+
+        async def go_next_page(area, sigungu, cat, page):
+            return await update_page_view_async(area, sigungu, cat, page + 1)
+
+        async def go_last_page(area, sigungu, cat, pages):
+            return await update_page_view_async(area, sigungu, cat, pages)
 
         page_inputs = [current_area, current_sigungu, current_category]
-        first_page_btn.click(lambda area, sigungu, cat: update_page_view(area, sigungu, cat, 1), inputs=page_inputs, outputs=outputs_for_page_change)
-        prev_page_btn.click(lambda area, sigungu, cat, page: update_page_view(area, sigungu, cat, page - 1), inputs=page_inputs + [current_page], outputs=outputs_for_page_change)
-        next_page_btn.click(lambda area, sigungu, cat, page: update_page_view(area, sigungu, cat, page + 1), inputs=page_inputs + [current_page], outputs=outputs_for_page_change)
-        last_page_btn.click(lambda area, sigungu, cat, pages: update_page_view(area, sigungu, cat, pages), inputs=page_inputs + [total_pages], outputs=outputs_for_page_change)
-        page_numbers_radio.select(update_page_view, inputs=page_inputs + [page_numbers_radio], outputs=outputs_for_page_change)
+        first_page_btn.click(go_first_page, inputs=page_inputs, outputs=outputs_for_page_change, concurrency_limit=INTERACTIVE_CONCURRENCY)
+        prev_page_btn.click(go_prev_page, inputs=page_inputs + [current_page], outputs=outputs_for_page_change, concurrency_limit=INTERACTIVE_CONCURRENCY)
+        next_page_btn.click(go_next_page, inputs=page_inputs + [current_page], outputs=outputs_for_page_change, concurrency_limit=INTERACTIVE_CONCURRENCY)
+        last_page_btn.click(go_last_page, inputs=page_inputs + [total_pages], outputs=outputs_for_page_change, concurrency_limit=INTERACTIVE_CONCURRENCY)
+        page_numbers_radio.select(update_page_view_async, inputs=page_inputs + [page_numbers_radio], outputs=outputs_for_page_change, concurrency_limit=INTERACTIVE_CONCURRENCY)
 
-        radio_list_area.change(fn=get_details, inputs=[radio_list_area, places_info_state_area], outputs=[common_raw_a, common_pretty_a, intro_raw_a, intro_pretty_a, info_raw_a, info_pretty_a])
+        radio_list_area.change(fn=get_details_stream, inputs=[radio_list_area, places_info_state_area], outputs=[common_raw_a, common_pretty_a, intro_raw_a, intro_pretty_a, info_raw_a, info_pretty_a], concurrency_limit=INTERACTIVE_CONCURRENCY)
     return tab
 
-# --- Gradio TabbedInterface를 사용하여 전체 UI 구성 ---
-demo = gr.TabbedInterface(
-    [create_location_search_tab(), create_area_search_tab(), create_seoul_search_ui()],
-    tab_names=["내 위치로 검색", "지역/카테고리별 검색 (기존 TourAPI)", "서울시 관광지 검색 (신규)"],
-    title="TourLens 관광 정보 앱"
-)
+# --- 하나의 Blocks 안에 탭을 직접 구성 ---
+# (탭마다 gr.Blocks를 만들어 TabbedInterface로 합치면 Blocks마다 내부 FastAPI 앱이 생성되어 시작이 느려짐)
+APP_TITLE = "TourLens 관광 정보 앱"
+with gr.Blocks(title=APP_TITLE) as demo:
+    gr.Markdown(f"<h1 style='text-align: center; margin-bottom: 1rem'>{APP_TITLE}</h1>")
+    with gr.Tabs():
+        create_location_search_tab()
+        create_area_search_tab()
+        create_seoul_search_ui()
+# 이벤트별 concurrency_limit을 지정하지 않은 핸들러의 기본값과 대기열 크기
+demo.queue(default_concurrency_limit=DEFAULT_CONCURRENCY, max_size=QUEUE_MAX_SIZE)
+
+# --- 지표 및 그래프 파일 엔드포인트 ---
+# Gradio 앱을 FastAPI 앱에 마운트하고, 같은 서버의 /metrics에서 Prometheus 형식 지표를,
+# /plots/<해시>.png에서 그래프 캐시 파일을 제공합니다.
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def plot_endpoint(name: str):
+    path = plot_cache.path_for(name)
+    if path is None:
+        return Response(status_code=404)
+    # 파일 이름이 내용의 해시이므로 브라우저가 다시 요청하지 않도록 오래 캐시
+    return FileResponse(path, media_type="image/png", headers={"Cache-Control": PLOT_CACHE_CONTROL})
+
+@asynccontextmanager
+async def server_lifespan(app):
+    yield
+    # 서버 종료 시 이벤트 루프의 httpx 연결 풀을 닫음
+    await close_async_clients()
+
+server_app = FastAPI(lifespan=server_lifespan)
+server_app.add_api_route("/metrics", metrics_endpoint, methods=["GET"])
+server_app.add_api_route(f"{PLOT_URL_PREFIX}/{{name}}", plot_endpoint, methods=["GET", "HEAD"])
+# gr.Image 출력으로 캐시 파일 경로를 넘길 수 있도록 그래프 캐시 폴더를 허용
+server_app = gr.mount_gradio_app(server_app, demo, path="", allowed_paths=[PLOT_CACHE_DIR])
 
 # --- 애플리케이션 실행 ---
 if __name__ == "__main__":
@@ -367,4 +444,11 @@ if __name__ == "__main__":
         print("네이버 트렌드 API 인증 정보가 .env 파일에 설정되지 않았습니다.")
         exit()
 
-    demo.launch(debug=True)
\ No newline at end of file
+    # 서울시 관광지 스냅샷을 미리 불러와 첫 검색이 기다리지 않도록 함
+    threading.Thread(target=get_seoul_snapshot, name="seoul-snapshot-warmup", daemon=True).start()
+
+    uvicorn.run(
+        server_app,
+        host=os.getenv("GRADIO_SERVER_NAME", "127.0.0.1"),
+        port=int(os.getenv("GRADIO_SERVER_PORT", "7860")),
+    )
\ No newline at end of file
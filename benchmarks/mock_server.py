@@ -0,0 +1,364 @@
+"""TourAPI, 네이버 검색/데이터랩, 서울 열린데이터 API를 흉내 내는 로컬 대역 서버.
+
+합성 응답을 결정적으로 생성하며, 응답 지연과 오류(429/500) 주입을 설정할 수 있습니다.
+
+    python -m benchmarks.mock_server --port 8765 --latency-ms 50 --error-rate 0.01
+
+GET /__stats 는 엔드포인트별 요청 수를, POST /__reset 은 카운터 초기화를 수행합니다.
+"""
+import argparse
+import datetime
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+TOUR_API_PREFIX = "/B551011/KorService2/"
+SEOUL_SERVICE = "TbVwAttractions"
+
+
+class MockConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, area_items=300, seoul_rows=3000, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.area_items = area_items
+        self.seoul_rows = seoul_rows
+        self.seed = seed
+
+
+# --- 합성 데이터 ---
+def _tour_response(items, total_count=None):
+    return {
+        "response": {
+            "header": {"resultCode": "0000", "resultMsg": "OK"},
+            "body": {
+                "items": {"item": items} if items else "",
+                "numOfRows": len(items),
+                "pageNo": 1,
+                "totalCount": len(items) if total_count is None else total_count,
+            },
+        }
+    }
+
+
+def _content_id(index):
+    return str(100000 + index)
+
+
+def _index_from_content_id(content_id):
+    try:
+        return int(content_id) - 100000
+    except (TypeError, ValueError):
+        return 0
+
+
+def _list_item(index):
+    return {
+        "contentid": _content_id(index),
+        "contenttypeid": "15",
+        "title": f"테스트 축제 {index}",
+        "addr1": f"서울특별시 중구 테스트로 {index}",
+        "areacode": "1",
+        "sigungucode": str(index % 25 + 1),
+        "mapx": f"{126.9 + (index % 100) * 0.001:.6f}",
+        "mapy": f"{37.5 + (index // 100) * 0.001:.6f}",
+        "firstimage": f"http://example.invalid/images/{index}.jpg",
+        "createdtime": "20240101000000",
+        "modifiedtime": "20240101000000",
+    }
+
+
+def _nearby_items(query, total):
+    """locationBasedList2: 반경 안 아이템을 거리순(arrange=E)으로 페이지 단위로 반환합니다."""
+    lon, lat = float(query.get("mapX", 126.9)), float(query.get("mapY", 37.5))
+    radius = float(query.get("radius", 5000))
+    if query.get("contentTypeId") not in (None, "15"):
+        return [], 0
+    cos_lat = math.cos(math.radians(lat))
+    nearby = []
+    for index in range(total):
+        item = _list_item(index)
+        dx = (float(item["mapx"]) - lon) * 111320 * cos_lat
+        dy = (float(item["mapy"]) - lat) * 111320
+        distance = math.hypot(dx, dy)
+        if distance <= radius:
+            nearby.append((distance, index, item))
+    nearby.sort()
+    rows = int(query.get("numOfRows", 20))
+    start = (int(query.get("pageNo", 1)) - 1) * rows
+    return [item for _, _, item in nearby[start:start + rows]], len(nearby)
+
+
+def _event_dates(index):
+    # 일부는 과거, 일부는 진행 중, 일부는 미래 행사가 되도록 분산
+    start = datetime.date.today() - datetime.timedelta(days=index % 200 - 20)
+    end = start + datetime.timedelta(days=index % 7 + 1)
+    return start.strftime("%Y%m%d"), end.strftime("%Y%m%d")
+
+
+def _detail_common(index):
+    return {
+        **_list_item(index),
+        "homepage": f'<a href="http://festival{index}.example.invalid" target="_blank">홈페이지</a>',
+        "overview": f"<p>테스트 축제 {index}의 소개입니다.<br>다양한 <b>프로그램</b>이 준비되어 있습니다.</p>",
+        "tel": f"02-000-{index % 10000:04d}",
+    }
+
+
+def _detail_intro(index):
+    start, end = _event_dates(index)
+    return {
+        "contentid": _content_id(index),
+        "contenttypeid": "15",
+        "eventstartdate": start,
+        "eventenddate": end,
+        "eventplace": f"테스트 광장 {index % 10}",
+        "playtime": "10:00~18:00",
+        "usetimefestival": "무료",
+    }
+
+
+def _detail_info(index):
+    return [
+        {"contentid": _content_id(index), "serialnum": "0", "infoname": "행사소개", "infotext": f"<p>소개 {index}</p>"},
+        {"contentid": _content_id(index), "serialnum": "1", "infoname": "행사내용", "infotext": f"<p>내용 {index}</p>"},
+    ]
+
+
+def _blog_items(query, display):
+    return {
+        "items": [
+            {
+                "title": f"<b>{query}</b> 후기 {i}",
+                "description": f"{query}에 다녀온 <b>후기</b>입니다. {i}",
+                "link": f"http://blog.example.invalid/{abs(hash(query)) % 100000}/{i}",
+                "postdate": "20240101",
+            }
+            for i in range(display)
+        ]
+    }
+
+
+def _datalab_results(body):
+    start = datetime.date.fromisoformat(body["startDate"])
+    end = datetime.date.fromisoformat(body["endDate"])
+    days = (end - start).days + 1
+    results = []
+    for group_no, group in enumerate(body.get("keywordGroups", [])):
+        name = group["groupName"]
+        seed = sum(map(ord, name)) + group_no
+        data = [
+            {
+                "period": (start + datetime.timedelta(days=day)).isoformat(),
+                "ratio": round(10 + (seed * 7 + day * 13) % 90 + (day % 7) * 1.5, 5),
+            }
+            for day in range(days)
+        ]
+        results.append({"title": name, "keywords": group.get("keywords", [name]), "data": data})
+    return {"startDate": body["startDate"], "endDate": body["endDate"], "timeUnit": body.get("timeUnit", "date"), "results": results}
+
+
+def _seoul_row(index):
+    tags = ["한옥", "야경", "공원", "박물관", "쇼핑", "맛집", "전통", "산책"]
+    return {
+        "POST_SN": f"KOP{index:06d}",
+        "LANG_CODE_ID": "ko",
+        "POST_SJ": f"서울 테스트 명소 {index}",
+        "POST_URL": f"http://seoul.example.invalid/{index}",
+        "ADDRESS": f"서울특별시 종로구 테스트동 {index}",
+        "NEW_ADDRESS": f"서울특별시 종로구 테스트로 {index}",
+        "CMMN_TELNO": f"02-111-{index % 10000:04d}",
+        "CMMN_HMPG_URL": f"http://seoul.example.invalid/{index}",
+        "CMMN_USE_TIME": "09:00~18:00",
+        "CMMN_BSNDE": "매일",
+        "CMMN_RSTDE": "연중무휴",
+        "SUBWAY_INFO": "1호선 종각역",
+        "TAG": ",".join(tags[(index + k) % len(tags)] for k in range(3)),
+        "BF_DESC": "",
+    }
+
+
+# --- 요청 처리 ---
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "TourLensMock/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _endpoint(self, path):
+        if path.startswith(TOUR_API_PREFIX):
+            return path[len(TOUR_API_PREFIX):].strip("/")
+        if path.startswith("/v1/search/blog"):
+            return "blog"
+        if path.startswith("/v1/datalab/search"):
+            return "datalab"
+        if f"/{SEOUL_SERVICE}/" in path:
+            return SEOUL_SERVICE
+        return None
+
+    def _simulate(self, endpoint):
+        """설정된 지연을 적용하고, 오류를 주입해야 하면 True를 반환합니다."""
+        config = self.server.config
+        self.server.count(endpoint)
+        delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if config.error_rate and random.random() < config.error_rate:
+            self.server.count(f"{endpoint}:error")
+            if random.random() < 0.5:
+                self._send_json(429, {"errorMessage": "rate limited"}, {"Retry-After": "0"})
+            else:
+                self._send_json(500, {"errorMessage": "injected error"})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/__stats":
+            self._send_json(200, self.server.snapshot())
+            return
+        endpoint = self._endpoint(url.path)
+        if endpoint is None:
+            self._send_json(404, {"error": "unknown endpoint"})
+            return
+        if self._simulate(endpoint):
+            return
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if endpoint == "blog":
+            self._send_json(200, _blog_items(query.get("query", ""), int(query.get("display", 5))))
+        elif endpoint == SEOUL_SERVICE:
+            self._send_json(200, self._seoul(url.path))
+        else:
+            self._send_json(200, self._tour_api(endpoint, query))
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        raw_body = self.rfile.read(length) if length else b""
+        if url.path == "/__reset":
+            self.server.reset()
+            self._send_json(200, {"reset": True})
+            return
+        endpoint = self._endpoint(url.path)
+        if endpoint != "datalab":
+            self._send_json(404, {"error": "unknown endpoint"})
+            return
+        if self._simulate(endpoint):
+            return
+        self._send_json(200, _datalab_results(json.loads(raw_body or b"{}")))
+
+    def _tour_api(self, endpoint, query):
+        total = self.server.config.area_items
+        if endpoint == "areaBasedList2":
+            rows = int(query.get("numOfRows", 10))
+            page = int(query.get("pageNo", 1))
+            start = (page - 1) * rows
+            return _tour_response([_list_item(i) for i in range(start, min(start + rows, total))], total)
+        if endpoint == "locationBasedList2":
+            return _tour_response(*_nearby_items(query, total))
+        if endpoint == "areaCode2":
+            return _tour_response([{"rnum": i, "code": str(i), "name": f"테스트구{i}"} for i in range(1, 26)])
+        index = _index_from_content_id(query.get("contentId"))
+        if endpoint == "detailCommon2":
+            return _tour_response([_detail_common(index)])
+        if endpoint == "detailIntro2":
+            return _tour_response([_detail_intro(index)])
+        if endpoint == "detailInfo2":
+            return _tour_response(_detail_info(index))
+        return _tour_response([])
+
+    def _seoul(self, path):
+        total = self.server.config.seoul_rows
+        parts = [part for part in path.split("/") if part]
+        try:
+            start, end = int(parts[-2]), int(parts[-1])
+        except (IndexError, ValueError):
+            start, end = 1, 1
+        rows = [_seoul_row(i) for i in range(start, min(end, total) + 1)]
+        return {SEOUL_SERVICE: {"list_total_count": total, "RESULT": {"CODE": "INFO-000", "MESSAGE": "정상 처리되었습니다"}, "row": rows}}
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, MockHandler)
+        self.config = config
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        random.seed(config.seed)
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 keep-alive 연결을 끊는 경우는 정상 동작이므로 무시
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+    def count(self, key):
+        with self._lock:
+            self._counts[key] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_mock_server(config=None, host="127.0.0.1", port=0):
+    """대역 서버를 백그라운드 스레드에서 시작하고 서버 객체를 반환합니다."""
+    server = MockServer((host, port), config or MockConfig())
+    threading.Thread(target=server.serve_forever, name="mock-api-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--area-items", type=int, default=300)
+    parser.add_argument("--seoul-rows", type=int, default=3000)
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.area_items, args.seoul_rows)
+    server = MockServer((args.host, args.port), config)
+    print(f"대역 서버 실행 중: {server.base_url}")
+    print(f"  TOUR_API_BASE_URL={server.base_url}{TOUR_API_PREFIX}")
+    print(f"  NAVER_API_BASE_URL={server.base_url}")
+    print(f"  SEOUL_API_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
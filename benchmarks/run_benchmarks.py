@@ -0,0 +1,252 @@
+"""로컬 대역 서버(benchmarks/mock_server.py)를 상대로 주요 작업의 성능을 측정합니다.
+
+각 벤치마크는 빈 캐시 디렉터리를 가진 별도 프로세스에서 실행되며, 실행 시간(wall time),
+대역 서버가 받은 요청 수, 최대 메모리 사용량(peak RSS)을 보고합니다.
+
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --only export_to_csv get_details --latency-ms 30 --error-rate 0.02
+    python -m benchmarks.run_benchmarks --unthrottled --json results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.mock_server import MockConfig, TOUR_API_PREFIX, start_mock_server
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCH_AREA = "서울"
+BENCH_SIGUNGU = "전체"
+BENCH_CATEGORY = "행사/공연/축제"
+
+
+class NullProgress:
+    """gr.Progress 대신 사용하는 진행률 객체 (아무것도 표시하지 않음)."""
+
+    def __call__(self, *args, **kwargs):
+        pass
+
+    def tqdm(self, iterable, *args, **kwargs):
+        return iterable
+
+
+# --- 벤치마크 본문 (자식 프로세스에서 실행) ---
+def bench_export_to_csv():
+    from modules.area_search.export import export_to_csv
+    path = export_to_csv(BENCH_AREA, BENCH_SIGUNGU, BENCH_CATEGORY, progress=NullProgress())
+    return {"csv_bytes": os.path.getsize(path) if path else 0}
+
+
+def bench_generate_trends_from_area_search():
+    from modules.trend_analyzer import generate_trends_from_area_search
+    return {"status": generate_trends_from_area_search(BENCH_AREA, BENCH_SIGUNGU, BENCH_CATEGORY, progress=NullProgress())}
+
+
+def bench_get_all_seoul_data():
+    from modules.seoul_search.seoul_api import get_all_seoul_data
+    return {"rows": len(get_all_seoul_data())}
+
+
+def bench_get_details():
+    # UI와 같은 경로: 지역 검색 페이지 핸들러로 목록을 받고, 항목마다 상세 정보 스트리밍 핸들러를 끝까지 소비
+    from modules.area_search.search import update_page_view_async
+    from modules.area_search.details import get_details_stream
+
+    async def run():
+        places_info = (await update_page_view_async(BENCH_AREA, BENCH_SIGUNGU, BENCH_CATEGORY, 1))[5]
+        updates = 0
+        for title in places_info:
+            async for _ in get_details_stream(title, places_info):
+                updates += 1
+        return {"items": len(places_info), "updates": updates}
+
+    return asyncio.run(run())
+
+
+def bench_analyze_trends_for_titles():
+    from modules.trend_analyzer import analyze_trends_for_titles
+    titles = [f"서울 테스트 명소 {i}" for i in range(1, 51)]
+    return {"status": analyze_trends_for_titles(titles, progress=NullProgress())}
+
+
+def bench_find_nearby_places():
+    from modules.location_search.search import find_nearby_places_async
+    from modules.location_search.spatial_index import spatial_index
+
+    async def run():
+        started = time.perf_counter()
+        outputs = await find_nearby_places_async(37.52, 126.95, 5, "전체", 1)
+        first_search = time.perf_counter() - started
+
+        # 같은 지역의 페이지 이동/반경 축소는 공간 인덱스만으로 처리
+        queries = 0
+        started = time.perf_counter()
+        for page in range(1, outputs[2] + 1):
+            await find_nearby_places_async(37.52, 126.95, 5, "전체", page)
+            queries += 1
+        for radius_km in (1, 2, 3, 4):
+            await find_nearby_places_async(37.52, 126.95, radius_km, "전체", 1)
+            queries += 1
+        return first_search, (time.perf_counter() - started) / queries
+
+    first_search, local_search = asyncio.run(run())
+    started = time.perf_counter()
+    for _ in range(1000):
+        spatial_index.nearest(37.52, 126.95, 10)
+    nearest = (time.perf_counter() - started) / 1000
+    return {
+        "first_search_ms": round(first_search * 1000, 2),
+        "local_search_ms": round(local_search * 1000, 3),
+        "nearest_10_us": round(nearest * 1e6, 1),
+        "indexed_points": len(spatial_index),
+    }
+
+
+BENCHMARKS = {
+    "export_to_csv": bench_export_to_csv,
+    "generate_trends_from_area_search": bench_generate_trends_from_area_search,
+    "get_all_seoul_data": bench_get_all_seoul_data,
+    "get_details": bench_get_details,
+    "analyze_trends_for_titles": bench_analyze_trends_for_titles,
+    "find_nearby_places": bench_find_nearby_places,
+}
+
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_child(name):
+    started = time.perf_counter()
+    error = None
+    detail = {}
+    try:
+        detail = BENCHMARKS[name]() or {}
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    result = {
+        "seconds": round(time.perf_counter() - started, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "detail": detail,
+        "error": error,
+    }
+    try:
+        from modules.metrics import metrics
+        result["metrics"] = metrics.summary()
+    except Exception:
+        pass
+    print("BENCH_RESULT " + json.dumps(result, ensure_ascii=False, default=str))
+
+
+# --- 실행기 (부모 프로세스) ---
+def _mock_request(base_url, path, method="GET"):
+    request = urllib.request.Request(f"{base_url}{path}", method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def child_env(base_url, work_dir, unthrottled):
+    env = dict(os.environ)
+    env.update({
+        "TOUR_API_BASE_URL": f"{base_url}{TOUR_API_PREFIX}",
+        "NAVER_API_BASE_URL": base_url,
+        "SEOUL_API_BASE_URL": base_url,
+        "TOUR_API_KTY": env.get("TOUR_API_KTY", "bench-key"),
+        "NAVER_CLIENT_ID": "bench", "NAVER_CLIENT_SECRET": "bench",
+        "NAVER_TREND_CLIENT_ID": "bench", "NAVER_TREND_CLIENT_SECRET": "bench",
+        "SEOUL_TOUR_API_KEY": "bench-key",
+        "TOURLENS_CACHE_DIR": os.path.join(work_dir, "cache"),
+        "TOURLENS_TREND_OUTPUT_DIR": os.path.join(work_dir, "naver_trend"),
+        "TOURLENS_TOUR_API_DATA_DIR": os.path.join(work_dir, "TourAPI_data"),
+        "MPLBACKEND": "Agg",
+        "PYTHONPATH": os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")])),
+    })
+    if unthrottled:
+        # 호출 정책의 초당 요청 수 제한을 사실상 없애 코드 자체의 처리 속도를 측정
+        for name in ("TOURAPI", "NAVER_SEARCH", "NAVER_DATALAB", "SEOUL"):
+            env[f"TOURLENS_RATE_{name}"] = "100000"
+    return env
+
+
+def run_benchmark(name, base_url, unthrottled=False, timeout=1800):
+    _mock_request(base_url, "/__reset", method="POST")
+    with tempfile.TemporaryDirectory(prefix=f"tourlens_bench_{name}_") as work_dir:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run_benchmarks", "--child", name],
+            cwd=PROJECT_ROOT, env=child_env(base_url, work_dir, unthrottled),
+            capture_output=True, text=True, timeout=timeout,
+        )
+    result = None
+    for line in completed.stdout.splitlines():
+        if line.startswith("BENCH_RESULT "):
+            result = json.loads(line[len("BENCH_RESULT "):])
+    if result is None:
+        tail = (completed.stderr or completed.stdout).strip().splitlines()[-5:]
+        result = {"seconds": None, "peak_rss_mb": None, "detail": {}, "error": " / ".join(tail) or f"exit code {completed.returncode}"}
+
+    counts = _mock_request(base_url, "/__stats")
+    result["requests"] = sum(count for key, count in counts.items() if not key.endswith(":error"))
+    result["injected_errors"] = sum(count for key, count in counts.items() if key.endswith(":error"))
+    result["requests_by_endpoint"] = {key: count for key, count in sorted(counts.items()) if not key.endswith(":error")}
+    return result
+
+
+def _print_table(results):
+    print()
+    print(f"{'benchmark':<36}{'wall(s)':>10}{'requests':>10}{'errors':>8}{'peak RSS(MB)':>14}")
+    print("-" * 78)
+    for name, result in results.items():
+        seconds = "-" if result["seconds"] is None else f"{result['seconds']:.2f}"
+        rss = "-" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.1f}"
+        print(f"{name:<36}{seconds:>10}{result['requests']:>10}{result['injected_errors']:>8}{rss:>14}")
+        if result.get("error"):
+            print(f"    오류: {result['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="실행할 벤치마크 (기본: 전체)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="대역 서버 응답 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="응답 지연 편차 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429/500 오류 주입 비율 (0~1)")
+    parser.add_argument("--area-items", type=int, default=300, help="지역 검색 결과 수")
+    parser.add_argument("--seoul-rows", type=int, default=3000, help="서울 관광지 데이터 수")
+    parser.add_argument("--unthrottled", action="store_true", help="API 호출 정책의 초당 요청 수 제한 해제")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    config = MockConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.area_items, args.seoul_rows)
+    server = start_mock_server(config)
+    print(f"대역 서버: {server.base_url} (지연 {args.latency_ms}±{args.jitter_ms}ms, 오류율 {args.error_rate})")
+
+    results = {}
+    try:
+        for name in args.only or BENCHMARKS:
+            print(f"실행 중: {name} ...", flush=True)
+            results[name] = run_benchmark(name, server.base_url, unthrottled=args.unthrottled)
+    finally:
+        server.shutdown()
+
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n결과를 저장했습니다: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
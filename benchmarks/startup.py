@@ -0,0 +1,146 @@
+"""앱 시작 시간(app 모듈 import 시간, 첫 요청 응답까지의 시간)을 측정합니다.
+
+매 실행은 새 인터프리터에서 이루어지며, 외부 API는 로컬 대역 서버(benchmarks/mock_server.py)로 대체합니다.
+시작 시 불러오면 안 되는 무거운 모듈(LAZY_MODULES)이 import 후 로드되어 있거나,
+시작 시간 예산(기본 MAX_IMPORT_SECONDS / MAX_FIRST_REQUEST_SECONDS, --max-import-seconds /
+--max-first-request-seconds로 변경)을 넘으면 종료 코드 1을 반환합니다.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 5 --max-import-seconds 8 --max-first-request-seconds 15
+"""
+import argparse
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.mock_server import MockConfig, start_mock_server
+from benchmarks.run_benchmarks import PROJECT_ROOT, child_env
+
+# 시작 시간 예산 (중앙값 기준, 초). 로컬 대역 서버 기준 측정값(import 약 6.3초, 첫 요청 약 6.7초)에 여유를 둔 값
+MAX_IMPORT_SECONDS = 8.0
+MAX_FIRST_REQUEST_SECONDS = 10.0
+
+# 그래프를 그리거나 내보낼 때만 필요한 모듈 (pandas, PIL은 gradio가 직접 불러오므로 제외)
+LAZY_MODULES = ("matplotlib",)
+# 시작 후 확인할 모듈 (보고용)
+REPORTED_MODULES = ("matplotlib", "pandas", "PIL", "pyarrow")
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+print("STARTUP_RESULT " + json.dumps({
+    "import_seconds": time.perf_counter() - started,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (REPORTED_MODULES,)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(env):
+    """새 프로세스에서 app을 import하는 데 걸린 시간과 로드된 무거운 모듈 목록을 반환합니다."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=300,
+    )
+    wall = time.perf_counter() - started
+    for line in completed.stdout.splitlines():
+        if line.startswith("STARTUP_RESULT "):
+            result = json.loads(line[len("STARTUP_RESULT "):])
+            result["process_seconds"] = wall
+            return result
+    tail = (completed.stderr or completed.stdout).strip().splitlines()[-5:]
+    raise RuntimeError("app import 실패: " + " / ".join(tail))
+
+
+def measure_first_request(env, timeout=120.0):
+    """python app.py를 실행한 뒤 첫 요청(GET /)이 200으로 응답할 때까지 걸린 시간(초)을 반환합니다."""
+    port = _free_port()
+    env = {**env, "GRADIO_SERVER_PORT": str(port), "GRADIO_SERVER_NAME": "127.0.0.1"}
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "app.py"], cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"app.py가 종료되었습니다 (exit code {process.returncode})")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            time.sleep(0.05)
+        raise RuntimeError(f"{timeout}초 안에 첫 요청에 응답하지 않았습니다")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="측정 반복 횟수 (중앙값 보고)")
+    parser.add_argument("--max-import-seconds", type=float, default=MAX_IMPORT_SECONDS, help="app import 시간 예산 (중앙값 기준, 0이면 검사하지 않음)")
+    parser.add_argument("--max-first-request-seconds", type=float, default=MAX_FIRST_REQUEST_SECONDS, help="첫 요청 응답 시간 예산 (중앙값 기준, 0이면 검사하지 않음)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    server = start_mock_server(MockConfig(seoul_rows=1000))
+    imports, first_requests, loaded = [], [], set()
+    try:
+        with tempfile.TemporaryDirectory(prefix="tourlens_startup_") as work_dir:
+            env = child_env(server.base_url, work_dir, unthrottled=False)
+            for run in range(1, args.runs + 1):
+                result = measure_import(env)
+                first_request = measure_first_request(env)
+                imports.append(result["import_seconds"])
+                first_requests.append(first_request)
+                loaded.update(result["loaded"])
+                print(f"[{run}/{args.runs}] import app {result['import_seconds']:.2f}s "
+                      f"(프로세스 {result['process_seconds']:.2f}s), 첫 요청 {first_request:.2f}s, "
+                      f"로드된 모듈 {result['loaded']}", flush=True)
+    finally:
+        server.shutdown()
+
+    summary = {
+        "import_seconds": round(statistics.median(imports), 3),
+        "first_request_seconds": round(statistics.median(first_requests), 3),
+        "loaded_at_startup": sorted(loaded),
+    }
+    print(f"\n중앙값: import app {summary['import_seconds']:.2f}s, 첫 요청 {summary['first_request_seconds']:.2f}s")
+
+    failures = []
+    eager = sorted(loaded.intersection(LAZY_MODULES))
+    if eager:
+        failures.append(f"시작 시 불러오면 안 되는 모듈이 로드됨: {eager}")
+    if args.max_import_seconds and summary["import_seconds"] > args.max_import_seconds:
+        failures.append(f"import 시간 예산 초과: {summary['import_seconds']:.2f}s > {args.max_import_seconds}s")
+    if args.max_first_request_seconds and summary["first_request_seconds"] > args.max_first_request_seconds:
+        failures.append(f"첫 요청 시간 예산 초과: {summary['first_request_seconds']:.2f}s > {args.max_first_request_seconds}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "summary": summary, "failures": failures}, f, ensure_ascii=False, indent=2)
+
+    for failure in failures:
+        print(f"실패: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
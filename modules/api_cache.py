@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+# --- 캐시 기본 설정 ---
+CACHE_DIR = os.getenv("TOURLENS_CACHE_DIR", "cache")
+TOUR_API_CACHE_MAX_BYTES = int(os.getenv("TOURLENS_TOUR_API_CACHE_MB", "256")) * 1024 * 1024
+
+# 엔드포인트별 캐시 유효 시간(초). 코드표는 거의 바뀌지 않고, 목록은 자주 바뀝니다.
+ENDPOINT_TTLS = {
+    "areaCode2": 7 * 24 * 3600,
+    "detailCommon2": 6 * 3600,
+    "detailIntro2": 6 * 3600,
+    "detailInfo2": 6 * 3600,
+    "areaBasedList2": 3600,
+    "locationBasedList2": 30 * 60,
+}
+DEFAULT_TTL = 3600
+
+# 캐시 키에서 제외할 파라미터 (인증키가 바뀌어도 같은 응답을 재사용)
+KEY_EXCLUDED_PARAMS = {"serviceKey"}
+
+
+def endpoint_from_url(url):
+    """요청 URL의 마지막 경로를 엔드포인트 이름으로 사용합니다. (예: .../KorService2/areaCode2 -> areaCode2)"""
+    return urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+
+
+def make_cache_key(endpoint, params):
+    """엔드포인트와 정규화된 파라미터(serviceKey 제외)로 캐시 키를 만듭니다."""
+    normalized = sorted(
+        (str(key), str(value))
+        for key, value in (params or {}).items()
+        if key not in KEY_EXCLUDED_PARAMS and value is not None
+    )
+    raw_key = json.dumps([endpoint, normalized], ensure_ascii=False)
+    return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """SQLite 기반 API 응답 캐시. 엔드포인트별 TTL과 바이트 예산 기반 LRU 제거를 지원합니다."""
+
+    def __init__(self, path, max_bytes, ttls=None, default_ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0
+
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, endpoint TEXT, body BLOB, size INTEGER,"
+                " expires_at REAL, accessed_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+            self._total_bytes = row[0]
+        except sqlite3.Error as e:
+            print(f"[ResponseCache] 캐시 DB를 열 수 없어 캐시 없이 동작합니다: {e}")
+            self._conn = None
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint, params):
+        """캐시된 응답 본문(bytes)을 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        if self._conn is None:
+            return None
+        key = make_cache_key(endpoint, params)
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT body, size, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                body, size, expires_at = row
+                if expires_at < now:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._total_bytes -= size
+                    self.misses += 1
+                    return None
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return bytes(body)
+        except sqlite3.Error as e:
+            print(f"[ResponseCache] 캐시 조회 오류: {e}")
+            return None
+
+    def put(self, endpoint, params, body):
+        """응답 본문을 저장하고, 바이트 예산을 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다."""
+        if self._conn is None or not body or len(body) > self.max_bytes:
+            return
+        key = make_cache_key(endpoint, params)
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._total_bytes -= row[0]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, endpoint, body, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, endpoint, sqlite3.Binary(body), len(body), now + self.ttl_for(endpoint), now),
+                )
+                self._total_bytes += len(body)
+                self._evict_locked()
+        except sqlite3.Error as e:
+            print(f"[ResponseCache] 캐시 저장 오류: {e}")
+
+    def _evict_locked(self):
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                self._total_bytes -= size
+                self.evictions += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self):
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def stats(self):
+        """캐시 적중/실패 횟수와 현재 사용량을 반환합니다."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def is_cacheable(response):
+    """정상 응답(resultCode 0000)만 캐시합니다. 오류 응답이 TTL 동안 고정되는 것을 막기 위함입니다."""
+    if response.status_code != 200 or not response.content:
+        return False
+    try:
+        header = response.json().get('response', {}).get('header', {})
+    except ValueError:
+        return False
+    return isinstance(header, dict) and header.get('resultCode') == '0000'
+
+
+def _build_cached_response(url, params, body):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.encoding = 'utf-8'
+    response.url = requests.Request('GET', url, params=params).prepare().url
+    response.headers['Content-Type'] = 'application/json;charset=UTF-8'
+    response.headers['X-Cache'] = 'HIT'
+    return response
+
+
+class CachedSession(requests.Session):
+    """GET 응답을 ResponseCache에 저장/재사용하는 requests.Session."""
+
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+
+    def get(self, url, params=None, **kwargs):
+        endpoint = endpoint_from_url(url)
+        body = self.cache.get(endpoint, params)
+        if body is not None:
+            return _build_cached_response(url, params, body)
+
+        response = super().get(url, params=params, **kwargs)
+        if is_cacheable(response):
+            self.cache.put(endpoint, params, response.content)
+        return response
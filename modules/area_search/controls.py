@@ -1,5 +1,5 @@
 import gradio as gr
-from utils import common_params, session, BASE_URL, get_api_items
+from modules.area_search.sigungu import get_sigungu_codes
 
 AREA_CODES = {
     "서울": 1, "인천": 2, "대전": 3, "대구": 4, "광주": 5, "부산": 6, "울산": 7, "세종": 8,
@@ -15,13 +15,7 @@ def update_sigungu_dropdown(area_name):
     if not area_name: return gr.update(choices=[], interactive=False)
     try:
         area_code = AREA_CODES.get(area_name)
-        params = {**common_params, "areaCode": area_code, "numOfRows": "100"}
-        response = session.get(f"{BASE_URL}areaCode2", params=params)
-        response.raise_for_status()
-        
-        items = get_api_items(response.json())
-        
-        sigungu_names = [item['name'] for item in items if isinstance(item, dict) and 'name' in item]
+        sigungu_names = list(get_sigungu_codes(area_code).keys())
         
         return gr.update(choices=["전체"] + sigungu_names, value="전체", interactive=True)
     except Exception as e:
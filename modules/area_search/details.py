@@ -1,83 +1,158 @@
+import asyncio
 import json
 from datetime import date, timedelta
 from utils import (
-    common_params, session, BASE_URL, 
+    common_params, BASE_URL,
     format_json_to_clean_string, create_trend_plot
 )
-from modules.naver_review import search_naver_blog, get_naver_trend
+from modules.async_client import tour_api_get
+from modules.naver_review import search_naver_blog_async, get_naver_trend_async
+from modules.tracing import traced_handler
+from modules.fanout import STAGE_TIMEOUTS, StageTimeout, run_stage_async
 
-def get_details(selected_title, places_info):
+def _detail_api_calls(content_id, content_type_id):
+    return [("detailCommon2", {"contentId": content_id}), ("detailIntro2", {"contentId": content_id, "contentTypeId": content_type_id}), ("detailInfo2", {"contentId": content_id, "contentTypeId": content_type_id})]
+
+def _format_detail_response(response):
+    """상세 API 응답을 (Raw JSON 문자열, 포맷된 문자열)로 변환합니다."""
+    response.raise_for_status()
+
+    if not response.text or not response.text.strip():
+        raise ValueError("API 응답이 비어 있습니다.")
+
+    response_json = response.json()
+
+    header = response_json.get('response', {}).get('header', {})
+    if header.get('resultCode') != '0000':
+        pretty_output = json.dumps(response_json, indent=2, ensure_ascii=False)
+    else:
+        pretty_output = format_json_to_clean_string(response_json)
+
+    return json.dumps(response_json, indent=2, ensure_ascii=False), pretty_output
+
+def _detail_error(api_name, e):
+    return f"{api_name} 처리 중 오류: {e}", f"정보를 가져오는 데 실패했습니다: {e}"
+
+def _blog_reviews_markdown(blog_reviews):
+    if not blog_reviews:
+        return ""
+    blog_md = "\n\n---\n\n### 📝 네이버 블로그 리뷰\n\n"
+    for review in blog_reviews:
+        post_date = review.get('postdate', '')
+        if post_date:
+            post_date = f"{post_date[0:4]}-{post_date[4:6]}-{post_date[6:8]}"
+
+        blog_md += f"**[{review['title']}]({review['link']})** ({post_date})\n"
+        blog_md += f"> {review['description']}...\n\n"
+    return blog_md
+
+def _section_error(label, e):
+    """블로그/트렌드 단계 실패 시 본문 끝에 붙일 안내 문구. 제한 시간 초과는 따로 안내합니다."""
+    if isinstance(e, StageTimeout):
+        return f"\n\n---\n\n{label} 응답이 늦어 표시하지 못했습니다."
+    return f"\n\n---\n\n{label}를 가져오는 중 오류가 발생했습니다."
+
+def _trend_markdown(selected_title, plot_path):
+    if not plot_path:
+        return ""
+    return f"\n\n---\n\n### 📈 네이버 검색 트렌드\n\n![{selected_title} 트렌드]({plot_path})"
+
+def _trend_window():
+    end_date = date.today()
+    return end_date - timedelta(days=90), end_date
+
+TREND_LOADING_MARKDOWN = "\n\n---\n\n### 📈 네이버 검색 트렌드\n\n트렌드 그래프를 불러오는 중입니다..."
+# 트렌드 단계는 조회와 그래프 렌더링을 이어서 하므로 두 제한 시간을 합쳐 적용
+TREND_STAGE_TIMEOUT = STAGE_TIMEOUTS["naver_trend"] + STAGE_TIMEOUTS["plot_render"]
+
+async def _trend_section_async(selected_title):
+    start_date, end_date = _trend_window()
+    trend_data = await get_naver_trend_async(selected_title, start_date, end_date)
+    if not trend_data:
+        return ""
+    # 렌더링은 작업 스레드에서
+    plot_path = await run_stage_async("plot_render", STAGE_TIMEOUTS["plot_render"], asyncio.to_thread(create_trend_plot, trend_data, selected_title))
+    return _trend_markdown(selected_title, plot_path)
+
+@traced_handler("get_details")
+async def _collect_details_async(selected_title, places_info, on_partial=None):
+    """상세 API 3종과 블로그/트렌드 조회를 동시에 실행합니다.
+
+    상세 정보와 블로그 리뷰가 준비됐는데 트렌드가 아직이면 on_partial(중간 결과)을 한 번 호출합니다.
+    """
     if not selected_title or not places_info:
         return "", "", "", "", "", ""
-    
+
     if selected_title not in places_info:
         return "선택된 항목을 찾을 수 없습니다.", "", "", "", "", ""
 
     content_id, content_type_id = places_info[selected_title]
     results = [""] * 6
-    apis_to_call = [("detailCommon2", {"contentId": content_id}), ("detailIntro2", {"contentId": content_id, "contentTypeId": content_type_id}), ("detailInfo2", {"contentId": content_id, "contentTypeId": content_type_id})]
-    
-    # 1. TourAPI 상세 정보 조회
-    for i, (api_name, specific_params) in enumerate(apis_to_call):
-        try:
-            params = {**common_params, **specific_params}
-            response = session.get(f"{BASE_URL}{api_name}", params=params)
-            response.raise_for_status()
-            
-            if not response.text or not response.text.strip():
-                raise ValueError("API 응답이 비어 있습니다.")
-
-            response_json = response.json()
-            
-            header = response_json.get('response', {}).get('header', {})
-            if header.get('resultCode') != '0000':
-                pretty_output = json.dumps(response_json, indent=2, ensure_ascii=False)
-            else:
-                pretty_output = format_json_to_clean_string(response_json)
-
-            results[i * 2] = json.dumps(response_json, indent=2, ensure_ascii=False)
-            results[i * 2 + 1] = pretty_output
+    detail_calls = _detail_api_calls(content_id, content_type_id)
+
+    # 1. 모든 단계를 동시에 시작
+    detail_tasks = [
+        asyncio.create_task(run_stage_async(
+            f"tourapi.{api_name}", STAGE_TIMEOUTS["tourapi"],
+            tour_api_get(f"{BASE_URL}{api_name}", {**common_params, **specific_params}),
+        ))
+        for api_name, specific_params in detail_calls
+    ]
+    blog_task = asyncio.create_task(run_stage_async(
+        "naver.blog_search", STAGE_TIMEOUTS["naver_blog"], search_naver_blog_async(f"{selected_title} 후기", display=3),
+    ))
+    trend_task = asyncio.create_task(run_stage_async("naver.trend", TREND_STAGE_TIMEOUT, _trend_section_async(selected_title)))
+
+    # 2. 상세 정보와 블로그 리뷰
+    responses = await asyncio.gather(*detail_tasks, blog_task, return_exceptions=True)
+    detail_responses, blog_reviews = responses[:3], responses[3]
 
+    for i, ((api_name, _), response) in enumerate(zip(detail_calls, detail_responses)):
+        try:
+            if isinstance(response, BaseException):
+                raise response
+            results[i * 2], results[i * 2 + 1] = _format_detail_response(response)
         except Exception as e:
-            error_msg = f"{api_name} 처리 중 오류: {e}"
-            results[i * 2] = error_msg
-            results[i * 2 + 1] = f"정보를 가져오는 데 실패했습니다: {e}"
+            results[i * 2], results[i * 2 + 1] = _detail_error(api_name, e)
 
-    # 2. 네이버 블로그 리뷰 검색 및 추가
-    try:
-        blog_query = f"{selected_title} 후기"
-        blog_reviews = search_naver_blog(blog_query, display=3)
-        
-        if blog_reviews:
-            blog_md = "\n\n---\n\n### 📝 네이버 블로그 리뷰\n\n"
-            for review in blog_reviews:
-                post_date = review.get('postdate', '')
-                if post_date:
-                    post_date = f"{post_date[0:4]}-{post_date[4:6]}-{post_date[6:8]}"
-
-                blog_md += f"**[{review['title']}]({review['link']})** ({post_date})\n"
-                blog_md += f"> {review['description']}...\n\n"
-            
-            results[1] += blog_md
+    if isinstance(blog_reviews, BaseException):
+        print(f"네이버 블로그 리뷰 검색 중 오류: {blog_reviews}")
+        results[1] += _section_error("블로그 리뷰", blog_reviews)
+    else:
+        results[1] += _blog_reviews_markdown(blog_reviews)
 
-    except Exception as e:
-        print(f"네이버 블로그 리뷰 검색 중 오류: {e}")
-        results[1] += "\n\n---\n\n블로그 리뷰를 가져오는 중 오류가 발생했습니다."
+    if on_partial is not None and not trend_task.done():
+        partial = list(results)
+        partial[1] += TREND_LOADING_MARKDOWN
+        on_partial(tuple(partial))
 
-    # 3. 네이버 검색어 트렌드 그래프 추가
+    # 3. 검색어 트렌드 그래프
     try:
-        end_date = date.today()
-        start_date = end_date - timedelta(days=90)
-        trend_data = get_naver_trend(selected_title, start_date, end_date)
-        
-        if trend_data:
-            plot_path = create_trend_plot(trend_data, selected_title)
-            if plot_path:
-                trend_md = f"\n\n---\n\n### 📈 네이버 검색 트렌드\n\n![{selected_title} 트렌드]({plot_path})"
-                results[1] += trend_md
-
+        results[1] += await trend_task
     except Exception as e:
         print(f"네이버 트렌드 검색 중 오류: {e}")
-        results[1] += "\n\n---\n\n트렌드 정보를 가져오는 중 오류가 발생했습니다."
-            
-    return tuple(results)
\ No newline at end of file
+        results[1] += _section_error("트렌드 정보", e)
+
+    return tuple(results)
+
+async def get_details_stream(selected_title, places_info):
+    """관광지 상세 정보 핸들러 (Gradio 비동기 제너레이터).
+
+    상세 정보와 블로그 리뷰를 먼저 보여주고, 트렌드 그래프는 준비되는 대로 이어서 보냅니다.
+    """
+    first_partial = asyncio.get_running_loop().create_future()
+
+    def on_partial(partial):
+        if not first_partial.done():
+            first_partial.set_result(partial)
+
+    task = asyncio.create_task(_collect_details_async(selected_title, places_info, on_partial))
+    try:
+        await asyncio.wait({task, first_partial}, return_when=asyncio.FIRST_COMPLETED)
+        if first_partial.done() and not task.done():
+            yield first_partial.result()
+        yield await task
+    finally:
+        # 사용자가 다른 항목을 선택해 스트림이 닫히면 남은 조회를 취소
+        if not task.done():
+            task.cancel()
@@ -1,155 +1,166 @@
 import gradio as gr
-import math
-import csv
-import io
+import json
+import os
 import tempfile
-import re
 import traceback
-from utils import common_params, session, BASE_URL, clean_html, is_key_excluded, get_api_items
-from modules.area_search.controls import AREA_CODES, CONTENT_TYPE_CODES
+from itertools import islice
+
+import pandas as pd
 
+from utils import is_key_excluded, HTML_TAG_PATTERN, HOMEPAGE_HREF_PATTERN
+from modules.crawl_engine import crawl_area
+from modules.metrics import metrics, job_summary
+from modules.area_search.controls import AREA_CODES, CONTENT_TYPE_CODES
+from modules.area_search.sigungu import resolve_sigungu_code
+
+# CSV 변환 시 한 번에 정리할 행 수 (청크마다 DataFrame을 하나 만들어 열 단위로 정리)
+CSV_CLEAN_CHUNK_ROWS = 5000
+
+# 문자열 열은 가능하면 Arrow 기반 문자열 타입으로 바꿔 정규식 치환을 C 수준에서 처리
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = "string"
+
+def _strip_html_column(column):
+    """문자열 값의 HTML 태그와 앞뒤 공백을 제거합니다. 문자열이 아닌 값은 그대로 둡니다."""
+    inferred = pd.api.types.infer_dtype(column, skipna=True)
+    if inferred == "string":
+        return column.astype(STRING_DTYPE).str.replace(HTML_TAG_PATTERN.pattern, '', regex=True).str.strip()
+    if inferred not in ("mixed", "mixed-integer"):
+        return column
+    cleaned = column.str.replace(HTML_TAG_PATTERN, '', regex=True).str.strip()
+    return cleaned.fillna(column)
+
+def clean_frame(frame):
+    """내보내기 DataFrame의 모든 열을 정리합니다. homepage 열은 href 링크를 추출하고, 없으면 태그만 제거합니다."""
+    for column_name in frame.columns:
+        column = frame[column_name]
+        if column_name == 'homepage' and pd.api.types.infer_dtype(column, skipna=True) == "string":
+            column = column.astype(STRING_DTYPE)
+            links = column.str.extract(HOMEPAGE_HREF_PATTERN.pattern)[1]
+            frame[column_name] = links.fillna(_strip_html_column(column))
+        else:
+            frame[column_name] = _strip_html_column(column)
+    return frame
+
+class SpillingCsvWriter:
+    """헤더를 미리 알 수 없는 행들을 CSV로 흘려 쓰는 작성기.
+
+    행은 도착하는 즉시 JSON Lines 스필 파일에 기록되고, 메모리에는 헤더 목록만 남습니다.
+    finalize()에서 확정된 헤더를 먼저 쓰고 스필 파일을 CSV_CLEAN_CHUNK_ROWS행씩 읽어
+    DataFrame으로 열 단위 정리(clean_frame)한 뒤 utf-8-sig CSV 파일로 옮기므로,
+    내보내기 크기와 무관하게 메모리 사용량이 일정합니다.
+    """
+
+    def __init__(self, is_excluded=is_key_excluded):
+        self.is_excluded = is_excluded
+        self.headers = []
+        self.row_count = 0
+        self._seen_keys = set()
+        self._spill = tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', suffix='.jsonl', prefix='tour_spill_', delete=False)
+
+    def add_keys(self, keys):
+        for key in keys:
+            if key in self._seen_keys:
+                continue
+            self._seen_keys.add(key)
+            if not self.is_excluded(key):
+                self.headers.append(key)
+
+    def write_row(self, row):
+        self._spill.write(json.dumps(row, ensure_ascii=False))
+        self._spill.write("\n")
+        self.row_count += 1
+
+    def finalize(self, prefix='export_'):
+        """스필 파일을 헤더가 포함된 CSV 임시 파일로 변환하고 그 경로를 반환합니다."""
+        self._spill.close()
+        try:
+            with tempfile.NamedTemporaryFile(delete=False, mode='w', encoding='utf-8-sig', newline='', suffix='.csv', prefix=prefix) as temp_f:
+                pd.DataFrame(columns=self.headers).to_csv(temp_f, index=False)
+                with open(self._spill.name, encoding='utf-8') as spill_f:
+                    while True:
+                        lines = list(islice(spill_f, CSV_CLEAN_CHUNK_ROWS))
+                        if not lines:
+                            break
+                        frame = pd.DataFrame([json.loads(line) for line in lines], columns=self.headers, dtype=object)
+                        clean_frame(frame).to_csv(temp_f, index=False, header=False)
+                return temp_f.name
+        finally:
+            self._remove_spill()
+
+    def discard(self):
+        self._spill.close()
+        self._remove_spill()
+
+    def _remove_spill(self):
+        try:
+            os.remove(self._spill.name)
+        except OSError:
+            pass
+
+class CsvExportSink:
+    """크롤 엔진 싱크: 레코드를 detailInfo2 항목별 행으로 펼쳐 SpillingCsvWriter에 기록합니다."""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def consume(self, record):
+        content_id = record.item.get('contentid')
+        if not content_id:
+            return
+        if record.error:
+            print(f"Error fetching details for content_id {content_id}: {record.error}")
+            return
+
+        self.writer.add_keys(record.details.keys())
+        if record.info_items:
+            for info_item in record.info_items:
+                self.writer.add_keys(info_item.keys())
+                self.writer.write_row({**record.details, **info_item})
+        else:
+            self.writer.write_row(record.details)
+
+@job_summary("export_to_csv")
 def export_to_csv(area_name, sigungu_name, category_name, progress=gr.Progress()):
     """검색된 모든 결과를 API 응답 순서에 따른 동적 컬럼 CSV 파일로 저장합니다."""
     if not area_name:
         gr.Warning("지역을 먼저 선택해주세요.")
         return None
 
-    progress(0, desc="전체 데이터 개수 확인 중...")
-
     try:
-        # 1. 전체 아이템 개수 확인
         area_code = AREA_CODES.get(area_name)
         content_type_id = CONTENT_TYPE_CODES.get(category_name)
-        
-        base_list_params = {**common_params, "areaCode": area_code, "numOfRows": 1, "pageNo": 1}
-        if sigungu_name and sigungu_name != "전체":
-            sigungu_response = session.get(f"{BASE_URL}areaCode2", params={**common_params, "areaCode": area_code, "numOfRows": "100"})
-            sigungu_response.raise_for_status()
-            sigungu_items = get_api_items(sigungu_response.json())
-            sigungu_code = next((item['code'] for item in sigungu_items if isinstance(item, dict) and item.get('name') == sigungu_name), None)
-            if sigungu_code: base_list_params["sigunguCode"] = sigungu_code
-        if content_type_id:
-            base_list_params["contentTypeId"] = content_type_id
-
-        response = session.get(f"{BASE_URL}areaBasedList2", params=base_list_params)
-        response.raise_for_status()
-        data = response.json()
-        body = data.get('response', {}).get('body', {})
-        total_count = body.get('totalCount', 0) if isinstance(body, dict) else 0
-
-        if total_count == 0:
-            gr.Info("내보낼 데이터가 없습니다.")
-            return None
-
-        # 2. 모든 기본 아이템 정보 수집
-        all_basic_items = []
-        num_of_rows = 100
-        total_pages = math.ceil(total_count / num_of_rows)
-        
-        for page_no in progress.tqdm(range(1, total_pages + 1), desc="관광지 목록 수집 중"):
-            base_list_params.update({"numOfRows": num_of_rows, "pageNo": page_no})
-            response = session.get(f"{BASE_URL}areaBasedList2", params=base_list_params)
-            response.raise_for_status()
-            items = get_api_items(response.json())
-            all_basic_items.extend(items)
-
-        # 3. 각 아이템의 상세 정보 조회 및 데이터 재구성
-        all_item_details = []
-        ordered_headers = []
-        seen_keys = set()
-
-        def add_key_to_header(key):
-            if is_key_excluded(key):
-                return
-            if key not in seen_keys:
-                ordered_headers.append(key)
-                seen_keys.add(key)
-
-        for item in progress.tqdm(all_basic_items, desc="상세 정보 조회 및 데이터 구성 중"):
-            if not isinstance(item, dict):
-                continue
-
-            content_id = item.get('contentid')
-            content_type_id = item.get('contenttypeid')
-            if not content_id:
-                continue
-
-            base_data = {}
-            try:
-                base_data.update(item)
-                for key in item.keys():
-                    add_key_to_header(key)
-
-                apis_to_process = [
-                    ("detailCommon2", {**common_params, "contentId": content_id, "defaultYN": "Y", "firstImageYN": "Y", "areacodeYN": "Y", "catcodeYN": "Y", "addrinfoYN": "Y", "mapinfoYN": "Y", "overviewYN": "Y"}),
-                    ("detailIntro2", {**common_params, "contentId": content_id, "contentTypeId": content_type_id}),
-                ]
-
-                for api_name, params in apis_to_process:
-                    response = session.get(f"{BASE_URL}{api_name}", params=params)
-                    response.raise_for_status()
-                    if not response.text or not response.text.strip(): continue
-                    
-                    res_items = get_api_items(response.json())
-
-                    for res_item in res_items:
-                        if isinstance(res_item, dict):
-                            base_data.update(res_item)
-                            for key in res_item.keys():
-                                add_key_to_header(key)
-                
-                detail_info_params = {**common_params, "contentId": content_id, "contentTypeId": content_type_id}
-                response = session.get(f"{BASE_URL}detailInfo2", params=detail_info_params)
-                response.raise_for_status()
-                
-                info_items = get_api_items(response.json())
-
-                if info_items:
-                    for info_item in info_items:
-                        if isinstance(info_item, dict):
-                            row_data = {**base_data, **info_item}
-                            all_item_details.append(row_data)
-                            for key in info_item.keys():
-                                add_key_to_header(key)
-                else:
-                    all_item_details.append(base_data)
-
-            except Exception as detail_e:
-                print(f"Error fetching details for content_id {content_id}: {detail_e}")
-                continue
-        
-        if not all_item_details:
-            gr.Info("상세 정보를 가져올 수 있는 데이터가 없습니다.")
-            return None
-
-        # 4. CSV 파일 생성
-        progress(0.9, desc="CSV 파일 생성 중...")
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=ordered_headers, extrasaction='ignore')
-        writer.writeheader()
-
-        for item_data in all_item_details:
-            cleaned_item = {}
-            for k, v in item_data.items():
-                if k == 'homepage':
-                    match = re.search(r'href=["\\](["\\]+)[\"\\]', str(v))
-                    cleaned_item[k] = match.group(1) if match else clean_html(str(v))
-                else:
-                    cleaned_item[k] = clean_html(v) if isinstance(v, str) else v
-            writer.writerow(cleaned_item)
-        
-        csv_content = output.getvalue()
-        output.close()
-        
-        encoded_content = csv_content.encode('utf-8-sig')
-
-        with tempfile.NamedTemporaryFile(delete=False, mode='wb', suffix='.csv', prefix='tour_data_') as temp_f:
-            temp_f.write(encoded_content)
+        sigungu_code = resolve_sigungu_code(area_code, sigungu_name)
+
+        # 1~3. 크롤 엔진으로 목록/상세 정보를 수집하면서 CSV 싱크에 행 단위로 기록
+        writer = SpillingCsvWriter()
+        try:
+            record_count = crawl_area(area_code, sigungu_code, content_type_id, [CsvExportSink(writer)], progress=progress)
+
+            if record_count == 0:
+                writer.discard()
+                gr.Info("내보낼 데이터가 없습니다.")
+                return None
+
+            if writer.row_count == 0:
+                writer.discard()
+                gr.Info("상세 정보를 가져올 수 있는 데이터가 없습니다.")
+                return None
+
+            # 4. 헤더 확정 후 스필 파일을 CSV 파일로 변환
+            progress(0.9, desc="CSV 파일 생성 중...")
+            with metrics.timer("csv_write"):
+                csv_path = writer.finalize(prefix='tour_data_')
             gr.Info("CSV 파일 생성이 완료되었습니다. 아래 링크를 클릭하여 다운로드하세요.")
-            return temp_f.name
+            return csv_path
+        except BaseException:
+            writer.discard()
+            raise
 
     except Exception as e:
-        import traceback
         print(f"[export_to_csv error] {e}")
         traceback.print_exc()
         gr.Error(f"CSV 생성 중 오류가 발생했습니다: {e}")
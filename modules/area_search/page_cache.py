@@ -0,0 +1,172 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from utils import common_params, session, BASE_URL, get_api_items
+from modules.async_client import tour_api_get
+from modules.api_cache import is_cacheable
+from modules.location_search.spatial_index import spatial_index
+from modules.metrics import metrics
+
+# --- 페이지 캐시 설정 ---
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("TOURLENS_PAGE_CACHE_ENTRIES", "1024"))
+PAGE_CACHE_TTL = int(os.getenv("TOURLENS_PAGE_CACHE_TTL", "600"))
+PAGE_PREFETCH_WORKERS = 4
+PAGE_PREFETCH_RADIUS = 1  # 현재 페이지 앞뒤로 미리 받아 둘 페이지 수
+
+PageEntry = namedtuple("PageEntry", ["total_count", "items", "stored_at"])
+
+
+def _area_page_params(area_code, sigungu_code, content_type_id, page_no, num_of_rows):
+    params = {**common_params, "areaCode": area_code, "numOfRows": num_of_rows, "pageNo": page_no}
+    if sigungu_code:
+        params["sigunguCode"] = sigungu_code
+    if content_type_id:
+        params["contentTypeId"] = content_type_id
+    return params
+
+def _parse_area_page(response):
+    response.raise_for_status()
+    # HTTP 200이어도 resultCode가 0000이 아니면 오류 응답이므로 빈 페이지로 캐시하지 않도록 예외 처리
+    if not is_cacheable(response):
+        raise ValueError(f"TourAPI 오류 응답: {response.text[:200]}")
+    data = response.json()
+
+    body = data.get('response', {}).get('body', {})
+    if not isinstance(body, dict): body = {}
+    return body.get('totalCount', 0), get_api_items(data)
+
+def fetch_area_page(area_code, sigungu_code, content_type_id, page_no, num_of_rows):
+    """areaBasedList2에서 한 페이지를 가져와 (totalCount, items)를 반환합니다."""
+    params = _area_page_params(area_code, sigungu_code, content_type_id, page_no, num_of_rows)
+    return _parse_area_page(session.get(f"{BASE_URL}areaBasedList2", params=params))
+
+async def fetch_area_page_async(area_code, sigungu_code, content_type_id, page_no, num_of_rows):
+    """fetch_area_page의 비동기 버전."""
+    params = _area_page_params(area_code, sigungu_code, content_type_id, page_no, num_of_rows)
+    return _parse_area_page(await tour_api_get(f"{BASE_URL}areaBasedList2", params))
+
+
+class PageCache:
+    """세션 간에 공유되는 지역 검색 페이지 캐시.
+
+    키는 (지역, 시군구, 카테고리, 페이지, 페이지 크기)이며, 크기 제한이 있는 LRU로 관리합니다.
+    페이지를 조회할 때마다 이웃 페이지를 백그라운드에서 미리 받아 두고,
+    같은 페이지에 대한 동시 요청은 진행 중인 한 번의 호출 결과를 함께 기다립니다.
+    """
+
+    def __init__(self, fetch_page=fetch_area_page, fetch_page_async=fetch_area_page_async, max_entries=PAGE_CACHE_MAX_ENTRIES, ttl=PAGE_CACHE_TTL,
+                 prefetch_workers=PAGE_PREFETCH_WORKERS, prefetch_radius=PAGE_PREFETCH_RADIUS):
+        self.fetch_page = fetch_page
+        self.fetch_page_async = fetch_page_async
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prefetch_radius = prefetch_radius
+        self.hits = 0
+        self.misses = 0
+        self.prefetches = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="page-prefetch")
+
+    def _fresh_entry_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, future, total_count, items):
+        entry = PageEntry(total_count, items, time.time())
+        spatial_index.add_items(items)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(entry)
+
+    def _fail(self, key, future, error):
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_exception(error)
+
+    def _load(self, key, future):
+        try:
+            total_count, items = self.fetch_page(*key)
+        except Exception as e:
+            self._fail(key, future, e)
+            return
+        self._store(key, future, total_count, items)
+
+    def _lookup(self, key):
+        """(캐시 항목, 진행 중인 Future, 호출자가 직접 가져와야 하는지)를 반환합니다."""
+        owner = False
+        future = None
+        with self._lock:
+            entry = self._fresh_entry_locked(key)
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    owner = True
+        return entry, future, owner
+
+    async def get_page_async(self, area_code, sigungu_code, content_type_id, page_no, num_of_rows):
+        """페이지를 캐시에서 반환하고, 없으면 가져와 저장합니다. 이웃 페이지는 미리 받아 둡니다."""
+        key = (area_code, sigungu_code, content_type_id, page_no, num_of_rows)
+        entry, future, owner = self._lookup(key)
+        if entry is None:
+            if owner:
+                try:
+                    total_count, items = await self.fetch_page_async(*key)
+                except BaseException as e:
+                    # 취소된 경우에도 같은 페이지를 기다리는 다른 호출이 멈추지 않도록 Future를 정리
+                    self._fail(key, future, e)
+                    raise
+                self._store(key, future, total_count, items)
+            entry = await asyncio.wrap_future(future)
+
+        self._prefetch_neighbors(key, entry.total_count)
+        return entry
+
+    def _prefetch_neighbors(self, key, total_count):
+        area_code, sigungu_code, content_type_id, page_no, num_of_rows = key
+        total_pages = -(-total_count // num_of_rows) if num_of_rows else 0
+        for offset in range(1, self.prefetch_radius + 1):
+            for neighbor in (page_no + offset, page_no - offset):
+                if not 1 <= neighbor <= total_pages:
+                    continue
+                neighbor_key = (area_code, sigungu_code, content_type_id, neighbor, num_of_rows)
+                with self._lock:
+                    if self._fresh_entry_locked(neighbor_key) is not None or neighbor_key in self._inflight:
+                        continue
+                    future = Future()
+                    self._inflight[neighbor_key] = future
+                    self.prefetches += 1
+                self._executor.submit(self._load, neighbor_key, future)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "prefetches": self.prefetches,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+area_page_cache = PageCache()
+metrics.register_stats("area_page_cache", area_page_cache.stats, counters=("hits", "misses", "prefetches"))
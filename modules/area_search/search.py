@@ -1,66 +1,64 @@
+import asyncio
 import gradio as gr
 import math
-from utils import common_params, session, BASE_URL, get_api_items
 from modules.area_search.controls import AREA_CODES, CONTENT_TYPE_CODES
+from modules.area_search.sigungu import resolve_sigungu_code
+from modules.area_search.page_cache import area_page_cache
+from modules.tracing import span, traced_handler
 
 ROWS_PER_PAGE = 10
 PAGE_WINDOW_SIZE = 5
 
-def update_page_view(area_name, sigungu_name, category_name, page_to_go):
-    """페이지네이션의 핵심 로직: 모든 필터를 적용하여 페이지 데이터 로드 및 UI 업데이트"""
-    try:
-        page_to_go = int(page_to_go)
-        area_code = AREA_CODES.get(area_name)
-        content_type_id = CONTENT_TYPE_CODES.get(category_name)
+def _page_view_outputs(area_name, sigungu_name, category_name, page_to_go, page):
+    """조회한 페이지로 상태 값과 UI 업데이트 튜플을 만듭니다."""
+    items = page.items
+
+    places_info = {
+        item['title']: (item['contentid'], item['contenttypeid']) 
+        for item in items 
+        if isinstance(item, dict) and 'title' in item
+    }
+
+    total_count = page.total_count
+    total_pages = math.ceil(total_count / ROWS_PER_PAGE)
 
-        params = {**common_params, "areaCode": area_code, "numOfRows": ROWS_PER_PAGE, "pageNo": page_to_go}
-        if sigungu_name and sigungu_name != "전체":
-            sigungu_response = session.get(f"{BASE_URL}areaCode2", params={**common_params, "areaCode": area_code, "numOfRows": "100"})
-            sigungu_response.raise_for_status()
-            
-            sigungu_items = get_api_items(sigungu_response.json())
-            
-            sigungu_code = next((item['code'] for item in sigungu_items if isinstance(item, dict) and item.get('name') == sigungu_name), None)
-            if sigungu_code: params["sigunguCode"] = sigungu_code
-        if content_type_id:
-            params["contentTypeId"] = content_type_id
+    half_window = PAGE_WINDOW_SIZE // 2
+    start_page = max(1, page_to_go - half_window)
+    end_page = min(total_pages, start_page + PAGE_WINDOW_SIZE - 1)
+    if end_page - start_page + 1 < PAGE_WINDOW_SIZE:
+        start_page = max(1, end_page - PAGE_WINDOW_SIZE + 1)
 
-        response = session.get(f"{BASE_URL}areaBasedList2", params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        items = get_api_items(data)
-        
-        body = data.get('response', {}).get('body', {})
-        if not isinstance(body, dict): body = {}
-        
-        places_info = {
-            item['title']: (item['contentid'], item['contenttypeid']) 
-            for item in items 
-            if isinstance(item, dict) and 'title' in item
-        }
-        
-        total_count = body.get('totalCount', 0)
-        total_pages = math.ceil(total_count / ROWS_PER_PAGE)
-        
-        half_window = PAGE_WINDOW_SIZE // 2
-        start_page = max(1, page_to_go - half_window)
-        end_page = min(total_pages, start_page + PAGE_WINDOW_SIZE - 1)
-        if end_page - start_page + 1 < PAGE_WINDOW_SIZE:
-            start_page = max(1, end_page - PAGE_WINDOW_SIZE + 1)
+    page_numbers_to_show = list(range(start_page, end_page + 1))
 
-        page_numbers_to_show = list(range(start_page, end_page + 1))
+    radio_update = gr.update(choices=list(places_info.keys()), value=None)
+    pagination_numbers_update = gr.update(choices=page_numbers_to_show, value=page_to_go)
+    first_btn_update = gr.update(interactive=page_to_go > 1)
+    prev_btn_update = gr.update(interactive=page_to_go > 1)
+    next_btn_update = gr.update(interactive=page_to_go < total_pages)
+    last_btn_update = gr.update(interactive=page_to_go < total_pages)
+    pagination_row_update = gr.update(visible=total_pages > 1)
 
-        radio_update = gr.update(choices=list(places_info.keys()), value=None)
-        pagination_numbers_update = gr.update(choices=page_numbers_to_show, value=page_to_go)
-        first_btn_update = gr.update(interactive=page_to_go > 1)
-        prev_btn_update = gr.update(interactive=page_to_go > 1)
-        next_btn_update = gr.update(interactive=page_to_go < total_pages)
-        last_btn_update = gr.update(interactive=page_to_go < total_pages)
-        pagination_row_update = gr.update(visible=total_pages > 1)
+    return area_name, sigungu_name, category_name, page_to_go, total_pages, places_info, radio_update, pagination_numbers_update, first_btn_update, prev_btn_update, next_btn_update, last_btn_update, pagination_row_update
 
-        return area_name, sigungu_name, category_name, page_to_go, total_pages, places_info, radio_update, pagination_numbers_update, first_btn_update, prev_btn_update, next_btn_update, last_btn_update, pagination_row_update
+def _page_view_error(area_name, sigungu_name, category_name):
+    return area_name, sigungu_name, category_name, 1, 1, {}, gr.update(choices=[], value=None), gr.update(choices=[], value=None), gr.update(interactive=False), gr.update(interactive=False), gr.update(interactive=False), gr.update(interactive=False), gr.update(visible=False)
+
+def _page_key(area_name, sigungu_name, category_name, page_to_go):
+    area_code = AREA_CODES.get(area_name)
+    content_type_id = CONTENT_TYPE_CODES.get(category_name)
+    sigungu_code = resolve_sigungu_code(area_code, sigungu_name)
+    return area_code, sigungu_code, content_type_id, int(page_to_go), ROWS_PER_PAGE
+
+@traced_handler("update_page_view")
+async def update_page_view_async(area_name, sigungu_name, category_name, page_to_go):
+    """페이지네이션의 핵심 로직: 모든 필터를 적용해 세션 간 공유 페이지 캐시에서 페이지를 조회하고 UI를 갱신합니다."""
+    try:
+        # 시군구 코드표가 없거나 오래되면 areaCode2를 동기로 호출하므로 작업 스레드에서 처리
+        page_key = await asyncio.to_thread(_page_key, area_name, sigungu_name, category_name, page_to_go)
+        with span("area_page_cache.get_page", page=page_key[3]):
+            page = await area_page_cache.get_page_async(*page_key)
+        return _page_view_outputs(area_name, sigungu_name, category_name, page_key[3], page)
 
     except Exception as e:
-        print(f"[update_page_view error] {e}")
-        return area_name, sigungu_name, category_name, 1, 1, {}, gr.update(choices=[], value=None), gr.update(choices=[], value=None), gr.update(interactive=False), gr.update(interactive=False), gr.update(interactive=False), gr.update(interactive=False), gr.update(visible=False)
\ No newline at end of file
+        print(f"[update_page_view_async error] {e}")
+        return _page_view_error(area_name, sigungu_name, category_name)
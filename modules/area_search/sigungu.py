@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+import time
+
+from utils import common_params, session, BASE_URL, get_api_items
+from modules.api_cache import CACHE_DIR
+
+# --- 시군구 코드표 설정 ---
+# 배포 시 함께 제공할 수 있는 코드표 스냅샷 (python -m modules.area_search.sigungu 로 생성)
+BUNDLED_SIGUNGU_PATH = os.path.join(os.path.dirname(__file__), "sigungu_codes.json")
+SIGUNGU_CACHE_PATH = os.path.join(CACHE_DIR, "sigungu_codes.json")
+SIGUNGU_CACHE_MAX_AGE = 30 * 24 * 3600
+
+
+class SigunguRegistry:
+    """지역 코드별 {시군구 이름: 시군구 코드} 표를 메모리에 보관합니다.
+
+    메모리 -> 디스크 캐시 -> 번들 스냅샷 -> areaCode2 API 순서로 찾고,
+    API에서 받은 결과는 디스크 캐시에 기록해 재시작 후에도 재사용합니다.
+    """
+
+    def __init__(self, cache_path=SIGUNGU_CACHE_PATH, bundled_path=BUNDLED_SIGUNGU_PATH, max_age=SIGUNGU_CACHE_MAX_AGE):
+        self.cache_path = cache_path
+        self.bundled_path = bundled_path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._fetched_at = {}
+        self._load_file(self.bundled_path)
+        self._load_file(self.cache_path)
+
+    def _load_file(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"[SigunguRegistry] 코드표 파일을 읽을 수 없습니다 ({path}): {e}")
+            return
+        for area_code, entry in data.items():
+            self._tables[str(area_code)] = dict(entry.get('codes', {}))
+            self._fetched_at[str(area_code)] = entry.get('fetched_at', 0)
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            data = {
+                area_code: {'fetched_at': self._fetched_at.get(area_code, 0), 'codes': codes}
+                for area_code, codes in self._tables.items()
+            }
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"[SigunguRegistry] 코드표 캐시 저장 중 오류: {e}")
+
+    def _fetch(self, area_code):
+        params = {**common_params, "areaCode": area_code, "numOfRows": "100"}
+        response = session.get(f"{BASE_URL}areaCode2", params=params)
+        response.raise_for_status()
+        items = get_api_items(response.json())
+        return {
+            item['name']: item['code']
+            for item in items
+            if isinstance(item, dict) and 'name' in item and 'code' in item
+        }
+
+    def get(self, area_code):
+        """지역 코드의 시군구 표({이름: 코드}, API 응답 순서 유지)를 반환합니다."""
+        if area_code is None:
+            return {}
+        key = str(area_code)
+        table = self._tables.get(key)
+        if table is not None and time.time() - self._fetched_at.get(key, 0) < self.max_age:
+            return table
+
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None and time.time() - self._fetched_at.get(key, 0) < self.max_age:
+                return table
+            try:
+                fetched = self._fetch(area_code)
+            except Exception as e:
+                if table is not None:
+                    # 오래된 코드표라도 있으면 그대로 사용
+                    print(f"[SigunguRegistry] 코드표 갱신 실패, 기존 코드표 사용 (areaCode={area_code}): {e}")
+                    return table
+                raise
+            if not fetched and table is not None:
+                return table
+            self._tables[key] = fetched
+            self._fetched_at[key] = time.time()
+            self._save_cache()
+            return fetched
+
+    def resolve(self, area_code, sigungu_name):
+        """시군구 이름을 코드로 바꿉니다. '전체'이거나 찾을 수 없으면 None을 반환합니다."""
+        if not sigungu_name or sigungu_name == "전체":
+            return None
+        return self.get(area_code).get(sigungu_name)
+
+    def export_bundle(self, area_codes, path=None):
+        """주어진 지역들의 코드표를 번들 스냅샷 파일로 저장합니다."""
+        path = path or self.bundled_path
+        data = {}
+        for area_code in area_codes:
+            data[str(area_code)] = {'fetched_at': time.time(), 'codes': self.get(area_code)}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        return path
+
+
+sigungu_registry = SigunguRegistry()
+
+
+def get_sigungu_codes(area_code):
+    """지역 코드의 {시군구 이름: 코드} 표를 반환합니다."""
+    return sigungu_registry.get(area_code)
+
+
+def resolve_sigungu_code(area_code, sigungu_name):
+    """시군구 이름을 코드로 바꿉니다. '전체'이거나 찾을 수 없으면 None을 반환합니다."""
+    return sigungu_registry.resolve(area_code, sigungu_name)
+
+
+if __name__ == '__main__':
+    # 번들 코드표 스냅샷 생성
+    from modules.area_search.controls import AREA_CODES
+    saved_path = sigungu_registry.export_bundle(AREA_CODES.values())
+    print(f"시군구 코드표를 저장했습니다: {saved_path}")
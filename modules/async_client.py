@@ -0,0 +1,74 @@
+import asyncio
+import os
+import ssl
+import weakref
+
+import certifi
+import httpx
+
+from modules.http_client import get_upstream, DEFAULT_TIMEOUT
+from modules.api_cache import endpoint_from_url, is_cacheable
+from utils import tour_api_cache
+
+# --- 비동기 HTTP 클라이언트 설정 ---
+# 이벤트 루프 하나가 여러 사용자의 요청을 동시에 처리하므로 연결 풀을 넉넉하게 둡니다.
+ASYNC_MAX_CONNECTIONS = int(os.getenv("TOURLENS_ASYNC_MAX_CONNECTIONS", "64"))
+ASYNC_MAX_KEEPALIVE = int(os.getenv("TOURLENS_ASYNC_MAX_KEEPALIVE", "32"))
+ASYNC_TIMEOUT = httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0])
+
+# 이벤트 루프별 클라이언트 ({루프: {이름: AsyncClient}}). httpx 클라이언트는 만든 루프에서만 사용할 수 있습니다.
+_clients = weakref.WeakKeyDictionary()
+
+
+def _tour_api_ssl_context():
+    # TourAPI 서버는 낮은 보안 수준의 암호화 방식만 지원하므로 동기 세션(CustomAdapter)과 같이 SECLEVEL=1 사용
+    context = ssl.create_default_context(cafile=certifi.where())
+    context.set_ciphers('DEFAULT@SECLEVEL=1')
+    return context
+
+
+def _create_client(name):
+    limits = httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_MAX_KEEPALIVE)
+    verify = _tour_api_ssl_context() if name == "tourapi" else True
+    return httpx.AsyncClient(limits=limits, timeout=ASYNC_TIMEOUT, verify=verify)
+
+
+def get_async_client(name):
+    """현재 이벤트 루프에서 사용할 연결 풀 클라이언트를 반환합니다. (name: "tourapi" 또는 "naver")"""
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(name)
+    if client is None or client.is_closed:
+        client = clients[name] = _create_client(name)
+    return client
+
+
+async def close_async_clients():
+    """현재 이벤트 루프의 클라이언트를 모두 닫습니다."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def _build_cached_response(url, params, body):
+    return httpx.Response(
+        200,
+        content=body,
+        headers={'Content-Type': 'application/json;charset=UTF-8', 'X-Cache': 'HIT'},
+        request=httpx.Request('GET', url, params=params),
+    )
+
+
+async def tour_api_get(url, params):
+    """TourAPI GET 요청을 비동기로 보냅니다. 동기 세션과 같은 응답 캐시와 호출 정책을 사용합니다."""
+    endpoint = endpoint_from_url(url)
+    # SQLite 캐시 조회/저장은 이벤트 루프를 막지 않도록 작업 스레드에서
+    body = await asyncio.to_thread(tour_api_cache.get, endpoint, params)
+    if body is not None:
+        return _build_cached_response(url, params, body)
+
+    client = get_async_client("tourapi")
+    response = await get_upstream("tourapi").send_async(lambda: client.get(url, params=params), endpoint=endpoint)
+    if is_cacheable(response):
+        await asyncio.to_thread(tour_api_cache.put, endpoint, params, response.content)
+    return response
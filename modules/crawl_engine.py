@@ -0,0 +1,326 @@
+import hashlib
+import json
+import math
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import common_params, session, BASE_URL, get_api_items, DETAIL_FETCH_WORKERS
+from modules.api_cache import CACHE_DIR
+from modules.location_search.spatial_index import spatial_index
+
+# --- 크롤 엔진 설정 ---
+LIST_PAGE_SIZE = 100
+MAX_ITEMS_IN_FLIGHT = 256  # 목록 단계가 싱크보다 앞서 나갈 수 있는 최대 아이템 수
+CRAWL_STORE_DIR = os.path.join(CACHE_DIR, "crawls")
+CRAWL_STORE_TTL = int(os.getenv("TOURLENS_CRAWL_STORE_TTL", str(6 * 3600)))
+
+# item: 목록 API 원본, details: item + detailCommon2 + detailIntro2 병합 결과,
+# info_items: detailInfo2 item 리스트, error: 상세 조회 중 발생한 오류 메시지(없으면 None)
+CrawlRecord = namedtuple("CrawlRecord", ["item", "details", "info_items", "error"])
+
+_END = object()
+DETAIL_APIS = ("detailCommon2", "detailIntro2", "detailInfo2")
+
+
+def _detail_requests(content_id, content_type_id):
+    return [
+        ("detailCommon2", {**common_params, "contentId": content_id, "defaultYN": "Y", "firstImageYN": "Y", "areacodeYN": "Y", "catcodeYN": "Y", "addrinfoYN": "Y", "mapinfoYN": "Y", "overviewYN": "Y"}),
+        ("detailIntro2", {**common_params, "contentId": content_id, "contentTypeId": content_type_id}),
+        ("detailInfo2", {**common_params, "contentId": content_id, "contentTypeId": content_type_id}),
+    ]
+
+
+def fetch_detail_items(api_name, params):
+    """상세 API 한 건을 호출하여 item 리스트를 반환합니다. HTTP 오류는 예외로 전달됩니다."""
+    response = session.get(f"{BASE_URL}{api_name}", params=params)
+    response.raise_for_status()
+    if not response.text or not response.text.strip():
+        return []
+    return get_api_items(response.json())
+
+
+def fetch_item_details(item, call_executor):
+    """아이템 하나의 상세 API 3종을 동시에 호출하여 CrawlRecord를 만듭니다."""
+    content_id = item.get('contentid')
+    if not content_id:
+        return CrawlRecord(item, dict(item), [], None)
+
+    futures = [
+        call_executor.submit(fetch_detail_items, api_name, params)
+        for api_name, params in _detail_requests(content_id, item.get('contenttypeid'))
+    ]
+    details = dict(item)
+    info_items = []
+    errors = []
+    for api_name, future in zip(DETAIL_APIS, futures):
+        try:
+            res_items = future.result()
+        except Exception as e:
+            errors.append(f"{api_name}: {e}")
+            continue
+        if api_name == "detailInfo2":
+            info_items = [info_item for info_item in res_items if isinstance(info_item, dict)]
+        else:
+            for res_item in res_items:
+                if isinstance(res_item, dict):
+                    details.update(res_item)
+    return CrawlRecord(item, details, info_items, "; ".join(errors) or None)
+
+
+def _area_list_params(area_code, sigungu_code, content_type_id):
+    params = {**common_params, "areaCode": area_code}
+    if sigungu_code:
+        params["sigunguCode"] = sigungu_code
+    if content_type_id:
+        params["contentTypeId"] = content_type_id
+    return params
+
+
+def fetch_total_count(area_code, sigungu_code, content_type_id):
+    """areaBasedList2의 totalCount를 조회합니다."""
+    params = {**_area_list_params(area_code, sigungu_code, content_type_id), "numOfRows": 1, "pageNo": 1}
+    response = session.get(f"{BASE_URL}areaBasedList2", params=params)
+    response.raise_for_status()
+    body = response.json().get('response', {}).get('body', {})
+    return body.get('totalCount', 0) if isinstance(body, dict) else 0
+
+
+def iter_area_items(area_code, sigungu_code, content_type_id, total_count):
+    """areaBasedList2를 페이지 단위로 순회하며 아이템을 하나씩 반환합니다."""
+    params = _area_list_params(area_code, sigungu_code, content_type_id)
+    total_pages = math.ceil(total_count / LIST_PAGE_SIZE)
+    for page_no in range(1, total_pages + 1):
+        response = session.get(f"{BASE_URL}areaBasedList2", params={**params, "numOfRows": LIST_PAGE_SIZE, "pageNo": page_no})
+        response.raise_for_status()
+        yield from get_api_items(response.json())
+
+
+# --- 크롤 결과 공유 저장소 ---
+class CrawlStore:
+    """완료된 크롤 결과를 JSON Lines 파일로 보관하여 같은 조건의 재실행에서 재사용합니다."""
+
+    def __init__(self, directory=CRAWL_STORE_DIR, ttl=CRAWL_STORE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, crawl_key):
+        digest = hashlib.sha256(json.dumps(crawl_key, ensure_ascii=False).encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.directory, f"{digest}.jsonl")
+
+    def load(self, crawl_key):
+        """유효한 저장 결과가 있으면 (레코드 수, 레코드 반복자)를, 없으면 None을 반환합니다."""
+        path = self._path(crawl_key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                meta = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        if meta.get('key') != list(crawl_key) or time.time() - meta.get('completed_at', 0) > self.ttl:
+            return None
+
+        def records():
+            with open(path, encoding='utf-8') as f:
+                f.readline()
+                for line in f:
+                    yield CrawlRecord(**json.loads(line))
+        return meta.get('count', 0), records()
+
+    def writer(self, crawl_key):
+        return _CrawlStoreSink(self._path(crawl_key), crawl_key)
+
+
+class _CrawlStoreSink:
+    """크롤 중 레코드를 임시 파일에 기록하고, 정상 완료 시에만 저장소에 반영하는 싱크."""
+
+    def __init__(self, path, crawl_key):
+        self.path = path
+        self.crawl_key = crawl_key
+        self.count = 0
+        self.error_count = 0  # 상세 조회에 실패한 레코드 수 (하나라도 있으면 저장하지 않음)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        self._body = open(self._tmp_path, 'w', encoding='utf-8')
+
+    def consume(self, record):
+        self._body.write(json.dumps(record._asdict(), ensure_ascii=False))
+        self._body.write("\n")
+        self.count += 1
+        if record.error:
+            self.error_count += 1
+
+    def commit(self):
+        self._body.close()
+        meta = {'key': list(self.crawl_key), 'completed_at': time.time(), 'count': self.count}
+        final_tmp = f"{self._tmp_path}.final"
+        with open(final_tmp, 'w', encoding='utf-8') as out, open(self._tmp_path, encoding='utf-8') as body:
+            out.write(json.dumps(meta, ensure_ascii=False) + "\n")
+            for line in body:
+                out.write(line)
+        os.replace(final_tmp, self.path)
+        os.remove(self._tmp_path)
+
+    def abort(self):
+        self._body.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+crawl_store = CrawlStore()
+
+
+# --- 크롤 파이프라인 ---
+def _report(progress, done, total, desc):
+    if progress is not None and total:
+        progress(min(done / total, 1.0), desc=f"{desc} ({done}/{total})")
+
+
+def run_pipeline(items, sinks, total=None, progress=None, detail_workers=None, desc="상세 정보 수집 중"):
+    """목록 단계 -> 상세 단계 -> 싱크 단계를 제한된 큐로 연결해 실행합니다.
+
+    items는 아이템 반복자(목록 단계)이며 백그라운드 스레드에서 소비됩니다. 상세 단계는
+    detail_workers개의 스레드가 아이템별 상세 API 3종을 동시에 호출하고, 싱크 단계는
+    호출한 스레드에서 입력 순서대로 각 싱크의 consume(record)를 호출합니다.
+    처리한 레코드 수를 반환합니다.
+    """
+    detail_workers = detail_workers or DETAIL_FETCH_WORKERS
+    item_queue = queue.Queue(maxsize=detail_workers * 2)
+    record_queue = queue.Queue(maxsize=detail_workers * 2)
+    window = threading.BoundedSemaphore(MAX_ITEMS_IN_FLIGHT)
+    stop_event = threading.Event()
+    errors = []
+
+    def list_stage():
+        try:
+            seq = 0
+            for item in items:
+                if stop_event.is_set():
+                    break
+                if not isinstance(item, dict):
+                    continue
+                while not window.acquire(timeout=0.5):
+                    if stop_event.is_set():
+                        return
+                item_queue.put((seq, item))
+                seq += 1
+        except Exception as e:
+            errors.append(e)
+        finally:
+            for _ in range(detail_workers):
+                item_queue.put(_END)
+
+    def detail_stage(call_executor):
+        try:
+            while True:
+                entry = item_queue.get()
+                if entry is _END:
+                    return
+                seq, item = entry
+                record = CrawlRecord(item, dict(item), [], "cancelled")
+                if not stop_event.is_set():
+                    try:
+                        record = fetch_item_details(item, call_executor)
+                    except Exception as e:
+                        # 작업자는 남은 아이템을 계속 비워 목록 단계가 멈추지 않게 하고, 전체 수집은 중단
+                        errors.append(e)
+                        stop_event.set()
+                record_queue.put((seq, record))
+        finally:
+            # 어떤 경우에도 싱크 단계가 이 작업자의 끝을 기다리며 멈추지 않도록 종료 표시를 보냄
+            record_queue.put(_END)
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=detail_workers * 3, thread_name_prefix="crawl-call") as call_executor, \
+            ThreadPoolExecutor(max_workers=detail_workers + 1, thread_name_prefix="crawl-stage") as stage_executor:
+        stage_executor.submit(list_stage)
+        for _ in range(detail_workers):
+            stage_executor.submit(detail_stage, call_executor)
+
+        pending = {}
+        next_seq = 0
+        finished_workers = 0
+        try:
+            while finished_workers < detail_workers:
+                entry = record_queue.get()
+                if entry is _END:
+                    finished_workers += 1
+                    continue
+                seq, record = entry
+                pending[seq] = record
+                while next_seq in pending:
+                    record = pending.pop(next_seq)
+                    for sink in sinks:
+                        sink.consume(record)
+                    window.release()
+                    next_seq += 1
+                    done += 1
+                    _report(progress, done, total, desc)
+        except BaseException:
+            stop_event.set()
+            # 남은 단계들이 멈출 수 있도록 큐를 비움
+            while finished_workers < detail_workers:
+                if record_queue.get() is _END:
+                    finished_workers += 1
+            raise
+
+    if errors:
+        raise errors[0]
+    return done
+
+
+def crawl_area(area_code, sigungu_code, content_type_id, sinks, progress=None, use_store=True, detail_workers=None):
+    """지역 조건의 전체 목록과 상세 정보를 수집해 sinks에 전달하고, 레코드 수를 반환합니다.
+
+    같은 조건의 완료된 크롤 결과가 저장소에 남아 있으면 API를 다시 호출하지 않고 재생합니다.
+    """
+    crawl_key = ("areaBasedList2", area_code, sigungu_code, content_type_id)
+    # 수집한 목록의 좌표(mapx/mapy)는 내 위치 검색용 공간 인덱스에도 넣음
+    sinks = list(sinks) + [spatial_index]
+    if use_store:
+        stored = crawl_store.load(crawl_key)
+        if stored is not None:
+            total, records = stored
+            done = 0
+            for record in records:
+                for sink in sinks:
+                    sink.consume(record)
+                done += 1
+                _report(progress, done, total, "저장된 수집 결과 불러오는 중")
+            return done
+
+    if progress is not None:
+        progress(0, desc="전체 데이터 개수 확인 중...")
+    total_count = fetch_total_count(area_code, sigungu_code, content_type_id)
+    if total_count == 0:
+        return 0
+
+    store_sink = crawl_store.writer(crawl_key) if use_store else None
+    all_sinks = sinks + ([store_sink] if store_sink else [])
+    try:
+        done = run_pipeline(
+            iter_area_items(area_code, sigungu_code, content_type_id, total_count),
+            all_sinks, total=total_count, progress=progress, detail_workers=detail_workers,
+            desc="관광지 목록 및 상세 정보 수집 중",
+        )
+    except BaseException:
+        if store_sink:
+            store_sink.abort()
+        raise
+    if store_sink:
+        # 일시적인 API 장애로 빠진 상세 정보를 TTL 동안 재생하지 않도록, 실패한 레코드가 있으면 저장하지 않음
+        if store_sink.error_count:
+            print(f"[crawl_area] 상세 조회 실패 {store_sink.error_count}건이 있어 수집 결과를 저장하지 않습니다.")
+            store_sink.abort()
+        else:
+            store_sink.commit()
+    return done
+
+
+def crawl_items(items_list, sinks, progress=None, detail_workers=None):
+    """이미 가진 아이템 목록에 대해 상세 단계와 싱크 단계만 실행합니다."""
+    return run_pipeline(iter(items_list), sinks, total=len(items_list), progress=progress, detail_workers=detail_workers)
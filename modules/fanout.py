@@ -0,0 +1,31 @@
+import asyncio
+import os
+
+from modules.tracing import span
+
+# --- 단계별 제한 시간 (초) ---
+# 독립적인 조회 단계를 동시에 실행하고, 제한 시간을 넘긴 단계는 기다리지 않고 나머지 결과만 먼저 보여줍니다.
+STAGE_TIMEOUTS = {
+    "tourapi": float(os.getenv("TOURLENS_TOURAPI_STAGE_TIMEOUT", "8")),
+    "naver_blog": float(os.getenv("TOURLENS_NAVER_BLOG_STAGE_TIMEOUT", "5")),
+    "naver_trend": float(os.getenv("TOURLENS_NAVER_TREND_STAGE_TIMEOUT", "8")),
+    "plot_render": float(os.getenv("TOURLENS_PLOT_RENDER_STAGE_TIMEOUT", "10")),
+}
+
+
+class StageTimeout(Exception):
+    """단계가 제한 시간 안에 끝나지 않았을 때 발생합니다."""
+
+    def __init__(self, name, timeout):
+        super().__init__(f"{name} 단계가 {timeout:g}초 안에 끝나지 않았습니다.")
+        self.name = name
+        self.timeout = timeout
+
+
+async def run_stage_async(name, timeout, awaitable):
+    """awaitable을 span으로 감싸 최대 timeout초 기다립니다. 시간을 넘기면 취소하고 StageTimeout을 발생시킵니다."""
+    with span(name):
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            raise StageTimeout(name, timeout) from None
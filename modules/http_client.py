@@ -0,0 +1,346 @@
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+import requests.adapters
+import urllib3.connection
+import urllib3.connectionpool
+
+from modules.metrics import metrics
+
+# --- 재시도 설정 ---
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+class TokenBucket:
+    """초당 rate개의 토큰이 채워지는 토큰 버킷. 요청마다 토큰 하나를 소비합니다."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """토큰 하나를 예약하고, 사용 가능해질 때까지 기다려야 하는 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        wait_seconds = self.reserve()
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+
+class AimdLimiter:
+    """AIMD(가산 증가/승산 감소) 방식의 적응형 동시 요청 제한기.
+
+    성공할 때마다 한도를 1/limit씩(대략 왕복 한 번에 1씩) 늘리고, 429/5xx 같은 과부하 신호를
+    받으면 한도를 절반으로 줄여 제공자의 한계 바로 아래에서 동작하도록 합니다.
+    """
+
+    def __init__(self, initial, minimum=1, maximum=32, decrease_factor=0.5, decrease_cooldown=1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters = []  # 자리가 나기를 기다리는 (이벤트 루프, Future)
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self):
+        """acquire()의 asyncio 버전. 자리가 날 때까지 release()가 깨워 줄 Future를 기다립니다."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, throttled=False):
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                # 같은 과부하 구간에서 연속으로 여러 번 줄어들지 않도록 쿨다운 적용
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        # release()는 다른 스레드(동기 호출)에서도 불리므로 각 Future의 이벤트 루프에서 깨움
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake_waiter, waiter)
+            except RuntimeError:
+                pass  # 이미 닫힌 이벤트 루프
+
+
+def _wake_waiter(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _retry_after_seconds(response):
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def endpoint_label(url):
+    """지표에 쓸 엔드포인트 이름. 경로에서 숫자가 아닌 마지막 구간을 사용합니다.
+
+    예) .../KorService2/detailCommon2 -> detailCommon2, .../TbVwAttractions/1/1000/ -> TbVwAttractions
+    """
+    segments = [segment for segment in urlsplit(str(url)).path.split("/") if segment]
+    while segments and segments[-1].isdigit():
+        segments.pop()
+    return segments[-1] if segments else "/"
+
+
+def _body_size(response):
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit():
+        return int(length)
+    try:
+        return len(response.content)
+    except Exception:
+        return 0
+
+
+class Upstream:
+    """외부 API 제공자 하나에 대한 호출 정책 (토큰 버킷 + AIMD 동시성 + 지수 백오프 재시도)."""
+
+    def __init__(self, name, rate, initial_concurrency, max_concurrency, max_retries=4, base_delay=0.5, max_delay=20.0):
+        self.name = name
+        self.bucket = TokenBucket(rate)
+        self.limiter = AimdLimiter(initial_concurrency, maximum=max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.throttled = 0
+        metrics.register_stats("upstream_limiter", self.stats, counters=("retries", "throttled"), labels={"upstream": name})
+
+    def backoff_delay(self, attempt, response=None):
+        """지터가 포함된 지수 백오프 대기 시간. Retry-After 헤더가 있으면 우선합니다."""
+        retry_after = _retry_after_seconds(response)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _observe(self, endpoint, started, response=None):
+        status = "error" if response is None else response.status_code
+        size = 0 if response is None else _body_size(response)
+        metrics.observe_request(self.name, endpoint, status, time.perf_counter() - started, size)
+
+    def send(self, do_request, endpoint="-"):
+        """do_request()를 정책에 따라 호출하고 응답을 반환합니다.
+
+        429/5xx 응답과 연결 오류는 최대 max_retries번까지 백오프 후 재시도하며,
+        마지막 시도의 응답(또는 예외)을 그대로 돌려줍니다. 각 시도는 endpoint 이름으로 지표에 기록됩니다.
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self.limiter.acquire()
+            response = None
+            started = time.perf_counter()
+            try:
+                response = do_request()
+                self._observe(endpoint, started, response)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._observe(endpoint, started)
+                self.limiter.release(throttled=True)
+                if attempt >= self.max_retries:
+                    raise
+            except Exception:
+                self._observe(endpoint, started)
+                self.limiter.release()
+                raise
+            else:
+                throttled = response.status_code in RETRY_STATUS_CODES
+                self.limiter.release(throttled=throttled)
+                if not throttled or attempt >= self.max_retries:
+                    return response
+                if response.status_code in THROTTLE_STATUS_CODES:
+                    self.throttled += 1
+
+            delay = self.backoff_delay(attempt, response)
+            attempt += 1
+            self.retries += 1
+            metrics.record_retry(self.name, endpoint)
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+    async def send_async(self, do_request, endpoint="-"):
+        """send()의 asyncio 버전. do_request는 코루틴을 반환하는 함수이며, 대기 중에도 이벤트 루프를 막지 않습니다.
+
+        동기 호출과 같은 토큰 버킷과 동시성 한도를 공유합니다.
+        """
+        attempt = 0
+        while True:
+            wait_seconds = self.bucket.reserve()
+            if wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+            await self.limiter.acquire_async()
+            response = None
+            started = time.perf_counter()
+            try:
+                response = await do_request()
+                self._observe(endpoint, started, response)
+            except httpx.TransportError:
+                self._observe(endpoint, started)
+                self.limiter.release(throttled=True)
+                if attempt >= self.max_retries:
+                    raise
+            except Exception:
+                self._observe(endpoint, started)
+                self.limiter.release()
+                raise
+            else:
+                throttled = response.status_code in RETRY_STATUS_CODES
+                self.limiter.release(throttled=throttled)
+                if not throttled or attempt >= self.max_retries:
+                    return response
+                if response.status_code in THROTTLE_STATUS_CODES:
+                    self.throttled += 1
+
+            delay = self.backoff_delay(attempt, response)
+            attempt += 1
+            self.retries += 1
+            metrics.record_retry(self.name, endpoint)
+            if response is not None:
+                await response.aclose()
+            await asyncio.sleep(delay)
+
+    def stats(self):
+        return {
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "retries": self.retries,
+            "throttled": self.throttled,
+        }
+
+
+def _env_float(name, default):
+    return float(os.getenv(name, str(default)))
+
+
+# 제공자별 기본 호출 정책 (환경 변수로 초당 요청 수 조정 가능)
+UPSTREAMS = {
+    "tourapi": Upstream("tourapi", rate=_env_float("TOURLENS_RATE_TOURAPI", 20), initial_concurrency=8, max_concurrency=int(os.getenv("TOURLENS_TOURAPI_MAX_CONCURRENCY", "16"))),
+    "naver_search": Upstream("naver_search", rate=_env_float("TOURLENS_RATE_NAVER_SEARCH", 10), initial_concurrency=4, max_concurrency=16),
+    "naver_datalab": Upstream("naver_datalab", rate=_env_float("TOURLENS_RATE_NAVER_DATALAB", 5), initial_concurrency=2, max_concurrency=8),
+    "seoul": Upstream("seoul", rate=_env_float("TOURLENS_RATE_SEOUL", 10), initial_concurrency=4, max_concurrency=16),
+}
+
+
+def get_upstream(name):
+    return UPSTREAMS[name]
+
+
+# --- 연결 수립(TCP + TLS 핸드셰이크) 계측 ---
+# 연결 풀이 제대로 재사용되면 요청 수가 늘어도 호스트별 연결 수는 풀 크기 근처에서 멈춥니다.
+class _TimedHTTPConnection(urllib3.connection.HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        metrics.observe_connection(self.host, time.perf_counter() - started)
+
+
+class _TimedHTTPSConnection(urllib3.connection.HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        metrics.observe_connection(self.host, time.perf_counter() - started)
+
+
+class _TimedHTTPConnectionPool(urllib3.connectionpool.HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(urllib3.connectionpool.HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+# 연결 시간 제한, 응답 읽기 시간 제한 (초)
+DEFAULT_TIMEOUT = (
+    _env_float("TOURLENS_HTTP_CONNECT_TIMEOUT", 5),
+    _env_float("TOURLENS_HTTP_READ_TIMEOUT", 30),
+)
+
+
+class ThrottledAdapter(requests.adapters.HTTPAdapter):
+    """세션에 마운트하면 모든 요청이 해당 제공자의 호출 정책(속도 제한/재시도/적응형 동시성)을 거칩니다."""
+
+    def __init__(self, upstream, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.upstream = upstream
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        # 새 연결마다 핸드셰이크 시간을 metrics에 기록
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return self.upstream.send(lambda: self._send_once(request, **kwargs), endpoint=endpoint_label(request.url))
+
+    def _send_once(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if not kwargs.get("stream"):
+            # 본문 수신 시간까지 지연 시간에 포함되도록 여기서 읽어 둠 (Session도 어차피 바로 읽음)
+            response.content
+        return response
+
+
+def make_session(upstream, pool_maxsize, prefixes=("https://",), timeout=DEFAULT_TIMEOUT, adapter_class=ThrottledAdapter):
+    """upstream 호출 정책이 적용된 keep-alive 연결 풀 세션을 만듭니다.
+
+    세션은 여러 스레드에서 함께 사용하며, 호스트당 최대 pool_maxsize개의 연결을 재사용합니다.
+    """
+    session = requests.Session()
+    adapter = adapter_class(upstream, pool_connections=2, pool_maxsize=pool_maxsize, timeout=timeout)
+    for prefix in prefixes:
+        session.mount(prefix, adapter)
+    return session
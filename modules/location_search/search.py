@@ -1,24 +1,125 @@
+import asyncio
+import math
+import os
 import gradio as gr
-from utils import session, common_params, BASE_URL, get_api_items
+import numpy as np
+from utils import common_params, BASE_URL, get_api_items
+from modules.async_client import tour_api_get
+from modules.area_search.controls import CONTENT_TYPE_CODES
+from modules.location_search.spatial_index import spatial_index, parse_coordinates, haversine_m
+from modules.tracing import span, traced_handler
 
-def find_nearby_places(latitude, longitude):
-    if not latitude or not longitude: return gr.update(choices=[], value=None), {}
+# --- 주변 검색 설정 ---
+NEARBY_RADIUS_KM = 5
+NEARBY_MAX_RADIUS_KM = 20  # locationBasedList2가 허용하는 최대 반경
+NEARBY_ROWS_PER_PAGE = 10
+NEARBY_FETCH_ROWS = 100  # 인덱스를 채울 때 locationBasedList2 한 번에 받을 개수
+# 반경 안 관광지가 이보다 많으면 가까운 순으로 일부만 받고, 받은 범위까지만 보여 줌
+NEARBY_MAX_FETCH_PAGES = int(os.getenv("TOURLENS_NEARBY_MAX_FETCH_PAGES", "10"))
+
+def _nearby_params(latitude, longitude, radius_m, content_type_id, page_no):
+    params = {**common_params, "mapX": str(longitude), "mapY": str(latitude), "radius": str(radius_m),
+              "arrange": "E", "numOfRows": NEARBY_FETCH_ROWS, "pageNo": page_no}
+    if content_type_id:
+        params["contentTypeId"] = content_type_id
+    return params
+
+def _parse_nearby_page(response):
+    response.raise_for_status()
+    data = response.json()
+
+    body = data.get('response', {}).get('body', {})
+    if not isinstance(body, dict): body = {}
+    return body.get('totalCount', 0), get_api_items(data)
+
+def _nearby_query(latitude, longitude, radius_km, category_name):
+    radius_km = min(max(float(radius_km or NEARBY_RADIUS_KM), 0.1), NEARBY_MAX_RADIUS_KM)
+    return float(latitude), float(longitude), int(radius_km * 1000), CONTENT_TYPE_CODES.get(category_name)
+
+def _fetched_extent_m(latitude, longitude, items):
+    """가까운 순으로 받은 아이템 중 가장 먼 곳까지의 거리(m). 이 거리 안은 빠짐없이 받은 것입니다."""
+    coordinates = [c for c in map(parse_coordinates, items) if c is not None]
+    if not coordinates:
+        return 0
+    lats, lons = zip(*coordinates)
+    return float(haversine_m(latitude, longitude, np.array(lats), np.array(lons)).max())
+
+def _record_fetched(latitude, longitude, radius_m, content_type_id, total_count, items, pages_fetched):
+    """받은 아이템을 인덱스에 넣고 빠짐없이 받은 반경을 기록한 뒤, 그 반경(m)을 반환합니다."""
+    spatial_index.add_items(items)
+    if pages_fetched * NEARBY_FETCH_ROWS >= total_count:
+        covered_m = radius_m
+    else:
+        covered_m = min(_fetched_extent_m(latitude, longitude, items), radius_m)
+    spatial_index.mark_covered(latitude, longitude, covered_m, content_type_id, requested_m=radius_m)
+    return covered_m
+
+async def fill_spatial_index_async(latitude, longitude, radius_m, content_type_id=None):
+    """인덱스가 처리하지 못하는 반경이면 locationBasedList2를 가까운 순으로 호출해 인덱스를 채웁니다.
+
+    첫 페이지로 전체 개수를 확인한 뒤 나머지 페이지는 동시에 받습니다.
+    인덱스만으로 빠짐없이 조회할 수 있는 반경(m)을 반환하며, 결과가 많아 일부만 받았으면 radius_m보다 작습니다.
+    """
+    covered_m = spatial_index.covered_radius(latitude, longitude, radius_m, content_type_id)
+    if covered_m is not None:
+        return covered_m
+    url = f"{BASE_URL}locationBasedList2"
+    total_count, items = _parse_nearby_page(await tour_api_get(url, _nearby_params(latitude, longitude, radius_m, content_type_id, 1)))
+    total_pages = min(math.ceil(total_count / NEARBY_FETCH_ROWS), NEARBY_MAX_FETCH_PAGES)
+    responses = await asyncio.gather(*(
+        tour_api_get(url, _nearby_params(latitude, longitude, radius_m, content_type_id, page_no))
+        for page_no in range(2, total_pages + 1)
+    ))
+    for response in responses:
+        items.extend(_parse_nearby_page(response)[1])
+    return _record_fetched(latitude, longitude, radius_m, content_type_id, total_count, items, max(total_pages, 1))
+
+def _format_distance(distance_m):
+    return f"{distance_m:.0f}m" if distance_m < 1000 else f"{distance_m / 1000:.1f}km"
+
+def _nearby_outputs(query, page_to_go, result, covered_m):
+    """인덱스 조회 결과로 상태 값과 UI 업데이트 튜플을 만듭니다.
+
+    places_info에는 반경 안 전체 결과를 담고(트렌드 저장용), 라디오 목록에는 현재 페이지만 보여 줍니다.
+    """
+    total_pages = max(math.ceil(result.total_count / NEARBY_ROWS_PER_PAGE), 1)
+    start = (page_to_go - 1) * NEARBY_ROWS_PER_PAGE
+
+    places_info = {}
+    choices = []
+    for rank, (distance_m, item) in enumerate(result.places):
+        if 'title' not in item or item['title'] in places_info: continue
+        places_info[item['title']] = (item['contentid'], item['contenttypeid'])
+        if start <= rank < start + NEARBY_ROWS_PER_PAGE:
+            choices.append((f"{item['title']} ({_format_distance(distance_m)})", item['title']))
+
+    area = f"반경 {query[2]:g}km 안"
+    if covered_m < query[2] * 1000:
+        area = f"반경 {query[2]:g}km 중 결과가 많아 가까운 {_format_distance(covered_m)} 안"
+    page_info = f"{area} {result.total_count}곳 · {page_to_go}/{total_pages} 페이지 (가까운 순)"
+    return (query, page_to_go, total_pages, places_info,
+            gr.update(choices=choices, value=None), page_info,
+            gr.update(interactive=page_to_go > 1), gr.update(interactive=page_to_go < total_pages),
+            gr.update(visible=total_pages > 1))
+
+def _nearby_empty(query=None, message=""):
+    return (query, 1, 1, {}, gr.update(choices=[], value=None), message,
+            gr.update(interactive=False), gr.update(interactive=False), gr.update(visible=False))
+
+@traced_handler("find_nearby_places")
+async def find_nearby_places_async(latitude, longitude, radius_km=NEARBY_RADIUS_KM, category_name="전체", page_to_go=1):
+    """좌표 주변 관광지를 공간 인덱스에서 가까운 순으로 조회해 한 페이지를 보여 줍니다. 인덱스에 없는 지역은 API로 채웁니다."""
+    if not latitude or not longitude: return _nearby_empty()
+    query = [latitude, longitude, radius_km, category_name]
     try:
-        params = {**common_params, "mapX": str(longitude), "mapY": str(latitude), "radius": "5000", "numOfRows": "20"}
-        response = session.get(f"{BASE_URL}locationBasedList2", params=params)
-        response.raise_for_status()
-        
-        items = get_api_items(response.json())
-        
-        if not items: return gr.update(choices=[], value=None), {}
-        
-        places_info = {
-            item['title']: (item['contentid'], item['contenttypeid']) 
-            for item in items 
-            if isinstance(item, dict) and 'title' in item
-        }
-        
-        return gr.update(choices=list(places_info.keys()), value=None), places_info
+        lat, lon, radius_m, content_type_id = _nearby_query(latitude, longitude, radius_km, category_name)
+        query[2] = radius_m / 1000
+        with span("spatial_index.fill"):
+            covered_m = await fill_spatial_index_async(lat, lon, radius_m, content_type_id)
+        page_to_go = max(int(page_to_go), 1)
+        with span("spatial_index.query_radius", page=page_to_go):
+            result = spatial_index.query_radius(lat, lon, covered_m, content_type_id)
+        return _nearby_outputs(query, page_to_go, result, covered_m)
     except Exception as e:
-        print(f"[find_nearby_places error] {e}")
-        return gr.update(choices=[], value=None), {}
\ No newline at end of file
+        print(f"[find_nearby_places_async error] {e}")
+        return _nearby_empty(query, "주변 관광지를 불러오지 못했습니다.")
@@ -0,0 +1,221 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from modules.metrics import metrics
+
+# --- 공간 인덱스 설정 ---
+SPATIAL_CELL_DEG = float(os.getenv("TOURLENS_SPATIAL_CELL_DEG", "0.01"))  # 격자 한 칸 크기 (위도 0.01도 ≈ 1.1km)
+# 반경 조회 결과를 API 없이 다시 써도 되는 시간 (초)
+SPATIAL_COVERAGE_TTL = int(os.getenv("TOURLENS_SPATIAL_COVERAGE_TTL", str(6 * 3600)))
+# 인덱스에 둘 최대 관광지 수. 넘으면 가장 오래 전에 받은 점부터 지움
+SPATIAL_INDEX_MAX_POINTS = int(os.getenv("TOURLENS_SPATIAL_INDEX_MAX_POINTS", "200000"))
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEG = math.pi * EARTH_RADIUS_M / 180
+
+# 격자 좌표 (행, 열)을 정렬 가능한 정수 하나로 합칠 때 쓰는 값 (경도 -180~180도를 0.001도 격자까지 담을 수 있음)
+_COL_OFFSET = 1 << 20
+_ROW_STRIDE = 1 << 21
+
+# total_count: 조건에 맞는 전체 개수, places: 가까운 순 [(거리 m, 아이템), ...]
+NearbyResult = namedtuple("NearbyResult", ["total_count", "places"])
+# radius_m: 빠짐없이 받은 반경, requested_m: 요청한 반경 (결과가 많아 일부만 받았으면 radius_m보다 큼)
+Coverage = namedtuple("Coverage", ["lat", "lon", "radius_m", "requested_m", "content_type_id", "stored_at"])
+
+
+def parse_coordinates(item):
+    """TourAPI 아이템의 mapy/mapx를 (위도, 경도)로 바꿉니다. 좌표가 없거나 잘못되었으면 None."""
+    try:
+        lat, lon = float(item.get('mapy')), float(item.get('mapx'))
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0):
+        return None
+    return lat, lon
+
+
+def haversine_m(lat, lon, lats, lons):
+    """(lat, lon)에서 lats/lons 배열의 각 지점까지의 거리(m)를 반환합니다."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class _Grid:
+    """한 시점의 좌표 배열을 격자 칸 순서로 정렬해 둔 읽기 전용 스냅샷.
+
+    같은 행의 칸들은 정렬된 키 배열에서 연속 구간이므로, 반경을 감싸는 사각형 안의 점은
+    행마다 searchsorted 두 번으로 찾습니다.
+    """
+
+    def __init__(self, points, cell_deg):
+        self.cell_deg = cell_deg
+        lats = np.fromiter((point[0] for point in points), dtype=np.float64, count=len(points))
+        lons = np.fromiter((point[1] for point in points), dtype=np.float64, count=len(points))
+        keys = self._keys(np.floor(lats / cell_deg).astype(np.int64), np.floor(lons / cell_deg).astype(np.int64))
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.lats = lats[order]
+        self.lons = lons[order]
+        self.content_types = np.array([points[i][2] or "" for i in order], dtype=str)
+        self.items = [points[i][3] for i in order]
+
+    @staticmethod
+    def _keys(rows, cols):
+        return rows * _ROW_STRIDE + (cols + _COL_OFFSET)
+
+    def within(self, lat, lon, radius_m, content_type_id=None):
+        """반경 안의 점 인덱스와 거리를 가까운 순으로 반환합니다."""
+        if not len(self.keys):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        dlat = radius_m / METERS_PER_DEG
+        dlon = radius_m / (METERS_PER_DEG * max(math.cos(math.radians(lat)), 1e-6))
+        row_lo, row_hi = math.floor((lat - dlat) / self.cell_deg), math.floor((lat + dlat) / self.cell_deg)
+        col_lo, col_hi = math.floor((lon - dlon) / self.cell_deg), math.floor((lon + dlon) / self.cell_deg)
+
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64)
+        starts = np.searchsorted(self.keys, self._keys(rows, col_lo), side="left")
+        ends = np.searchsorted(self.keys, self._keys(rows, col_hi), side="right")
+        spans = [np.arange(start, end) for start, end in zip(starts, ends) if end > start]
+        if not spans:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        candidates = np.concatenate(spans)
+        if content_type_id:
+            candidates = candidates[self.content_types[candidates] == str(content_type_id)]
+
+        distances = haversine_m(lat, lon, self.lats[candidates], self.lons[candidates])
+        inside = distances <= radius_m
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+
+class SpatialIndex:
+    """수집한 관광지 좌표(mapx/mapy)로 만든 메모리 공간 인덱스 (격자 버킷 + NumPy 배열).
+
+    반경 조회와 가장 가까운 k개 조회를 API 호출 없이 처리합니다. 점이 추가되면 다음 조회 때
+    격자 스냅샷을 다시 만들고, 조회는 잠금 없이 스냅샷을 읽습니다. 어느 반경의 결과를 빠짐없이
+    받아 두었는지(coverage)를 따로 기록해, 받아 두지 않은 지역은 호출한 쪽이 API로 채우도록 합니다.
+    점 수는 max_points까지만 두고, 넘으면 오래된 점과 그 점이 속한 coverage를 지웁니다.
+    """
+
+    def __init__(self, cell_deg=SPATIAL_CELL_DEG, coverage_ttl=SPATIAL_COVERAGE_TTL, max_points=SPATIAL_INDEX_MAX_POINTS):
+        self.cell_deg = cell_deg
+        self.coverage_ttl = coverage_ttl
+        self.max_points = max_points
+        self._lock = threading.Lock()
+        self._points = OrderedDict()  # contentid -> (위도, 경도, contenttypeid, 아이템), 오래 전에 받은 순
+        self._coverage = []
+        self._grid = None  # 점이 바뀌면 None으로 두고 다음 조회 때 다시 만듦
+
+    def __len__(self):
+        return len(self._points)
+
+    def add_items(self, items):
+        """TourAPI 목록 아이템들을 인덱스에 추가(같은 contentid는 갱신)하고, 추가된 점 수를 반환합니다."""
+        added = 0
+        with self._lock:
+            for item in items:
+                if not isinstance(item, dict) or not item.get('contentid'):
+                    continue
+                coordinates = parse_coordinates(item)
+                if coordinates is None:
+                    continue
+                content_id = str(item['contentid'])
+                self._points[content_id] = (*coordinates, item.get('contenttypeid'), item)
+                self._points.move_to_end(content_id)
+                added += 1
+            if added:
+                self._evict_locked()
+                self._grid = None
+        return added
+
+    def _evict_locked(self):
+        """점 수가 max_points를 넘으면 오래된 점부터 지우고, 지운 점이 들어 있던 coverage도 함께 지웁니다."""
+        overflow = len(self._points) - self.max_points
+        if overflow <= 0:
+            return
+        evicted = [self._points.popitem(last=False)[1] for _ in range(overflow)]
+        lats = np.array([point[0] for point in evicted])
+        lons = np.array([point[1] for point in evicted])
+        # 지운 점이 들어 있던 반경은 더 이상 빠짐없이 조회할 수 없으므로 다음 검색에서 API로 다시 채움
+        self._coverage = [entry for entry in self._coverage
+                          if not (haversine_m(entry.lat, entry.lon, lats, lons) <= entry.radius_m).any()]
+
+    def consume(self, record):
+        """크롤 파이프라인(modules/crawl_engine.py)의 싱크로 쓸 때 목록 아이템의 좌표를 추가합니다."""
+        self.add_items([record.item])
+
+    def _snapshot(self):
+        grid = self._grid
+        if grid is None:
+            with self._lock:
+                if self._grid is None:
+                    self._grid = _Grid(list(self._points.values()), self.cell_deg)
+                grid = self._grid
+        return grid
+
+    def query_radius(self, lat, lon, radius_m, content_type_id=None, offset=0, limit=None):
+        """반경(m) 안의 관광지를 가까운 순으로 offset부터 limit개 반환합니다. (NearbyResult)"""
+        grid = self._snapshot()
+        indices, distances = grid.within(lat, lon, radius_m, content_type_id)
+        stop = len(indices) if limit is None else offset + limit
+        places = [(float(distance), grid.items[index]) for index, distance in zip(indices[offset:stop], distances[offset:stop])]
+        return NearbyResult(len(indices), places)
+
+    def nearest(self, lat, lon, k, content_type_id=None, max_radius_m=None):
+        """가장 가까운 관광지 k개를 [(거리 m, 아이템), ...]으로 반환합니다. (인덱스에 있는 점 기준)"""
+        grid = self._snapshot()
+        if not len(grid.keys) or k <= 0:
+            return []
+        # 반경 안에 k개 이상 있으면 그 안에 가장 가까운 k개가 모두 들어 있으므로, 반경을 두 배씩 늘려 가며 찾음
+        radius_m = self.cell_deg * METERS_PER_DEG
+        limit_m = max_radius_m or math.pi * EARTH_RADIUS_M
+        while True:
+            radius_m = min(radius_m, limit_m)
+            indices, distances = grid.within(lat, lon, radius_m, content_type_id)
+            if len(indices) >= k or radius_m >= limit_m:
+                return [(float(distance), grid.items[index]) for index, distance in zip(indices[:k], distances[:k])]
+            radius_m *= 2
+
+    def mark_covered(self, lat, lon, radius_m, content_type_id=None, requested_m=None):
+        """(lat, lon) 반경 radius_m 안의 관광지(content_type_id가 없으면 모든 유형)를 빠짐없이 받았다고 기록합니다.
+
+        requested_m 반경을 요청했지만 가까운 순으로 radius_m까지만 받은 경우에는 requested_m을 함께 넘깁니다.
+        """
+        now = time.time()
+        with self._lock:
+            self._coverage = [entry for entry in self._coverage if now - entry.stored_at <= self.coverage_ttl]
+            self._coverage.append(Coverage(lat, lon, radius_m, max(requested_m or radius_m, radius_m), content_type_id or None, now))
+
+    def covered_radius(self, lat, lon, radius_m, content_type_id=None):
+        """인덱스만으로 빠짐없이 조회할 수 있는 반경(m)을 반환합니다. 받아 두지 않은 지역이면 None.
+
+        이전에 요청한 반경 안이지만 결과가 많아 일부만 받아 두었다면, 받아 둔 범위까지로 줄인 반경을 반환합니다.
+        """
+        now = time.time()
+        best = None
+        for entry in self._coverage:
+            if now - entry.stored_at > self.coverage_ttl:
+                continue
+            if entry.content_type_id is not None and entry.content_type_id != content_type_id:
+                continue
+            center_distance = float(haversine_m(entry.lat, entry.lon, np.array([lat]), np.array([lon]))[0])
+            if center_distance + radius_m > entry.requested_m:
+                continue
+            covered = min(radius_m, entry.radius_m - center_distance)
+            if covered > 0 and (best is None or covered > best):
+                best = covered
+        return best
+
+    def stats(self):
+        return {"points": len(self._points), "max_points": self.max_points, "coverage": len(self._coverage)}
+
+
+spatial_index = SpatialIndex()
+metrics.register_stats("spatial_index", spatial_index.stats)
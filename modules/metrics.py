@@ -0,0 +1,324 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# --- 지표 설정 ---
+# 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """고정 구간 누적 히스토그램 (Prometheus histogram과 같은 방식)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def copy(self):
+        other = Histogram(self.buckets)
+        other.counts = list(self.counts)
+        other.total = self.total
+        other.count = self.count
+        return other
+
+    def minus(self, earlier):
+        diff = self.copy()
+        if earlier is not None:
+            diff.counts = [a - b for a, b in zip(self.counts, earlier.counts)]
+            diff.total -= earlier.total
+            diff.count -= earlier.count
+        return diff
+
+    def quantile(self, q):
+        """구간 상한 기준의 근사 분위수를 반환합니다."""
+        if not self.count:
+            return None
+        target = q * self.count
+        running = 0
+        for upper, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            if running >= target:
+                return upper if upper != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = {}
+        self.bytes_received = 0
+        self.retries = 0
+
+    def copy(self):
+        other = _EndpointStats()
+        other.latency = self.latency.copy()
+        other.statuses = dict(self.statuses)
+        other.bytes_received = self.bytes_received
+        other.retries = self.retries
+        return other
+
+
+class MetricsRegistry:
+    """외부 API 호출, 연결 수립, 내부 작업(그래프 렌더링, CSV 작성) 시간을 모으는 프로세스 전역 저장소."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}   # (upstream, endpoint) -> _EndpointStats
+        self._timings = {}     # 작업 이름 -> Histogram
+        self._connections = {}  # 호스트 -> [연결 수, 연결 수립 시간 합계]
+        self._collectors = {}  # (구성 요소, 레이블) -> (stats 함수, 누적 값 필드)
+
+    def _endpoint_locked(self, upstream, endpoint):
+        key = (upstream, endpoint)
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = _EndpointStats()
+        return stats
+
+    def observe_request(self, upstream, endpoint, status, seconds, bytes_received=0):
+        """외부 호출 한 번(재시도 포함 각 시도)의 결과를 기록합니다. status는 HTTP 상태 코드 또는 'error'."""
+        with self._lock:
+            stats = self._endpoint_locked(upstream, endpoint)
+            stats.latency.observe(seconds)
+            status = str(status)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bytes_received += bytes_received
+
+    def record_retry(self, upstream, endpoint):
+        with self._lock:
+            self._endpoint_locked(upstream, endpoint).retries += 1
+
+    def observe_timing(self, name, seconds):
+        with self._lock:
+            histogram = self._timings.get(name)
+            if histogram is None:
+                histogram = self._timings[name] = Histogram()
+            histogram.observe(seconds)
+
+    def observe_connection(self, host, seconds):
+        with self._lock:
+            entry = self._connections.setdefault(host, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def register_stats(self, component, collect, counters=(), labels=None):
+        """구성 요소(응답 캐시, 호출 정책 등)의 stats() 함수를 등록해 요약과 Prometheus 출력에 포함합니다.
+
+        counters에 든 필드는 누적 값(요약에서는 작업 동안의 증가분), 나머지 숫자 필드는 현재 값으로 내보냅니다.
+        """
+        key = (component, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._collectors[key] = (collect, tuple(counters))
+
+    def _collect_components(self):
+        with self._lock:
+            collectors = dict(self._collectors)
+        components = {}
+        for key, (collect, _) in collectors.items():
+            try:
+                components[key] = {field: value for field, value in collect().items() if isinstance(value, (int, float))}
+            except Exception as e:
+                print(f"[metrics] {key[0]} 상태를 읽는 중 오류: {e}")
+        return components
+
+    def _counter_fields(self, key):
+        with self._lock:
+            collector = self._collectors.get(key)
+        return collector[1] if collector else ()
+
+    @contextmanager
+    def timer(self, name):
+        """with 블록의 실행 시간을 name 작업 시간으로 기록합니다."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_timing(name, time.perf_counter() - started)
+
+    def snapshot(self):
+        """현재 누적값의 복사본. summary(since=...)에 넘겨 특정 작업 동안의 변화만 볼 수 있습니다."""
+        components = self._collect_components()
+        with self._lock:
+            return {
+                "endpoints": {key: stats.copy() for key, stats in self._endpoints.items()},
+                "timings": {name: histogram.copy() for name, histogram in self._timings.items()},
+                "connections": {host: list(entry) for host, entry in self._connections.items()},
+                "components": components,
+            }
+
+    def summary(self, since=None):
+        """엔드포인트별 호출 수, 상태 코드, 지연 시간(근사 p50/p95), 수신 바이트, 재시도 수와 작업 시간을 dict로 반환합니다."""
+        current = self.snapshot()
+        since = since or {"endpoints": {}, "timings": {}, "connections": {}, "components": {}}
+
+        endpoints = {}
+        for (upstream, endpoint), stats in sorted(current["endpoints"].items()):
+            earlier = since["endpoints"].get((upstream, endpoint))
+            latency = stats.latency.minus(earlier.latency if earlier else None)
+            if not latency.count and not (stats.retries - (earlier.retries if earlier else 0)):
+                continue
+            statuses = {
+                status: count - (earlier.statuses.get(status, 0) if earlier else 0)
+                for status, count in stats.statuses.items()
+            }
+            endpoints[f"{upstream}/{endpoint}"] = {
+                "requests": latency.count,
+                "statuses": {status: count for status, count in statuses.items() if count},
+                "retries": stats.retries - (earlier.retries if earlier else 0),
+                "bytes_received": stats.bytes_received - (earlier.bytes_received if earlier else 0),
+                "avg_ms": round(latency.total * 1000 / latency.count, 1) if latency.count else None,
+                "p50_ms": _ms(latency.quantile(0.5)),
+                "p95_ms": _ms(latency.quantile(0.95)),
+            }
+
+        timings = {}
+        for name, histogram in sorted(current["timings"].items()):
+            diff = histogram.minus(since["timings"].get(name))
+            if diff.count:
+                timings[name] = {
+                    "count": diff.count,
+                    "total_seconds": round(diff.total, 3),
+                    "avg_ms": round(diff.total * 1000 / diff.count, 1),
+                }
+
+        connections = {}
+        for host, (count, seconds) in sorted(current["connections"].items()):
+            earlier_count, earlier_seconds = since["connections"].get(host, (0, 0.0))
+            if count - earlier_count:
+                connections[host] = {
+                    "connections": count - earlier_count,
+                    "handshake_seconds": round(seconds - earlier_seconds, 4),
+                }
+
+        components = {}
+        for (component, labels), values in sorted(current["components"].items()):
+            counters = self._counter_fields((component, labels))
+            earlier = since.get("components", {}).get((component, labels), {})
+            name = "/".join([component, *(value for _, value in labels)])
+            components[name] = {
+                field: round(value - earlier.get(field, 0), 4) if field in counters else value
+                for field, value in values.items()
+            }
+
+        return {"endpoints": endpoints, "timings": timings, "connections": connections, "components": components}
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식(0.0.4)으로 모든 지표를 반환합니다."""
+        current = self.snapshot()
+        lines = [
+            "# HELP tourlens_upstream_request_seconds Latency of outbound API calls per attempt.",
+            "# TYPE tourlens_upstream_request_seconds histogram",
+        ]
+        for (upstream, endpoint), stats in sorted(current["endpoints"].items()):
+            labels = f'upstream="{_escape(upstream)}",endpoint="{_escape(endpoint)}"'
+            lines.extend(_histogram_lines("tourlens_upstream_request_seconds", labels, stats.latency))
+
+        lines += [
+            "# HELP tourlens_upstream_responses_total Outbound API responses by status code.",
+            "# TYPE tourlens_upstream_responses_total counter",
+        ]
+        for (upstream, endpoint), stats in sorted(current["endpoints"].items()):
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'tourlens_upstream_responses_total{{upstream="{_escape(upstream)}",endpoint="{_escape(endpoint)}",status="{_escape(status)}"}} {count}')
+
+        lines += [
+            "# HELP tourlens_upstream_received_bytes_total Response body bytes received from outbound API calls.",
+            "# TYPE tourlens_upstream_received_bytes_total counter",
+        ]
+        for (upstream, endpoint), stats in sorted(current["endpoints"].items()):
+            lines.append(f'tourlens_upstream_received_bytes_total{{upstream="{_escape(upstream)}",endpoint="{_escape(endpoint)}"}} {stats.bytes_received}')
+
+        lines += [
+            "# HELP tourlens_upstream_retries_total Retries of outbound API calls after 429/5xx or connection errors.",
+            "# TYPE tourlens_upstream_retries_total counter",
+        ]
+        for (upstream, endpoint), stats in sorted(current["endpoints"].items()):
+            lines.append(f'tourlens_upstream_retries_total{{upstream="{_escape(upstream)}",endpoint="{_escape(endpoint)}"}} {stats.retries}')
+
+        lines += [
+            "# HELP tourlens_operation_seconds Duration of internal operations such as plot rendering and CSV writing.",
+            "# TYPE tourlens_operation_seconds histogram",
+        ]
+        for name, histogram in sorted(current["timings"].items()):
+            lines.extend(_histogram_lines("tourlens_operation_seconds", f'operation="{_escape(name)}"', histogram))
+
+        lines += [
+            "# HELP tourlens_connections_opened_total New TCP/TLS connections opened per host.",
+            "# TYPE tourlens_connections_opened_total counter",
+        ]
+        for host, (count, _) in sorted(current["connections"].items()):
+            lines.append(f'tourlens_connections_opened_total{{host="{_escape(host)}"}} {count}')
+        lines += [
+            "# HELP tourlens_connection_setup_seconds_total Time spent opening connections (TCP + TLS handshake) per host.",
+            "# TYPE tourlens_connection_setup_seconds_total counter",
+        ]
+        for host, (_, seconds) in sorted(current["connections"].items()):
+            lines.append(f'tourlens_connection_setup_seconds_total{{host="{_escape(host)}"}} {seconds:.6f}')
+
+        # 등록된 구성 요소의 stats(): tourlens_<구성 요소>_<필드>[_total]
+        families = {}
+        for (component, labels), values in sorted(current["components"].items()):
+            counters = self._counter_fields((component, labels))
+            label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+            for field, value in values.items():
+                counter = field in counters
+                name = f"tourlens_{component}_{field}" + ("_total" if counter else "")
+                family = families.setdefault(name, ("counter" if counter else "gauge", component, field, []))
+                family[3].append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        for name, (kind, component, field, samples) in families.items():
+            lines += [f"# HELP {name} {field} reported by {component}.stats().", f"# TYPE {name} {kind}"]
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name, labels, histogram):
+    lines = []
+    running = 0
+    for upper, count in zip(histogram.buckets, histogram.counts):
+        running += count
+        lines.append(f'{name}_bucket{{{labels},le="{upper}"}} {running}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+metrics = MetricsRegistry()
+
+
+def print_job_summary(job_name, since=None, seconds=None):
+    """배치 작업이 끝날 때 작업 동안의 지표 요약을 JSON 한 줄로 출력합니다."""
+    summary = {"job": job_name}
+    if seconds is not None:
+        summary["seconds"] = round(seconds, 3)
+    summary.update(metrics.summary(since))
+    print(f"[metrics] {json.dumps(summary, ensure_ascii=False)}")
+    return summary
+
+
+@contextmanager
+def job_summary(job_name):
+    """with 블록(배치 작업)이 끝나면 성공/실패와 관계없이 그동안의 지표 요약을 출력합니다."""
+    since = metrics.snapshot()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        print_job_summary(job_name, since, time.perf_counter() - started)
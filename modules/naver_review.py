@@ -1,9 +1,13 @@
 import requests
+import httpx
 import os
-import re
 import json
 from datetime import date, timedelta
 
+from modules.http_client import get_upstream, make_session, endpoint_label
+from modules.async_client import get_async_client
+from utils import HTML_TAG_PATTERN
+
 # .env 파일에서 네이버 API 키 로드
 # 블로그 검색 API
 NAVER_BLOG_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
@@ -13,46 +17,57 @@ NAVER_BLOG_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
 NAVER_TREND_CLIENT_ID = os.getenv("NAVER_TREND_CLIENT_ID")
 NAVER_TREND_CLIENT_SECRET = os.getenv("NAVER_TREND_CLIENT_SECRET")
 
+# 네이버 API 공용 세션: keep-alive 연결을 스레드 간에 재사용하고 호출 정책
+# (속도 제한, 429/5xx 재시도, 적응형 동시성)을 적용합니다.
+NAVER_POOL_SIZE = int(os.getenv("TOURLENS_NAVER_POOL_SIZE", "8"))
+NAVER_REQUEST_TIMEOUT = (3.05, 10)  # (연결, 응답 읽기) 초
+NAVER_API_BASE_URL = os.getenv("NAVER_API_BASE_URL", "https://openapi.naver.com").rstrip("/")
+NAVER_BLOG_URL = f"{NAVER_API_BASE_URL}/v1/search/blog.json"
+NAVER_DATALAB_URL = f"{NAVER_API_BASE_URL}/v1/datalab/search"
+naver_search_session = make_session(get_upstream("naver_search"), NAVER_POOL_SIZE, prefixes=("http://", "https://"), timeout=NAVER_REQUEST_TIMEOUT)
+naver_datalab_session = make_session(get_upstream("naver_datalab"), NAVER_POOL_SIZE, prefixes=("http://", "https://"), timeout=NAVER_REQUEST_TIMEOUT)
+
 def clean_html(raw_html):
     """HTML 태그를 제거하는 간단한 함수"""
     if not raw_html:
         return ""
-    cleanr = re.compile('<.*?>')
-    cleantext = re.sub(cleanr, '', raw_html)
+    cleantext = HTML_TAG_PATTERN.sub('', raw_html)
     return cleantext.strip()
 
-def search_naver_blog(query, display=5):
-    """네이버 블로그 검색 API를 호출하고 결과를 반환합니다."""
-    if not NAVER_BLOG_CLIENT_ID or not NAVER_BLOG_CLIENT_SECRET:
-        print("네이버 블로그 API 인증 정보가 .env 파일에 설정되지 않았습니다.")
-        return []
-
+def _blog_request(query, display):
     headers = {
         "X-Naver-Client-Id": NAVER_BLOG_CLIENT_ID,
         "X-Naver-Client-Secret": NAVER_BLOG_CLIENT_SECRET,
     }
-    
     params = {
         "query": query,
         "display": display,
         "sort": "sim"  # 관련도순 정렬
     }
+    return headers, params
+
+def _parse_blog_items(data):
+    results = []
+    for item in data.get("items", []):
+        results.append({
+            "title": clean_html(item.get("title", "")),
+            "description": clean_html(item.get("description", "")),
+            "link": item.get("link", ""),
+            "postdate": item.get("postdate", "")
+        })
+    return results
 
+def search_naver_blog(query, display=5):
+    """네이버 블로그 검색 API를 호출하고 결과를 반환합니다."""
+    if not NAVER_BLOG_CLIENT_ID or not NAVER_BLOG_CLIENT_SECRET:
+        print("네이버 블로그 API 인증 정보가 .env 파일에 설정되지 않았습니다.")
+        return []
+
+    headers, params = _blog_request(query, display)
     try:
-        response = requests.get("https://openapi.naver.com/v1/search/blog.json", headers=headers, params=params)
+        response = naver_search_session.get(NAVER_BLOG_URL, headers=headers, params=params)
         response.raise_for_status()  # 오류 발생 시 예외 처리
-        
-        data = response.json()
-        
-        results = []
-        for item in data.get("items", []):
-            results.append({
-                "title": clean_html(item.get("title", "")),
-                "description": clean_html(item.get("description", "")),
-                "link": item.get("link", ""),
-                "postdate": item.get("postdate", "")
-            })
-        return results
+        return _parse_blog_items(response.json())
 
     except requests.exceptions.RequestException as e:
         print(f"네이버 블로그 API 호출 오류: {e}")
@@ -61,36 +76,92 @@ def search_naver_blog(query, display=5):
         print(f"블로그 데이터 처리 중 오류: {e}")
         return []
 
-def get_naver_trend(keyword, start_date, end_date):
-    """네이버 데이터랩 검색어 트렌드 API를 호출하고 결과를 반환합니다."""
-    if not NAVER_TREND_CLIENT_ID or not NAVER_TREND_CLIENT_SECRET:
-        print("네이버 트렌드 API 인증 정보가 .env 파일에 설정되지 않았습니다.")
-        return None
+async def search_naver_blog_async(query, display=5):
+    """search_naver_blog의 비동기 버전. 이벤트 루프의 연결 풀 클라이언트를 사용합니다."""
+    if not NAVER_BLOG_CLIENT_ID or not NAVER_BLOG_CLIENT_SECRET:
+        print("네이버 블로그 API 인증 정보가 .env 파일에 설정되지 않았습니다.")
+        return []
 
-    headers = {
+    headers, params = _blog_request(query, display)
+    try:
+        client = get_async_client("naver")
+        response = await get_upstream("naver_search").send_async(
+            lambda: client.get(NAVER_BLOG_URL, headers=headers, params=params),
+            endpoint=endpoint_label(NAVER_BLOG_URL),
+        )
+        response.raise_for_status()
+        return _parse_blog_items(response.json())
+
+    except httpx.HTTPError as e:
+        print(f"네이버 블로그 API 호출 오류: {e}")
+        return []
+    except Exception as e:
+        print(f"블로그 데이터 처리 중 오류: {e}")
+        return []
+
+# 데이터랩 API가 한 번의 요청에서 허용하는 최대 키워드 그룹 수
+DATALAB_MAX_GROUPS = 5
+# 묶음 조회에서 키워드의 최대값이 이보다 작으면(같이 묶인 인기 키워드에 눌려 0에 가까우면)
+# 재조정해도 정밀도가 떨어지므로 그 키워드만 단독으로 다시 조회
+DATALAB_MIN_BATCH_PEAK = float(os.getenv("TOURLENS_DATALAB_MIN_BATCH_PEAK", "1"))
+
+def _trend_headers():
+    return {
         "X-Naver-Client-Id": NAVER_TREND_CLIENT_ID,
         "X-Naver-Client-Secret": NAVER_TREND_CLIENT_SECRET,
         "Content-Type": "application/json"
     }
 
+def _datalab_body(keywords, start_date, end_date):
     body = {
         "startDate": start_date.strftime("%Y-%m-%d"),
         "endDate": end_date.strftime("%Y-%m-%d"),
         "timeUnit": "date",
-        "keywordGroups": [{"groupName": keyword, "keywords": [keyword]}]
+        "keywordGroups": [{"groupName": keyword, "keywords": [keyword]} for keyword in keywords]
     }
+    return json.dumps(body)
+
+def _parse_datalab_results(data):
+    return {result.get('title'): result.get('data') for result in data.get('results', [])}
+
+def _request_datalab(keywords, start_date, end_date):
+    """키워드마다 하나의 그룹을 만들어 데이터랩 API를 호출하고 {키워드: data} 형태로 반환합니다."""
+    response = naver_datalab_session.post(NAVER_DATALAB_URL, headers=_trend_headers(), data=_datalab_body(keywords, start_date, end_date))
+    response.raise_for_status()
+    return _parse_datalab_results(response.json())
+
+def rescale_to_own_peak(trend_data):
+    """그룹의 최대값이 100이 되도록 비율을 재조정합니다.
+
+    데이터랩은 요청에 포함된 모든 그룹 중 최대 검색량을 100으로 정규화하므로,
+    여러 키워드를 한 요청에 묶으면 키워드별 단독 조회와 값이 달라집니다.
+    키워드별로 자기 최대값 기준으로 되돌려 단독 조회와 같은 척도를 유지합니다.
+    """
+    peak = _peak_ratio(trend_data)
+    if peak <= 0:
+        return None
+    return [{**point, 'ratio': float(point['ratio']) * 100 / peak} for point in trend_data]
+
+def _peak_ratio(trend_data):
+    if not trend_data:
+        return 0.0
+    return max(float(point.get('ratio', 0)) for point in trend_data)
+
+def get_naver_trend(keyword, start_date, end_date):
+    """네이버 데이터랩 검색어 트렌드 API를 호출하고 결과를 반환합니다."""
+    if not NAVER_TREND_CLIENT_ID or not NAVER_TREND_CLIENT_SECRET:
+        print("네이버 트렌드 API 인증 정보가 .env 파일에 설정되지 않았습니다.")
+        return None
 
     try:
-        response = requests.post("https://openapi.naver.com/v1/datalab/search", headers=headers, data=json.dumps(body))
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if not data.get('results') or not data['results'][0].get('data'):
+        results = _request_datalab([keyword], start_date, end_date)
+        trend_data = results.get(keyword)
+
+        if not trend_data:
             # print(f"'{keyword}'에 대한 트렌드 검색 결과가 없습니다.") # 로그가 너무 많이 찍히므로 주석 처리
             return None
-            
-        return data['results'][0]['data']
+
+        return trend_data
 
     except requests.exceptions.RequestException as e:
         print(f"네이버 트렌드 API 호출 오류: {e}")
@@ -98,3 +169,76 @@ def get_naver_trend(keyword, start_date, end_date):
     except Exception as e:
         print(f"트렌드 데이터 처리 중 오류: {e}")
         return None
+
+async def get_naver_trend_async(keyword, start_date, end_date):
+    """get_naver_trend의 비동기 버전. 이벤트 루프의 연결 풀 클라이언트를 사용합니다."""
+    if not NAVER_TREND_CLIENT_ID or not NAVER_TREND_CLIENT_SECRET:
+        print("네이버 트렌드 API 인증 정보가 .env 파일에 설정되지 않았습니다.")
+        return None
+
+    body = _datalab_body([keyword], start_date, end_date)
+    try:
+        client = get_async_client("naver")
+        response = await get_upstream("naver_datalab").send_async(
+            lambda: client.post(NAVER_DATALAB_URL, headers=_trend_headers(), content=body),
+            endpoint=endpoint_label(NAVER_DATALAB_URL),
+        )
+        response.raise_for_status()
+        return _parse_datalab_results(response.json()).get(keyword) or None
+
+    except httpx.HTTPError as e:
+        print(f"네이버 트렌드 API 호출 오류: {e}")
+        return None
+    except Exception as e:
+        print(f"트렌드 데이터 처리 중 오류: {e}")
+        return None
+
+def get_naver_trends(keywords, start_date, end_date):
+    """같은 기간의 여러 키워드를 5개씩 묶어 조회하고 {키워드: 트렌드 데이터} 딕셔너리를 반환합니다.
+
+    결과가 없는 키워드는 get_naver_trend와 같이 None 값을 가집니다. 묶음 안에서 최대값이
+    DATALAB_MIN_BATCH_PEAK보다 작은 키워드는 단독으로 다시 조회합니다.
+    """
+    unique_keywords = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+    trends = {keyword: None for keyword in unique_keywords}
+    if not unique_keywords:
+        return trends
+
+    if not NAVER_TREND_CLIENT_ID or not NAVER_TREND_CLIENT_SECRET:
+        print("네이버 트렌드 API 인증 정보가 .env 파일에 설정되지 않았습니다.")
+        return trends
+
+    for i in range(0, len(unique_keywords), DATALAB_MAX_GROUPS):
+        chunk = unique_keywords[i:i + DATALAB_MAX_GROUPS]
+        try:
+            results = _request_datalab(chunk, start_date, end_date)
+        except requests.exceptions.RequestException as e:
+            print(f"네이버 트렌드 API 호출 오류 ({', '.join(chunk)}): {e}")
+            continue
+        except Exception as e:
+            print(f"트렌드 데이터 처리 중 오류 ({', '.join(chunk)}): {e}")
+            continue
+        for keyword in chunk:
+            trend_data = results.get(keyword)
+            if len(chunk) > 1 and trend_data and _peak_ratio(trend_data) < DATALAB_MIN_BATCH_PEAK:
+                # 단독 조회 결과는 이미 자기 최대값이 100이므로 그대로 사용
+                trends[keyword] = get_naver_trend(keyword, start_date, end_date)
+            else:
+                trends[keyword] = rescale_to_own_peak(trend_data)
+    return trends
+
+def get_naver_trends_batch(trend_requests):
+    """(키워드, 시작일, 종료일) 요청 목록을 기간별로 묶어 일괄 조회합니다.
+
+    반환값은 {(키워드, 시작일, 종료일): 트렌드 데이터 또는 None} 딕셔너리입니다.
+    """
+    keywords_by_window = {}
+    for keyword, start_date, end_date in trend_requests:
+        keywords_by_window.setdefault((start_date, end_date), []).append(keyword)
+
+    results = {}
+    for (start_date, end_date), keywords in keywords_by_window.items():
+        trends = get_naver_trends(keywords, start_date, end_date)
+        for keyword, trend_data in trends.items():
+            results[(keyword, start_date, end_date)] = trend_data
+    return results
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+from modules.api_cache import CACHE_DIR
+from modules.plot_render import render_trend_png
+
+# --- 그래프 캐시 설정 ---
+PLOT_CACHE_DIR = os.getenv("TOURLENS_PLOT_CACHE_DIR", os.path.join(CACHE_DIR, "plots"))
+PLOT_CACHE_MAX_BYTES = int(os.getenv("TOURLENS_PLOT_CACHE_MB", "128")) * 1024 * 1024
+# 그래프 파일을 제공하는 URL 경로 (app.py에서 이 경로로 정적 파일을 제공)
+PLOT_URL_PREFIX = "/plots"
+# 같은 입력이면 같은 이름이므로 브라우저가 오래 캐시해도 됨
+PLOT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 렌더링 방식이 바뀌면 올려서 이전 그림을 재사용하지 않도록 함
+PLOT_RENDER_VERSION = 1
+
+_PLOT_FILE_PATTERN = re.compile(r"^[0-9a-f]{40}\.png$")
+
+
+def plot_key(keyword, trend_data, title, ylabel):
+    """키워드, 조회 기간, 트렌드 데이터 해시와 그래프 설정으로 내용 기반 파일 이름을 만듭니다."""
+    periods = [str(point['period'])[:10] for point in trend_data]
+    payload = json.dumps({
+        "version": PLOT_RENDER_VERSION,
+        "keyword": keyword,
+        "start": min(periods) if periods else None,
+        "end": max(periods) if periods else None,
+        "data": hashlib.sha256(json.dumps(
+            [[point['period'], point['ratio']] for point in trend_data], default=str
+        ).encode("utf-8")).hexdigest(),
+        "title": title,
+        "ylabel": ylabel,
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest() + ".png"
+
+
+class PlotCache:
+    """렌더링한 트렌드 그래프 PNG를 내용 기반 이름으로 저장하는 디스크 캐시 (최근 사용 순 용량 제한).
+
+    같은 그래프는 한 번만 렌더링합니다. 동시에 같은 그래프를 요청하면 하나만 그리고 나머지는 그 결과를 기다립니다.
+    """
+
+    def __init__(self, directory=PLOT_CACHE_DIR, max_bytes=PLOT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._total_bytes = None  # 처음 사용할 때 디렉터리를 훑어 계산
+
+    def path_for(self, name):
+        """캐시 파일 이름이 올바르고 파일이 있으면 경로를, 아니면 None을 반환합니다."""
+        if not _PLOT_FILE_PATTERN.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def get_or_render(self, name, render):
+        """name 파일이 있으면 그 경로를, 없으면 render()가 반환한 PNG bytes를 저장하고 경로를 반환합니다."""
+        path = os.path.join(self.directory, name)
+        if self._touch(path):
+            return path
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(name, threading.Lock())
+        try:
+            with key_lock:
+                # 기다리는 동안 다른 스레드가 같은 그래프를 저장했을 수 있음
+                if self._touch(path):
+                    return path
+                png_bytes = render()
+                self._write(path, png_bytes)
+                return path
+        finally:
+            with self._lock:
+                self._key_locks.pop(name, None)
+
+    def _touch(self, path):
+        try:
+            # 최근 사용 시각(mtime)을 갱신해 축출 순서를 정함
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def _write(self, path, png_bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(png_bytes)
+        os.replace(temp_path, path)
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total()
+            else:
+                self._total_bytes += len(png_bytes)
+            over_budget = self._total_bytes > self.max_bytes
+        if over_budget:
+            self.enforce_limit(keep=path)
+
+    def _scan_total(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if _PLOT_FILE_PATTERN.match(entry.name):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((entry.path, stat.st_size, stat.st_mtime))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def enforce_limit(self, keep=None):
+        """용량 한도를 넘으면 가장 오래 쓰이지 않은 그래프부터 삭제합니다. keep 파일은 남깁니다. (남은 바이트 수 반환)"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        # 한도의 90%까지 줄여 매번 축출이 일어나지 않도록 함
+        target = self.max_bytes * 0.9 if total > self.max_bytes else total
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._total_bytes = total
+        return total
+
+
+plot_cache = PlotCache()
+
+
+def plot_url(path):
+    """캐시 파일 경로를 브라우저에서 불러올 URL로 바꿉니다."""
+    return f"{PLOT_URL_PREFIX}/{os.path.basename(path)}"
+
+
+def cached_trend_png(keyword, trend_data, title, ylabel="상대적 검색량"):
+    """트렌드 그래프를 캐시에서 찾거나 렌더링해 저장하고 파일 경로를 반환합니다."""
+    name = plot_key(keyword, trend_data, title, ylabel)
+    return plot_cache.get_or_render(name, lambda: render_trend_png(trend_data, title, ylabel=ylabel))
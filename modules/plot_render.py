@@ -0,0 +1,170 @@
+import datetime
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from modules.metrics import metrics
+
+# --- 렌더링 설정 ---
+# matplotlib은 가져오는 데 시간이 걸리므로 처음 그래프를 그릴 때 불러옵니다. (앱 시작 시간 단축)
+# pyplot 전역 상태(rcParams 포함)를 건드리지 않도록 글꼴은 텍스트마다 직접 지정합니다.
+TREND_FONT_FAMILY = ["Malgun Gothic", "AppleGothic", "NanumGothic", "sans-serif"]
+TREND_FIGSIZE = (10, 5)
+RENDER_WORKERS = int(os.getenv("TOURLENS_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+MIN_JOBS_FOR_POOL = 8  # 이보다 적은 배치는 프로세스 풀 없이 현재 프로세스에서 렌더링
+# 앱 서버는 여러 스레드(이벤트 루프, 연결 풀, SQLite 등)가 동작 중이므로 fork 대신 forkserver(없으면 spawn)로 워커를 만듦
+RENDER_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+@lru_cache(maxsize=None)
+def _trend_font():
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.font_manager import FontProperties
+    return FontProperties(family=TREND_FONT_FAMILY)
+
+
+def _to_series(trend_data):
+    """[{'period': 'YYYY-MM-DD', 'ratio': ...}, ...]를 (날짜 숫자 리스트, 비율 리스트)로 변환합니다."""
+    import matplotlib.dates as mdates
+    x_values, y_values = [], []
+    for point in trend_data:
+        x_values.append(mdates.date2num(datetime.date.fromisoformat(str(point['period'])[:10])))
+        y_values.append(float(point['ratio']))
+    return x_values, y_values
+
+
+def _date_num(value):
+    if value is None:
+        return None
+    import matplotlib.dates as mdates
+    return mdates.date2num(datetime.date.fromisoformat(str(value)[:10]))
+
+
+class TrendChart:
+    """트렌드 그래프 템플릿. Figure를 한 번 만들고 선 데이터와 제목만 바꿔 가며 렌더링합니다."""
+
+    def __init__(self, figsize=TREND_FIGSIZE):
+        font = _trend_font()
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=figsize)
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.ax.xaxis_date()
+        self.line, = self.ax.plot([], [], marker='o', linestyle='-')
+        self.start_line = self.ax.axvline(0, color='green', linestyle='--', label='행사 시작', visible=False)
+        self.end_line = self.ax.axvline(0, color='red', linestyle='--', label='행사 종료', visible=False)
+        self.ax.set_xlabel("날짜", fontproperties=font)
+        self.ax.grid(True)
+
+    def render(self, trend_data, title, ylabel="상대적 검색량", event_start=None, event_end=None,
+               output=None, dpi=100, bbox_inches=None, tight_layout=False):
+        """그래프를 그려 output(파일 경로 또는 파일 객체)에 PNG로 저장합니다. output이 없으면 PNG bytes를 반환합니다."""
+        x_values, y_values = _to_series(trend_data)
+        self.line.set_data(x_values, y_values)
+
+        markers = []
+        for marker_line, value in ((self.start_line, event_start), (self.end_line, event_end)):
+            position = _date_num(value)
+            marker_line.set_visible(position is not None)
+            if position is not None:
+                marker_line.set_xdata([position, position])
+                markers.append(marker_line)
+
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        if markers:
+            self.ax.legend(handles=markers, prop=_trend_font())
+
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+        self.ax.set_title(title, fontproperties=_trend_font())
+        self.ax.set_ylabel(ylabel, fontproperties=_trend_font())
+        if tight_layout:
+            self.figure.tight_layout()
+
+        target = output if output is not None else io.BytesIO()
+        self.figure.savefig(target, format='png', dpi=dpi, bbox_inches=bbox_inches)
+        if output is None:
+            return target.getvalue()
+        return output
+
+
+def render_trend_png(trend_data, title, ylabel="상대적 검색량", dpi=100):
+    """단일 트렌드 그래프를 새 Figure에 그려 PNG bytes로 반환합니다. 여러 스레드에서 동시에 호출해도 안전합니다."""
+    with metrics.timer("plot_render"):
+        return TrendChart().render(trend_data, title, ylabel=ylabel, dpi=dpi, tight_layout=True)
+
+
+# --- 배치 렌더링 (프로세스 풀) ---
+_worker_chart = None
+
+
+def _init_render_worker():
+    global _worker_chart
+    _worker_chart = TrendChart()
+
+
+def _render_job(job):
+    """작업 하나를 워커의 템플릿 Figure로 렌더링해 파일로 저장합니다. (경로, 오류 메시지)를 반환합니다."""
+    global _worker_chart
+    if _worker_chart is None:
+        _worker_chart = TrendChart()
+    try:
+        _worker_chart.render(
+            job['trend_data'], job['title'], ylabel=job.get('ylabel', "검색량 지수"),
+            event_start=job.get('event_start'), event_end=job.get('event_end'),
+            output=job['path'], dpi=job.get('dpi', 150), bbox_inches=job.get('bbox_inches', "tight"),
+        )
+        return job['path'], None
+    except Exception as e:
+        return job['path'], str(e)
+
+
+def render_trend_batch(jobs, max_workers=None):
+    """여러 트렌드 그래프를 프로세스 풀에서 렌더링해 각 job['path']에 저장하고 통계를 반환합니다.
+
+    job은 trend_data, title, path와 선택 항목 ylabel, event_start, event_end, dpi, bbox_inches를 가진 dict입니다.
+    """
+    # 같은 경로에 여러 작업이 있으면(매년 열리는 행사 등) 워커들이 한 파일에 동시에 쓰지 않도록 마지막 작업만 렌더링
+    jobs = list({job['path']: job for job in jobs}.values())
+    max_workers = max_workers or RENDER_WORKERS
+    started = time.perf_counter()
+    failed = []
+
+    if len(jobs) < MIN_JOBS_FOR_POOL or max_workers <= 1:
+        results = map(_render_job, jobs)
+        failed = [(path, error) for path, error in results if error]
+    else:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker,
+                                     mp_context=multiprocessing.get_context(RENDER_START_METHOD)) as executor:
+                chunksize = max(1, len(jobs) // (max_workers * 4))
+                failed = [(path, error) for path, error in executor.map(_render_job, jobs, chunksize=chunksize) if error]
+        except Exception as e:
+            # 프로세스 풀을 쓸 수 없는 환경이면 현재 프로세스에서 렌더링
+            print(f"[render_trend_batch] 프로세스 풀 사용 불가, 단일 프로세스로 렌더링합니다: {e}")
+            failed = [(path, error) for path, error in map(_render_job, jobs) if error]
+
+    for path, error in failed:
+        print(f"'{path}' 그래프 저장 중 오류: {error}")
+
+    elapsed = time.perf_counter() - started
+    rendered = len(jobs) - len(failed)
+    if jobs:
+        metrics.observe_timing("plot_render_batch", elapsed)
+    stats = {
+        "rendered": rendered,
+        "failed": len(failed),
+        "seconds": round(elapsed, 3),
+        "renders_per_sec": round(rendered / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+    if jobs:
+        print(f"[render_trend_batch] {rendered}개 렌더링, {stats['renders_per_sec']} renders/sec")
+    return stats
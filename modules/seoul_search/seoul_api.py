@@ -1,9 +1,27 @@
 import requests
 import os
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from modules.http_client import get_upstream, make_session
+from modules.metrics import job_summary
 
 # 사용자가 제공한 API 키
 SEOUL_TOUR_API_KEY = os.getenv("SEOUL_TOUR_API_KEY")
-BASE_URL = f"http://openapi.seoul.go.kr:8088/{SEOUL_TOUR_API_KEY}/json/TbVwAttractions"
+SEOUL_API_BASE_URL = os.getenv("SEOUL_API_BASE_URL", "http://openapi.seoul.go.kr:8088").rstrip("/")
+BASE_URL = f"{SEOUL_API_BASE_URL}/{SEOUL_TOUR_API_KEY}/json/TbVwAttractions"
+
+# --- 요청 및 전체 데이터 병렬 수집 설정 ---
+SEOUL_PAGE_SIZE = 1000  # API가 한 번에 반환할 수 있는 최대 레코드 수
+SEOUL_CRAWL_WORKERS = int(os.getenv("TOURLENS_SEOUL_CRAWL_WORKERS", "6"))
+SEOUL_CRAWL_RETRIES = 2
+SEOUL_REQUEST_TIMEOUT = 30
+
+SEOUL_POOL_SIZE = int(os.getenv("TOURLENS_SEOUL_POOL_SIZE", str(SEOUL_CRAWL_WORKERS)))
+
+# 서울 API 공용 세션: 페이지 조회와 전체 수집이 keep-alive 연결을 함께 재사용합니다 (서울 API 호출 정책 적용)
+crawl_session = make_session(get_upstream("seoul"), SEOUL_POOL_SIZE, prefixes=("http://", "https://"))
 
 def _process_raw_items(raw_items):
     """API에서 받은 원본 아이템 리스트를 가공하고, 원본도 함께 보존합니다."""
@@ -40,7 +58,7 @@ def fetch_attractions(page_no=1, num_of_rows=12):
     url = f"{BASE_URL}/{start_index}/{end_index}/"
 
     try:
-        response = requests.get(url)
+        response = crawl_session.get(url, timeout=SEOUL_REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
 
@@ -66,21 +84,52 @@ def fetch_attractions(page_no=1, num_of_rows=12):
         print(f"An error occurred: {e}")
         return {'items': [], 'totalCount': 0}
 
-import math
-
-def get_all_seoul_data():
+def _fetch_row_range(start, end):
+    """start~end 행 구간의 원본 row 리스트를 가져옵니다. 데이터가 없으면 예외를 발생시킵니다."""
+    response = crawl_session.get(f"{BASE_URL}/{start}/{end}/", timeout=SEOUL_REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    if 'TbVwAttractions' not in data or 'row' not in data['TbVwAttractions']:
+        raise ValueError(f"rows {start}-{end} 응답에 데이터가 없습니다.")
+    return data['TbVwAttractions']['row']
+
+def _fetch_row_ranges(row_ranges, parallel, max_workers):
+    """여러 행 구간을 가져와 {구간: rows}와 실패한 구간 리스트를 반환합니다."""
+    fetched, failed = {}, []
+    if not parallel:
+        for row_range in row_ranges:
+            try:
+                fetched[row_range] = _fetch_row_range(*row_range)
+            except Exception as e:
+                print(f"Request for rows {row_range[0]}-{row_range[1]} failed: {e}")
+                failed.append(row_range)
+        return fetched, failed
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_fetch_row_range, *row_range): row_range for row_range in row_ranges}
+        for future in as_completed(futures):
+            row_range = futures[future]
+            try:
+                fetched[row_range] = future.result()
+            except Exception as e:
+                print(f"Request for rows {row_range[0]}-{row_range[1]} failed: {e}")
+                failed.append(row_range)
+    return fetched, sorted(failed)
+
+@job_summary("get_all_seoul_data")
+def get_all_seoul_data(parallel=True, max_workers=None, max_retries=SEOUL_CRAWL_RETRIES):
     """
     서울 열린 데이터 광장 API에서 페이지네이션을 통해 모든 관광 명소 데이터를 가져옵니다.
     필터링을 위한 전체 데이터 소스로 사용됩니다.
+
+    전체 개수를 먼저 확인한 뒤 모든 페이지 구간을 공용 세션으로 동시에 받고(parallel=True),
+    실패한 구간만 최대 max_retries번 다시 요청한 다음 원래 순서대로 합칩니다.
     """
-    all_items = []
-    page_size = 1000  # API가 한 번에 반환할 수 있는 최대 레코드 수
-    start_index = 1
+    max_workers = max_workers or SEOUL_CRAWL_WORKERS
 
     # 1. 첫 호출로 전체 카운트 가져오기
     try:
-        initial_url = f"{BASE_URL}/{start_index}/{start_index}/"
-        response = requests.get(initial_url)
+        response = crawl_session.get(f"{BASE_URL}/1/1/", timeout=SEOUL_REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         
@@ -99,33 +148,31 @@ def get_all_seoul_data():
         print(f"An error occurred during initial fetch: {e}")
         return []
 
-    # 2. 전체 카운트를 기반으로 모든 페이지 순회
-    total_pages = math.ceil(total_count / page_size)
-    
-    for page in range(total_pages):
-        start = page * page_size + 1
-        end = start + page_size - 1
-        url = f"{BASE_URL}/{start}/{end}/"
-        
-        print(f"Fetching page {page + 1}/{total_pages} (rows {start}-{end})...")
-        
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'TbVwAttractions' in data and 'row' in data['TbVwAttractions']:
-                all_items.extend(data['TbVwAttractions']['row'])
-            else:
-                # 한 페이지 실패 시 다음 페이지로 계속 진행
-                print(f"Warning: Page {page + 1} fetch failed or returned no data.")
-
-        except requests.exceptions.RequestException as e:
-            print(f"Request for page {page + 1} failed: {e}")
-            continue # 오류 발생 시 다음 페이지로 넘어감
-        except Exception as e:
-            print(f"An error occurred on page {page + 1}: {e}")
-            continue
+    # 2. 전체 카운트를 기반으로 모든 페이지 구간을 동시에 수집
+    total_pages = math.ceil(total_count / SEOUL_PAGE_SIZE)
+    row_ranges = [
+        (page * SEOUL_PAGE_SIZE + 1, min((page + 1) * SEOUL_PAGE_SIZE, total_count))
+        for page in range(total_pages)
+    ]
+    print(f"Fetching {total_pages} pages ({total_count} rows, parallel={parallel})...")
+
+    pages = {}
+    pending = row_ranges
+    for attempt in range(max_retries + 1):
+        if attempt > 0:
+            print(f"Retrying {len(pending)} failed page(s) (attempt {attempt}/{max_retries})...")
+            time.sleep(attempt)
+        fetched, pending = _fetch_row_ranges(pending, parallel, max_workers)
+        pages.update(fetched)
+        if not pending:
+            break
+
+    if pending:
+        # 재시도 후에도 실패한 구간은 건너뜀
+        print(f"Warning: {len(pending)} page(s) could not be fetched: {pending}")
+
+    # 3. 원래 구간 순서대로 재조립
+    all_items = [row for row_range in row_ranges for row in pages.get(row_range, [])]
 
     print(f"Total items fetched: {len(all_items)}")
     return _process_raw_items(all_items)
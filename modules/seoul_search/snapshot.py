@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+import time
+
+from modules.api_cache import CACHE_DIR
+from modules.seoul_search.seoul_api import get_all_seoul_data
+from modules.seoul_search.tag_index import TagIndex
+
+# --- 스냅샷 기본 설정 ---
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, "seoul_attractions.json")
+SNAPSHOT_REFRESH_SECONDS = int(os.getenv("TOURLENS_SEOUL_REFRESH_MINUTES", "360")) * 60
+
+
+class SeoulSnapshot:
+    """특정 시점에 수집한 서울시 관광지 데이터. 생성 후에는 변경하지 않습니다."""
+
+    def __init__(self, items, loaded_at):
+        self.items = tuple(items)
+        self.loaded_at = loaded_at
+        self.tag_index = TagIndex(self.items)
+
+        # POST_SN / 제목 기준 키 색인 (제목이 중복되면 스냅샷 순서상 먼저 나온 아이템 우선)
+        self.by_id = {}
+        self.ids_by_title = {}
+        for item in self.items:
+            processed = item.get('processed') or {}
+            item_id = processed.get('contentid')
+            if item_id is None:
+                continue
+            self.by_id.setdefault(item_id, item)
+            title = processed.get('title')
+            if title:
+                self.ids_by_title.setdefault(title, []).append(item_id)
+
+    def search_ids(self, categories=(), tag_query=None):
+        """카테고리/태그 조건에 맞는 아이템 ID(POST_SN) 목록을 역색인으로 찾아 반환합니다."""
+        ids = []
+        for position in self.tag_index.search(categories, tag_query):
+            item_id = (self.items[position].get('processed') or {}).get('contentid')
+            if item_id is not None:
+                ids.append(item_id)
+        return ids
+
+    def get_by_title(self, title, candidate_ids=None):
+        """제목으로 아이템을 찾습니다. candidate_ids가 있으면 그 안의 아이템만 반환하고, 없으면 None."""
+        ids = self.ids_by_title.get(title)
+        if not ids:
+            return None
+        if candidate_ids is None:
+            return self.by_id[ids[0]]
+        candidates = set(candidate_ids)
+        for item_id in ids:
+            if item_id in candidates:
+                return self.by_id[item_id]
+        return None
+
+    def resolve(self, ids):
+        """ID 목록을 아이템 리스트로 바꿉니다. 스냅샷 갱신으로 사라진 ID는 건너뜁니다."""
+        return [self.by_id[item_id] for item_id in ids if item_id in self.by_id]
+
+    def __len__(self):
+        return len(self.items)
+
+
+class SeoulSnapshotStore:
+    """프로세스 전역 스냅샷 저장소.
+
+    최초 한 번만 데이터를 불러오고(디스크 스냅샷 우선), 이후에는 백그라운드 스레드가
+    주기적으로 새 스냅샷을 만들어 참조만 교체합니다. 읽는 쪽은 잠금 없이 현재 참조를 사용합니다.
+    """
+
+    def __init__(self, path, refresh_interval, loader=get_all_seoul_data):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.loader = loader
+        self._snapshot = None
+        self._load_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresher = None
+        self._stop_event = threading.Event()
+
+    def get(self):
+        """현재 스냅샷을 반환합니다. 아직 없으면 디스크 또는 API에서 한 번 불러옵니다."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._load_lock:
+            if self._snapshot is None:
+                self._snapshot = self._load_from_disk()
+                if self._snapshot is None:
+                    self.refresh()
+            self._start_refresher()
+        return self._snapshot or SeoulSnapshot([], 0)
+
+    def refresh(self):
+        """API에서 전체 데이터를 다시 받아 스냅샷을 교체합니다. 실패 시 기존 스냅샷을 유지합니다."""
+        with self._refresh_lock:
+            started = time.time()
+            items = self.loader()
+            if not items:
+                print("[SeoulSnapshotStore] 새 데이터를 가져오지 못해 기존 스냅샷을 유지합니다.")
+                return False
+            snapshot = SeoulSnapshot(items, time.time())
+            self._save_to_disk(snapshot)
+            self._snapshot = snapshot  # 참조 교체는 원자적이므로 읽는 쪽은 대기하지 않습니다.
+            print(f"[SeoulSnapshotStore] 스냅샷 갱신 완료: {len(snapshot)}건, {time.time() - started:.1f}초")
+            return True
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _start_refresher(self):
+        if self._refresher is not None or self.refresh_interval <= 0:
+            return
+        self._refresher = threading.Thread(target=self._refresh_loop, name="seoul-snapshot-refresher", daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            snapshot = self._snapshot
+            age = time.time() - snapshot.loaded_at if snapshot else self.refresh_interval
+            wait_seconds = max(0, self.refresh_interval - age)
+            if self._stop_event.wait(wait_seconds):
+                return
+            try:
+                if not self.refresh():
+                    # 실패 시 잠시 후 다시 시도
+                    if self._stop_event.wait(min(300, self.refresh_interval)):
+                        return
+            except Exception as e:
+                print(f"[SeoulSnapshotStore] 백그라운드 갱신 중 오류: {e}")
+                if self._stop_event.wait(min(300, self.refresh_interval)):
+                    return
+
+    def _load_from_disk(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            snapshot = SeoulSnapshot(data.get('items', []), data.get('loaded_at', 0))
+            if not snapshot.items:
+                return None
+            print(f"[SeoulSnapshotStore] 디스크 스냅샷 로드: {len(snapshot)}건")
+            return snapshot
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[SeoulSnapshotStore] 디스크 스냅샷을 읽을 수 없습니다: {e}")
+            return None
+
+    def _save_to_disk(self, snapshot):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'loaded_at': snapshot.loaded_at, 'items': list(snapshot.items)}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"[SeoulSnapshotStore] 스냅샷 저장 중 오류: {e}")
+
+
+seoul_snapshot_store = SeoulSnapshotStore(SNAPSHOT_PATH, SNAPSHOT_REFRESH_SECONDS)
+
+
+def get_seoul_snapshot():
+    """프로세스 전역 서울시 관광지 스냅샷을 반환합니다."""
+    return seoul_snapshot_store.get()
+
+
+def make_result_handle(category, ids):
+    """세션 상태(gr.State)에 저장할 검색 결과 핸들. 전체 레코드 대신 카테고리와 ID 목록만 담습니다."""
+    return {'category': category, 'ids': tuple(ids)}
+
+
+def resolve_result_handle(handle, start=None, end=None):
+    """결과 핸들의 ID 구간을 현재 스냅샷의 아이템 리스트로 바꿉니다."""
+    if not handle or not handle.get('ids'):
+        return []
+    return get_seoul_snapshot().resolve(handle['ids'][start:end])
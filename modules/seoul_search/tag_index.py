@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+
+# 카테고리 이름과 태그 키워드 매핑
+CATEGORY_TO_KEYWORDS = {
+    "관광지": ["관광", "명소", "유적"],
+    "문화시설": ["문화", "미술관", "박물관", "전시", "갤러리", "도서관"],
+    "행사/공연/축제": ["행사", "공연", "축제", "페스티벌"],
+    "여행코스": ["여행코스", "도보", "산책", "둘레길"],
+    "레포츠": ["레포츠", "스포츠", "공원", "체육"],
+    "숙박": ["숙박", "호텔", "모텔", "게스트하우스", "펜션"],
+    "쇼핑": ["쇼핑", "백화점", "시장", "면세점"],
+    "음식점": ["음식점", "맛집", "식당", "카페"],
+}
+
+# 자유 태그 검색어별 결과를 보관할 최대 개수 (검색어는 사용자 입력이므로 크기를 제한)
+TERM_CACHE_MAX_ENTRIES = 1024
+
+_TAG_SPLIT_RE = re.compile(r'\s*,\s*')
+_QUERY_SPLIT_RE = re.compile(r'[\s,#]+')
+
+
+def _split_tags(tags):
+    return [tag for tag in _TAG_SPLIT_RE.split(tags.strip()) if tag]
+
+
+class TagIndex:
+    """스냅샷 아이템 위치(position)에 대한 역색인.
+
+    카테고리별 위치 목록은 생성 시 한 번만 계산해 두고(기존 부분 문자열 매칭과 같은 기준),
+    자유 태그 검색은 태그 어휘(vocabulary)만 훑은 뒤 위치 집합의 교집합으로 답합니다.
+    """
+
+    def __init__(self, items, category_keywords=CATEGORY_TO_KEYWORDS):
+        self.size = len(items)
+        tag_strings = [(item.get('processed') or {}).get('tags') or '' for item in items]
+
+        self._tag_postings = {}
+        for position, tags in enumerate(tag_strings):
+            for tag in set(_split_tags(tags)) if tags else ():
+                self._tag_postings.setdefault(tag, []).append(position)
+
+        self._category_postings = {
+            category: tuple(
+                position for position, tags in enumerate(tag_strings)
+                if tags and any(keyword in tags for keyword in keywords)
+            )
+            for category, keywords in category_keywords.items()
+        }
+        # 인스턴스(스냅샷)마다 따로 두어 스냅샷이 교체되면 함께 버려지도록 함
+        self._cached_positions_for_term = lru_cache(maxsize=TERM_CACHE_MAX_ENTRIES)(self._positions_for_term)
+
+    def positions_for_category(self, category):
+        """카테고리에 속한 아이템 위치 목록(오름차순 tuple)을 반환합니다."""
+        return self._category_postings.get(category, ())
+
+    def positions_for_term(self, term):
+        """태그 중 term을 포함하는 아이템 위치 집합을 반환합니다."""
+        return self._cached_positions_for_term(term)
+
+    def _positions_for_term(self, term):
+        return frozenset(
+            position
+            for tag, postings in self._tag_postings.items() if term in tag
+            for position in postings
+        )
+
+    def search(self, categories=(), tag_query=None, match_all_categories=True):
+        """여러 카테고리와 자유 태그 검색어를 조합해 위치 목록(오름차순 tuple)을 반환합니다.
+
+        카테고리끼리는 match_all_categories가 True면 교집합, False면 합집합으로 묶고,
+        태그 검색어의 각 단어는 항상 교집합으로 적용합니다. 조건이 없으면 전체 위치를 반환합니다.
+        """
+        categories = [category for category in categories if category]
+        terms = [term for term in _QUERY_SPLIT_RE.split(tag_query or '') if term]
+        if len(categories) == 1 and not terms:
+            return self.positions_for_category(categories[0])
+
+        position_sets = []
+        if categories:
+            category_sets = [set(self.positions_for_category(category)) for category in categories]
+            if match_all_categories:
+                position_sets.extend(category_sets)
+            else:
+                position_sets.append(set().union(*category_sets))
+        position_sets.extend(self.positions_for_term(term) for term in terms)
+
+        if not position_sets:
+            return tuple(range(self.size))
+        position_sets.sort(key=len)
+        return tuple(sorted(set(position_sets[0]).intersection(*position_sets[1:])))
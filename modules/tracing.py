@@ -0,0 +1,321 @@
+"""UI 핸들러 호출 단위의 추적(span)과 선택적 프로파일링.
+
+핸들러에 @traced_handler를 붙이면 호출마다 루트 span이 만들어지고, 그 안에서 `with span("이름"):`으로
+감싼 단계가 중첩 span으로 기록됩니다. 느린 호출(TOURLENS_SLOW_TRACE_MS 이상)은 span 트리를
+JSONL 파일(TOURLENS_TRACE_FILE)에 한 줄씩 남깁니다.
+
+TOURLENS_PROFILE=cprofile 또는 sample로 설정하면 핸들러 호출마다 프로파일러를 함께 실행해
+가장 오래 걸린 함수/호출 경로를 추적 기록에 포함합니다.
+
+    python -m modules.tracing                 # 가장 느린 추적 10개를 트리로 출력
+    python -m modules.tracing --name get_details --top 3
+"""
+import argparse
+import asyncio
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from modules.metrics import metrics
+
+# --- 추적 설정 ---
+SLOW_TRACE_MS = float(os.getenv("TOURLENS_SLOW_TRACE_MS", "2000"))  # 이 시간 이상 걸린 호출만 기록 (0이면 전부)
+TRACE_FILE = os.getenv("TOURLENS_TRACE_FILE", os.path.join("traces", "slow_traces.jsonl"))
+PROFILE_MODE = os.getenv("TOURLENS_PROFILE", "").strip().lower()  # "", "cprofile", "sample"
+PROFILE_TOP = int(os.getenv("TOURLENS_PROFILE_TOP", "25"))  # 기록에 남길 함수/호출 경로 수
+SAMPLE_INTERVAL = float(os.getenv("TOURLENS_PROFILE_INTERVAL_MS", "5")) / 1000
+
+_current_span = contextvars.ContextVar("tourlens_current_span", default=None)
+_write_lock = threading.Lock()
+
+
+class Span:
+    """추적 구간 하나. 자식 span은 다른 스레드/태스크에서도 추가될 수 있습니다."""
+
+    def __init__(self, name, parent=None, attrs=None):
+        self.name = name
+        self.parent = parent
+        self.attrs = dict(attrs or {})
+        self.children = []
+        self.error = None
+        self.started = time.perf_counter()
+        self.ended = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def finish(self, error=None):
+        self.ended = time.perf_counter()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self):
+        end = self.ended if self.ended is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def to_dict(self, origin=None):
+        origin = self.started if origin is None else origin
+        data = {
+            "name": self.name,
+            "start_ms": round((self.started - origin) * 1000, 2),
+            "duration_ms": round(self.duration_ms, 2),
+        }
+        if self.ended is None:
+            data["unfinished"] = True
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in sorted(self.children, key=lambda c: c.started)]
+        return data
+
+
+@contextmanager
+def span(name, **attrs):
+    """현재 추적 안에서 name 단계를 중첩 span으로 기록합니다. 추적 중이 아니면 아무것도 하지 않습니다."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    current = Span(name, parent, attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.finish(e)
+        raise
+    else:
+        current.finish()
+    finally:
+        _current_span.reset(token)
+
+
+# --- 프로파일러 ---
+class _CProfiler:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        top = []
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True
+        )[:PROFILE_TOP]:
+            top.append({
+                "function": f"{func} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 2),
+                "cumtime_ms": round(cumtime * 1000, 2),
+            })
+        return {"mode": "cprofile", "top_cumulative": top}
+
+
+class _SamplingProfiler:
+    """대상 스레드의 호출 스택을 일정 간격으로 수집하는 표본 추출 프로파일러 (오버헤드가 작음)."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tourlens-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        total = sum(self.samples.values())
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "mode": "sample",
+            "interval_ms": self.interval * 1000,
+            "samples": total,
+            "top_functions": [
+                {"function": function, "samples": count, "share": round(count / total, 3)}
+                for function, count in leaves.most_common(PROFILE_TOP)
+            ],
+            "top_stacks": [
+                {"stack": stack, "samples": count, "share": round(count / total, 3)}
+                for stack, count in self.samples.most_common(PROFILE_TOP)
+            ],
+        }
+
+
+def _start_profiler():
+    if PROFILE_MODE not in ("cprofile", "sample"):
+        return None
+    profiler = _CProfiler() if PROFILE_MODE == "cprofile" else _SamplingProfiler()
+    try:
+        profiler.start()
+    except ValueError as e:
+        # 같은 스레드에서 다른 cProfile이 이미 동작 중 (동시에 실행 중인 비동기 핸들러 등)
+        print(f"[tracing] 프로파일러를 시작하지 못했습니다: {e}")
+        return None
+    return profiler
+
+
+# --- 핸들러 추적 ---
+def _begin_trace(name):
+    parent = _current_span.get()
+    if parent is not None:
+        # 다른 추적 중인 핸들러 안에서 호출되면 중첩 span으로만 기록
+        current = Span(name, parent)
+        return current, _current_span.set(current), None
+    root = Span(name)
+    return root, _current_span.set(root), _start_profiler()
+
+
+def _end_trace(current, token, profiler, error=None):
+    current.finish(error)
+    _current_span.reset(token)
+    if current.parent is not None:
+        return
+    profile = profiler.stop() if profiler is not None else None
+    metrics.observe_timing(f"handler:{current.name}", current.duration_ms / 1000)
+    if current.duration_ms >= SLOW_TRACE_MS or profile is not None:
+        _write_trace(current, profile)
+
+
+def _write_trace(root, profile=None):
+    record = {
+        "trace_id": uuid.uuid4().hex,
+        "name": root.name,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "duration_ms": round(root.duration_ms, 2),
+        "spans": root.to_dict(),
+    }
+    if profile is not None:
+        record["profile"] = profile
+    try:
+        directory = os.path.dirname(TRACE_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with _write_lock, open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except Exception as e:
+        print(f"[tracing] 추적 기록 저장 실패: {e}")
+
+
+def traced_handler(name=None):
+    """UI 핸들러(동기/비동기) 호출마다 루트 span을 만들고, 느린 호출과 프로파일 결과를 기록합니다."""
+
+    def decorator(func):
+        trace_name = name or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                current, token, profiler = _begin_trace(trace_name)
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException as e:
+                    _end_trace(current, token, profiler, e)
+                    raise
+                _end_trace(current, token, profiler)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            current, token, profiler = _begin_trace(trace_name)
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                _end_trace(current, token, profiler, e)
+                raise
+            _end_trace(current, token, profiler)
+            return result
+        return wrapper
+
+    return decorator
+
+
+# --- 추적 기록 보기 ---
+def load_traces(path=TRACE_FILE):
+    traces = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    traces.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return traces
+
+
+def format_trace(record):
+    """추적 기록 하나를 들여쓰기된 span 트리 문자열로 만듭니다."""
+    lines = [f"{record['timestamp']}  {record['name']}  {record['duration_ms']:.0f}ms  ({record['trace_id'][:8]})"]
+
+    def walk(node, depth):
+        error = f"  !! {node['error']}" if node.get("error") else ""
+        attrs = f"  {node['attrs']}" if node.get("attrs") else ""
+        lines.append(f"{'  ' * depth}+{node['start_ms']:>8.0f}ms {node['duration_ms']:>8.0f}ms  {node['name']}{attrs}{error}")
+        for child in node.get("children", []):
+            walk(child, depth + 1)
+
+    walk(record["spans"], 1)
+    profile = record.get("profile")
+    if profile:
+        lines.append(f"  profile ({profile['mode']}):")
+        if profile["mode"] == "cprofile":
+            for entry in profile["top_cumulative"][:10]:
+                lines.append(f"    {entry['cumtime_ms']:>9.1f}ms cum {entry['tottime_ms']:>9.1f}ms self  {entry['function']}")
+        else:
+            for entry in profile["top_functions"][:10]:
+                lines.append(f"    {entry['share'] * 100:5.1f}%  {entry['function']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="느린 핸들러 추적 기록(JSONL)을 span 트리로 출력합니다.")
+    parser.add_argument("path", nargs="?", default=TRACE_FILE)
+    parser.add_argument("--name", help="이 핸들러 이름의 추적만 출력")
+    parser.add_argument("--top", type=int, default=10, help="출력할 추적 수 (느린 순)")
+    args = parser.parse_args()
+
+    traces = [record for record in load_traces(args.path) if not args.name or record["name"] == args.name]
+    if not traces:
+        print(f"추적 기록이 없습니다: {args.path}")
+        return
+    for record in sorted(traces, key=lambda r: r["duration_ms"], reverse=True)[:args.top]:
+        print(format_trace(record))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,110 +1,127 @@
+import asyncio
 import os
 import pandas as pd
 import datetime
-import matplotlib.pyplot as plt
 import gradio as gr
-import math
 import traceback
-import io
-from PIL import Image # PIL 임포트 추가
 
-from utils import common_params, session, BASE_URL, get_api_items, is_key_excluded
-from modules.naver_review import get_naver_trend, search_naver_blog
+from utils import is_key_excluded
+from modules.crawl_engine import crawl_area, crawl_items
+from modules.plot_render import render_trend_batch
+from modules.plot_cache import cached_trend_png
+from modules.metrics import metrics, job_summary
+from modules.tracing import traced_handler
+from modules.fanout import STAGE_TIMEOUTS, StageTimeout, run_stage_async
+from modules.naver_review import (
+    get_naver_trends, get_naver_trends_batch, search_naver_blog, rescale_to_own_peak,
+    get_naver_trend_async, search_naver_blog_async,
+)
 from modules.area_search.controls import AREA_CODES, CONTENT_TYPE_CODES
+from modules.area_search.sigungu import resolve_sigungu_code
+
+# 결과 저장 경로
+TREND_OUTPUT_DIR = os.getenv("TOURLENS_TREND_OUTPUT_DIR", r"C:\Users\SBA\github\TourLens\naver_trend")
+TOUR_API_DATA_DIR = os.getenv("TOURLENS_TOUR_API_DATA_DIR", r"C:\Users\SBA\github\TourLens\TourAPI_data")
+# 트렌드 분석에 넘기는 수집 결과(중간 데이터)를 저장할 형식: 비어 있으면 저장하지 않음, "parquet" 또는 "feather"(Arrow IPC)
+INTERMEDIATE_FORMAT = os.getenv("TOURLENS_INTERMEDIATE_FORMAT", "").strip().lower()
+EVENT_DATE_COLUMNS = ('eventstartdate', 'eventenddate')
+TREND_WINDOW_DAYS = 30  # 행사 전후로 트렌드를 조회할 일수
+
+def _trend_png_path(trend_output_dir, keyword):
+    safe_keyword = "".join(c for c in keyword if c.isalnum() or c in (' ', '-')).rstrip()
+    return os.path.join(trend_output_dir, f"{safe_keyword}_trend.png")
 
 # --- 신규 추가: 단일 아이템 분석 및 결과 반환 함수 ---
-def analyze_single_item(keyword):
-    """단일 키워드에 대해 트렌드 그래프와 블로그 후기를 분석하여 반환합니다."""
-    if not keyword:
-        return None, "분석할 키워드가 없습니다."
+def _single_trend_image(keyword, trend_data):
+    """트렌드 그래프를 그래프 캐시에 저장(이미 있으면 재사용)하고 이미지 파일 경로를 반환합니다. 데이터가 없거나 실패하면 None."""
+    if not trend_data:
+        return None
+    try:
+        return cached_trend_png(keyword, trend_data, f"'{keyword}' 검색어 트렌드 (최근 90일)")
+    except Exception as e:
+        print(f"트렌드 그래프 생성 중 오류: {e}")
+        return None
 
-    # 1. 트렌드 분석 및 그래프 생성
-    today = datetime.date.today()
-    start_date = today - datetime.timedelta(days=90)
-    trend_data = get_naver_trend(keyword, start_date, today)
-    
-    trend_image = None # 반환할 변수명을 image 객체로 변경
-    if trend_data:
-        try:
-            plt.rcParams['font.family'] = 'Malgun Gothic'
-            plt.rcParams['axes.unicode_minus'] = False
-            df = pd.DataFrame(trend_data)
-            df['period'] = pd.to_datetime(df['period'])
-            df['ratio'] = df['ratio'].astype(float)
-
-            plt.figure(figsize=(10, 5))
-            plt.plot(df['period'], df['ratio'], marker='o', linestyle='-')
-            plt.title(f"'{keyword}' 검색어 트렌드 (최근 90일)")
-            plt.xlabel("날짜")
-            plt.ylabel("상대적 검색량")
-            plt.grid(True)
-            plt.tight_layout()
-
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png')
-            plt.close()
-            buf.seek(0)
-            trend_image = Image.open(buf) # Base64 대신 PIL Image 객체로 변환
-        except Exception as e:
-            print(f"트렌드 그래프 생성 중 오류: {e}")
-            plt.close()
-
-    # 2. 블로그 후기 검색
-    blog_posts = search_naver_blog(keyword, display=3)
+def _single_reviews_markdown(blog_posts, error=None):
     reviews_markdown = "### 네이버 블로그 후기\n---"
-    if blog_posts:
+    if isinstance(error, StageTimeout):
+        reviews_markdown += "\n블로그 후기 응답이 늦어 표시하지 못했습니다.\n"
+    elif blog_posts:
         for post in blog_posts:
             reviews_markdown += f"#### [{post['title']}]({post['link']})\n"
             reviews_markdown += f"> {post['description']}\n\n"
     else:
         reviews_markdown += "\n관련 블로그 후기를 찾을 수 없습니다.\n"
+    return reviews_markdown
+
+def _single_trend_window():
+    today = datetime.date.today()
+    return today - datetime.timedelta(days=90), today
+
+async def _single_trend_stage_async(keyword):
+    start_date, end_date = _single_trend_window()
+    trend_data = await get_naver_trend_async(keyword, start_date, end_date)
+    # 그래프는 작업 스레드에서 그림
+    return await run_stage_async("plot_render", STAGE_TIMEOUTS["plot_render"], asyncio.to_thread(_single_trend_image, keyword, trend_data))
+
+def _single_item_outputs(trend_image, blog_posts):
+    """단계 결과(값 또는 예외)를 (트렌드 이미지, 후기 마크다운)으로 만듭니다. 늦거나 실패한 단계는 비워 둡니다."""
+    if isinstance(trend_image, BaseException):
+        print(f"트렌드 분석 중 오류: {trend_image}")
+        trend_image = None
+    blog_error = None
+    if isinstance(blog_posts, BaseException):
+        print(f"블로그 후기 검색 중 오류: {blog_posts}")
+        blog_error, blog_posts = blog_posts, None
+    return trend_image, _single_reviews_markdown(blog_posts, blog_error)
+
+@traced_handler("analyze_single_item")
+async def analyze_single_item_async(keyword):
+    """단일 키워드의 트렌드 그래프와 블로그 후기를 동시에 조회해 반환합니다. 그래프는 작업 스레드에서 그립니다."""
+    if not keyword:
+        return None, "분석할 키워드가 없습니다."
 
-    return trend_image, reviews_markdown
+    trend_image, blog_posts = await asyncio.gather(
+        run_stage_async("naver.trend", STAGE_TIMEOUTS["naver_trend"] + STAGE_TIMEOUTS["plot_render"], _single_trend_stage_async(keyword)),
+        run_stage_async("naver.blog_search", STAGE_TIMEOUTS["naver_blog"], search_naver_blog_async(keyword, display=3)),
+        return_exceptions=True,
+    )
+    return _single_item_outputs(trend_image, blog_posts)
 
 
-# --- 범용 트렌드/후기 분석 함수 (파일 저장용) ---
+@job_summary("analyze_trends_for_titles")
 def analyze_trends_for_titles(titles, progress=gr.Progress()):
     """주어진 제목 리스트에 대해 네이버 트렌드 및 블로그 후기 분석을 수행하고 결과를 저장합니다."""
     if not titles:
         return "분석할 관광지 이름이 없습니다."
 
-    try:
-        plt.rcParams['font.family'] = 'Malgun Gothic'
-        plt.rcParams['axes.unicode_minus'] = False
-    except Exception as e:
-        print(f"폰트 설정 오류: {e}. 그래프의 한글이 깨질 수 있습니다.")
-
     trend_results = []
+    render_jobs = []
     review_results = [] # 후기 결과를 저장할 리스트
     today = datetime.date.today()
-    trend_output_dir = r"C:\Users\SBA\github\TourLens\naver_trend"
+    trend_output_dir = TREND_OUTPUT_DIR
     os.makedirs(trend_output_dir, exist_ok=True)
 
+    # 모든 제목이 같은 기간(최근 90일)을 사용하므로 5개씩 묶어 한 번에 조회
+    start_date = today - datetime.timedelta(days=90)
+    progress(0, desc="트렌드 데이터 일괄 조회 중...")
+    trends_by_keyword = get_naver_trends([str(title).strip() for title in titles], start_date, today)
+
     for keyword in progress.tqdm(titles, total=len(titles), desc="관광지별 트렌드 및 후기 분석 중"):
         keyword = str(keyword).strip()
         if not keyword:
             continue
 
         # 1. 트렌드 분석
-        start_date = today - datetime.timedelta(days=90)
-        df_trend_data = get_naver_trend(keyword, start_date, today)
+        df_trend_data = trends_by_keyword.get(keyword)
 
         if df_trend_data:
             df_trend = pd.DataFrame(df_trend_data)
-            try:
-                plt.figure(figsize=(10, 5))
-                plt.plot(pd.to_datetime(df_trend['period']), df_trend['ratio'].astype(float), marker='o')
-                plt.title(f"{keyword} 검색어 트렌드")
-                plt.xlabel("날짜")
-                plt.ylabel("검색량 지수")
-                plt.grid(True)
-                safe_keyword = "".join(c for c in keyword if c.isalnum() or c in (' ', '-')).rstrip()
-                save_path = os.path.join(trend_output_dir, f"{safe_keyword}_trend.png")
-                plt.savefig(save_path, dpi=150, bbox_inches="tight")
-                plt.close()
-            except Exception as e:
-                print(f"'{keyword}' 그래프 저장 중 오류: {e}")
-                plt.close()
+            render_jobs.append({
+                'trend_data': df_trend_data,
+                'title': f"{keyword} 검색어 트렌드",
+                'path': _trend_png_path(trend_output_dir, keyword),
+            })
 
             df_trend['keyword'] = keyword
             trend_results.append(df_trend)
@@ -118,18 +135,24 @@ def analyze_trends_for_titles(titles, progress=gr.Progress()):
                 post['keyword'] = keyword # 어떤 키워드로 검색되었는지 추가
                 review_results.append(post)
 
-    # 3. 결과 저장
+    # 3. 그래프 일괄 렌더링 (프로세스 풀)
+    progress(0.95, desc="트렌드 그래프 렌더링 중...")
+    render_trend_batch(render_jobs)
+
+    # 4. 결과 저장
     output_messages = []
     if trend_results:
         final_trend_df = pd.concat(trend_results, ignore_index=True)
         final_trend_csv_path = os.path.join(trend_output_dir, "Seoul_Attractions_Trend.csv")
-        final_trend_df.to_csv(final_trend_csv_path, index=False, encoding="utf-8-sig")
+        with metrics.timer("csv_write"):
+            final_trend_df.to_csv(final_trend_csv_path, index=False, encoding="utf-8-sig")
         output_messages.append(f"{len(trend_results)}개 항목의 트렌드 분석")
     
     if review_results:
         final_review_df = pd.DataFrame(review_results)
         final_review_csv_path = os.path.join(trend_output_dir, "Seoul_Attractions_Reviews.csv")
-        final_review_df.to_csv(final_review_csv_path, index=False, encoding="utf-8-sig")
+        with metrics.timer("csv_write"):
+            final_review_df.to_csv(final_review_csv_path, index=False, encoding="utf-8-sig")
         output_messages.append(f"{len(review_results)}개 후기 수집")
 
     if not output_messages:
@@ -138,175 +161,207 @@ def analyze_trends_for_titles(titles, progress=gr.Progress()):
         return f"분석 완료! {' / '.join(output_messages)}. 결과는 \"{trend_output_dir}\" 폴더에 저장되었습니다."
 
 
-# --- 내부 헬퍼 함수: 파일 기반 트렌드 분석 실행 ---
-def _run_analysis_from_file(tour_api_path, trend_output_dir, progress_tracker):
+# --- 내부 헬퍼 함수: 트렌드 분석용 행사 데이터 준비 ---
+def _parse_event_dates(festival_df):
+    """행사 시작/종료일 열을 datetime으로 변환합니다. 열이 없으면 빈 날짜(NaT) 열을 만듭니다."""
+    for column in EVENT_DATE_COLUMNS:
+        if column not in festival_df.columns:
+            festival_df[column] = pd.NaT
+        elif not pd.api.types.is_datetime64_any_dtype(festival_df[column]):
+            festival_df[column] = pd.to_datetime(festival_df[column].astype("string"), format="%Y%m%d", errors="coerce")
+    return festival_df
+
+def _build_festival_frame(rows):
+    """수집한 상세 정보 행(dict 리스트 또는 반복자)을 제외 키를 뺀 DataFrame으로 만듭니다."""
+    festival_df = pd.DataFrame(list(rows))
+    excluded = [column for column in festival_df.columns if is_key_excluded(column)]
+    return _parse_event_dates(festival_df.drop(columns=excluded))
+
+def _persist_intermediate(festival_df):
+    """INTERMEDIATE_FORMAT이 설정된 경우 중간 데이터를 열 형식 파일로 저장하고 경로를 반환합니다."""
+    if INTERMEDIATE_FORMAT not in ("parquet", "feather"):
+        return None
     try:
-        plt.rcParams['font.family'] = 'Malgun Gothic'
-        plt.rcParams['axes.unicode_minus'] = False
-    except Exception as e:
-        print(f"폰트 설정 오류: {e}. 그래프의 한글이 깨질 수 있습니다.")
-
-    try:
-        festival_df = pd.read_csv(tour_api_path, encoding="utf-8-sig")
-        festival_df['eventstartdate'] = pd.to_datetime(festival_df['eventstartdate'], format="%Y%m%d", errors="coerce")
-        festival_df['eventenddate'] = pd.to_datetime(festival_df['eventenddate'], format="%Y%m%d", errors="coerce")
-    except FileNotFoundError:
-        return f"오류: 중간 파일 {tour_api_path}를 찾을 수 없습니다."
+        os.makedirs(TOUR_API_DATA_DIR, exist_ok=True)
+        path = os.path.join(TOUR_API_DATA_DIR, f"TourAPI_Festival.{INTERMEDIATE_FORMAT}")
+        # 값 형식이 섞인 열도 저장할 수 있도록 날짜 외 열은 문자열로 통일
+        typed_df = festival_df.astype({
+            column: "string" for column in festival_df.columns if column not in EVENT_DATE_COLUMNS
+        })
+        if INTERMEDIATE_FORMAT == "parquet":
+            typed_df.to_parquet(path, index=False)
+        else:
+            typed_df.to_feather(path)
+        return path
     except Exception as e:
-        return f"오류: 중간 CSV 파일을 읽는 중 문제가 발생했습니다: {e}"
-
+        print(f"중간 데이터 저장 중 오류 (분석은 계속 진행합니다): {e}")
+        return None
+
+def _load_intermediate(path):
+    """저장된 중간 데이터(.parquet, .feather 또는 이전 형식의 .csv)를 읽어 DataFrame으로 반환합니다."""
+    if path.endswith(".parquet"):
+        festival_df = pd.read_parquet(path)
+    elif path.endswith(".feather"):
+        festival_df = pd.read_feather(path)
+    else:
+        festival_df = pd.read_csv(path, encoding="utf-8-sig", dtype="string")
+    return _parse_event_dates(festival_df)
+
+# --- 내부 헬퍼 함수: 트렌드 조회 계획 ---
+def _plan_trend_requests(festival_df, today):
+    """행사별 조회 기간(행사 전후 TREND_WINDOW_DAYS일)을 한 번에 계산하고 조회 계획을 만듭니다.
+
+    제목이나 날짜가 없거나, 시작 전이거나, 종료일이 시작일보다 빠른 행사는 제외하고 같은 행사는 하나로 합칩니다.
+    같은 키워드의 겹치는 조회 기간은 하나의 요청 기간(fetch_start~fetch_end)으로 병합합니다.
+    """
+    columns = ['keyword', 'eventstartdate', 'eventenddate', 'start_for_api', 'end_for_api', 'fetch_start', 'fetch_end']
+    if 'title' not in festival_df.columns:
+        return pd.DataFrame(columns=columns)
+
+    plan = pd.DataFrame({
+        'keyword': festival_df['title'].astype("string").str.strip(),
+        'eventstartdate': festival_df['eventstartdate'],
+        'eventenddate': festival_df['eventenddate'],
+    })
+    today_ts = pd.Timestamp(today)
+    valid = (
+        plan['keyword'].fillna('').ne('')
+        & plan['eventstartdate'].notna()
+        & plan['eventenddate'].notna()
+        & (plan['eventstartdate'].dt.normalize() <= today_ts)
+        & (plan['eventenddate'] >= plan['eventstartdate'])
+    )
+    plan = plan[valid].drop_duplicates()
+
+    window = pd.Timedelta(days=TREND_WINDOW_DAYS)
+    plan['start_for_api'] = (plan['eventstartdate'] - window).dt.normalize()
+    plan['end_for_api'] = (plan['eventenddate'] + window).dt.normalize().clip(upper=today_ts)
+
+    # 키워드별로 시작일 순 정렬 후, 앞선 기간들의 최대 종료일보다 늦게 시작하면 새 병합 구간
+    plan = plan.sort_values(['keyword', 'start_for_api', 'end_for_api'], kind='stable')
+    running_end = plan.groupby('keyword')['end_for_api'].cummax()
+    previous_end = running_end.groupby(plan['keyword']).shift()
+    merged_id = (previous_end.isna() | (plan['start_for_api'] > previous_end)).cumsum()
+    plan['fetch_start'] = plan.groupby(merged_id)['start_for_api'].transform('min')
+    plan['fetch_end'] = plan.groupby(merged_id)['end_for_api'].transform('max')
+    return plan[columns].reset_index(drop=True)
+
+def _slice_trend(trend_data, start_date, end_date):
+    """병합 기간으로 받은 트렌드에서 행사 조회 기간만 잘라 단독 조회와 같은 척도(최대값 100)로 맞춥니다."""
+    if not trend_data:
+        return None
+    start_text, end_text = start_date.isoformat(), end_date.isoformat()
+    return rescale_to_own_peak([point for point in trend_data if start_text <= str(point['period'])[:10] <= end_text])
+
+# --- 내부 헬퍼 함수: 메모리의 행사 데이터로 트렌드 분석 실행 ---
+def _run_analysis_from_frame(festival_df, trend_output_dir, progress_tracker):
+    """행사 DataFrame(eventstartdate/eventenddate는 datetime)으로 트렌드를 조회하고 그래프와 CSV를 저장합니다."""
+    os.makedirs(trend_output_dir, exist_ok=True)
     trend_results = []
+    render_jobs = []
     today = datetime.date.today()
-    total_festivals = len(festival_df)
-
-    for index, row in progress_tracker.tqdm(festival_df.iterrows(), total=total_festivals, desc="축제별 트렌드 분석 중"):
-        keyword = str(row.get('title', '')).strip()
-        start = row.get('eventstartdate')
-        end = row.get('eventenddate')
-
-        if not keyword or pd.isna(start) or pd.isna(end) or start.date() > today:
-            continue
 
-        start_for_api = (start - datetime.timedelta(days=30)).date()
-        end_for_api = min((end + datetime.timedelta(days=30)).date(), today)
-
-        df_trend_data = get_naver_trend(keyword, start_for_api, end_for_api)
+    # 1. 행사별 조회 기간 계산 및 키워드별 기간 병합
+    trend_plan = _plan_trend_requests(festival_df, today)
+    fetch_plan = trend_plan[['keyword', 'fetch_start', 'fetch_end']].drop_duplicates()
+
+    # 2. 같은 기간의 키워드를 5개씩 묶어 일괄 조회
+    progress_tracker(0, desc="트렌드 데이터 일괄 조회 중...")
+    trends = get_naver_trends_batch([
+        (keyword, fetch_start.date(), fetch_end.date())
+        for keyword, fetch_start, fetch_end in fetch_plan.itertuples(index=False)
+    ])
+
+    plan_rows = list(trend_plan.itertuples(index=False))
+    for row in progress_tracker.tqdm(plan_rows, total=len(plan_rows), desc="축제별 트렌드 분석 중"):
+        keyword, start, end = row.keyword, row.eventstartdate, row.eventenddate
+        df_trend_data = _slice_trend(
+            trends.get((keyword, row.fetch_start.date(), row.fetch_end.date())),
+            row.start_for_api.date(), row.end_for_api.date(),
+        )
 
         if df_trend_data is None or len(df_trend_data) == 0:
             print(f"⚠️ '{keyword}'에 대한 트렌드 검색 결과가 없어 그래프를 생성하지 않습니다.")
             continue
 
         df_trend = pd.DataFrame(df_trend_data)
-
-        try:
-            plt.figure(figsize=(10, 5))
-            plt.plot(pd.to_datetime(df_trend['period']), df_trend['ratio'].astype(float), marker='o')
-            plt.axvline(start, color='green', linestyle='--', label='행사 시작')
-            plt.axvline(end, color='red', linestyle='--', label='행사 종료')
-            plt.title(f"{keyword} 검색어 트렌드")
-            plt.xlabel("날짜")
-            plt.ylabel("검색량 지수")
-            plt.legend()
-            plt.grid(True)
-            safe_keyword = "".join(c for c in keyword if c.isalnum() or c in (' ', '-')).rstrip()
-            save_path = os.path.join(trend_output_dir, f"{safe_keyword}_trend.png")
-            plt.savefig(save_path, dpi=150, bbox_inches="tight")
-            plt.close()
-        except Exception as e:
-            print(f"'{keyword}' 그래프 저장 중 오류: {e}")
-            plt.close()
+        render_jobs.append({
+            'trend_data': df_trend_data,
+            'title': f"{keyword} 검색어 트렌드",
+            'event_start': start.date().isoformat(),
+            'event_end': end.date().isoformat(),
+            'path': _trend_png_path(trend_output_dir, keyword),
+        })
 
         df_trend['keyword'] = keyword
         df_trend['eventstartdate'] = start
         df_trend['eventenddate'] = end
         trend_results.append(df_trend)
 
+    progress_tracker(0.95, desc="트렌드 그래프 렌더링 중...")
+    render_trend_batch(render_jobs)
+
     if trend_results:
         final_trend_df = pd.concat(trend_results, ignore_index=True)
         final_csv_path = os.path.join(trend_output_dir, "Festival_Trend_WithPeriod.csv")
-        final_trend_df.to_csv(final_csv_path, index=False, encoding="utf-8-sig")
+        with metrics.timer("csv_write"):
+            final_trend_df.to_csv(final_csv_path, index=False, encoding="utf-8-sig")
         return f"분석 완료! {len(trend_results)}개 항목의 트렌드 분석 결과가 \"{trend_output_dir}\" 폴더에 저장되었습니다."
     else:
         return "트렌드 분석을 수행할 항목이 없습니다."
 
-# --- 내부 헬퍼 함수: 아이템 목록의 전체 상세 정보 수집 ---
-def _get_full_details_for_items(items_list, progress_tracker):
-    all_item_details = []
-    for item in progress_tracker.tqdm(items_list, desc="상세 정보 수집 중"):
-        if not isinstance(item, dict):
-            continue
-        content_id = item.get('contentid')
-        content_type_id = item.get('contenttypeid')
-        if not content_id:
-            all_item_details.append(item)
-            continue
+# --- 내부 헬퍼: 크롤 레코드를 트렌드 분석용 행으로 모으는 싱크 ---
+class _DetailRowSink:
+    """크롤 레코드마다 상세 정보와 첫 번째 detailInfo2 항목을 합친 행을 모읍니다."""
+
+    def __init__(self):
+        self.rows = []
+
+    def consume(self, record):
+        if record.error:
+            print(f"상세 정보 수집 중 오류 (content_id: {record.item.get('contentid')}): {record.error}")
+        row = dict(record.details)
+        if record.info_items:
+            row.update(record.info_items[0])
+        self.rows.append(row)
 
-        base_data = item.copy()
-        try:
-            apis_to_process = [
-                ("detailCommon2", {**common_params, "contentId": content_id, "defaultYN": "Y", "firstImageYN": "Y", "areacodeYN": "Y", "catcodeYN": "Y", "addrinfoYN": "Y", "mapinfoYN": "Y", "overviewYN": "Y"}),
-                ("detailIntro2", {**common_params, "contentId": content_id, "contentTypeId": content_type_id}),
-            ]
-            for api_name, params in apis_to_process:
-                response = session.get(f"{BASE_URL}{api_name}", params=params)
-                if response.status_code == 200 and response.text:
-                    res_items = get_api_items(response.json())
-                    for res_item in res_items:
-                        if isinstance(res_item, dict):
-                            base_data.update(res_item)
-            
-            detail_info_params = {**common_params, "contentId": content_id, "contentTypeId": content_type_id}
-            response = session.get(f"{BASE_URL}detailInfo2", params=detail_info_params)
-            if response.status_code == 200 and response.text:
-                info_items = get_api_items(response.json())
-                if info_items and isinstance(info_items[0], dict):
-                    base_data.update(info_items[0])
-            all_item_details.append(base_data)
-        except Exception as e:
-            print(f"상세 정보 수집 중 오류 (content_id: {content_id}): {e}")
-            all_item_details.append(base_data)
-    return all_item_details
+# --- 내부 헬퍼 함수: 아이템 목록의 전체 상세 정보 수집 ---
+def _get_full_details_for_items(items_list, progress_tracker, max_workers=None):
+    """크롤 엔진의 상세 단계로 아이템별 상세 정보를 수집하고, 입력 순서대로 반환합니다."""
+    sink = _DetailRowSink()
+    crawl_items(items_list, [sink], progress=progress_tracker, detail_workers=max_workers)
+    return sink.rows
 
 # --- "지역/카테고리별 검색" 탭을 위한 메인 함수 ---
+@job_summary("generate_trends_from_area_search")
 def generate_trends_from_area_search(area_name, sigungu_name, category_name, progress=gr.Progress()):
     if not area_name:
         return "오류: 지역을 먼저 선택해주세요."
 
     try:
-        # 1. 모든 아이템 목록 가져오기
+        # 1~2. 크롤 엔진으로 목록 및 상세 정보 수집 (같은 조건의 최근 수집 결과가 있으면 재사용)
         area_code = AREA_CODES.get(area_name)
         content_type_id = CONTENT_TYPE_CODES.get(category_name)
-        count_params = {**common_params, "areaCode": area_code, "numOfRows": 1, "pageNo": 1}
-        if sigungu_name and sigungu_name != "전체":
-            sigungu_response = session.get(f"{BASE_URL}areaCode2", params={**common_params, "areaCode": area_code, "numOfRows": "100"})
-            sigungu_items = get_api_items(sigungu_response.json())
-            sigungu_code = next((item['code'] for item in sigungu_items if isinstance(item, dict) and item.get('name') == sigungu_name), None)
-            if sigungu_code: count_params["sigunguCode"] = sigungu_code
-        if content_type_id:
-            count_params["contentTypeId"] = content_type_id
-
-        response = session.get(f"{BASE_URL}areaBasedList2", params=count_params)
-        response.raise_for_status()
-        data = response.json()
-        body = data.get('response', {}).get('body', {})
-        total_count = body.get('totalCount', 0) if isinstance(body, dict) else 0
-
-        if total_count == 0:
+        sigungu_code = resolve_sigungu_code(area_code, sigungu_name)
+
+        sink = _DetailRowSink()
+        record_count = crawl_area(area_code, sigungu_code, content_type_id, [sink], progress=progress)
+        if record_count == 0:
             return "분석할 데이터가 없습니다."
 
-        all_items = []
-        num_of_rows = 100
-        total_pages = math.ceil(total_count / num_of_rows)
-        list_params = {**count_params}
-        for page_no in progress.tqdm(range(1, total_pages + 1), desc="관광지 목록 수집 중"):
-            list_params.update({"numOfRows": num_of_rows, "pageNo": page_no})
-            response = session.get(f"{BASE_URL}areaBasedList2", params=list_params)
-            items = get_api_items(response.json())
-            all_items.extend(items)
-
-        # 2. 상세 정보 수집
-        full_details = _get_full_details_for_items(all_items, progress)
-
-        # 3. 중간 CSV 파일 저장을 위해 데이터 필터링
-        filtered_details = []
-        for item_dict in full_details:
-            new_dict = {key: value for key, value in item_dict.items() if not is_key_excluded(key)}
-            filtered_details.append(new_dict)
-
-        tour_api_data_dir = r"C:\Users\SBA\github\TourLens\TourAPI_data"
-        os.makedirs(tour_api_data_dir, exist_ok=True)
-        intermediate_csv_path = os.path.join(tour_api_data_dir, "TourAPI_Festival.csv")
-        pd.DataFrame(filtered_details).to_csv(intermediate_csv_path, index=False, encoding='utf-8-sig')
+        # 3. 제외 키를 뺀 행사 데이터를 메모리에서 바로 트렌드 단계로 전달 (설정 시 열 형식 파일로도 저장)
+        festival_df = _build_festival_frame(sink.rows)
+        _persist_intermediate(festival_df)
 
         # 4. 트렌드 분석 실행
-        trend_output_dir = r"C:\Users\SBA\github\TourLens\naver_trend"
-        return _run_analysis_from_file(intermediate_csv_path, trend_output_dir, progress)
+        return _run_analysis_from_frame(festival_df, TREND_OUTPUT_DIR, progress)
 
     except Exception as e:
         traceback.print_exc()
         return f"오류 발생: {e}"
 
 # --- "내 위치로 검색" 탭을 위한 메인 함수 ---
+@job_summary("generate_trends_from_location_search")
 def generate_trends_from_location_search(places_info, progress=gr.Progress()):
     if not places_info:
         return "오류: 먼저 주변 관광지를 검색해주세요."
@@ -322,17 +377,34 @@ def generate_trends_from_location_search(places_info, progress=gr.Progress()):
     # 2. 상세 정보 수집
     full_details = _get_full_details_for_items(items_to_process, progress)
 
-    # 3. 중간 CSV 파일 저장을 위해 데이터 필터링
-    filtered_details = []
-    for item_dict in full_details:
-        new_dict = {key: value for key, value in item_dict.items() if not is_key_excluded(key)}
-        filtered_details.append(new_dict)
-
-    tour_api_data_dir = r"C:\Users\SBA\github\TourLens\TourAPI_data"
-    os.makedirs(tour_api_data_dir, exist_ok=True)
-    intermediate_csv_path = os.path.join(tour_api_data_dir, "TourAPI_Festival.csv")
-    pd.DataFrame(filtered_details).to_csv(intermediate_csv_path, index=False, encoding='utf-8-sig')
+    # 3. 제외 키를 뺀 행사 데이터를 메모리에서 바로 트렌드 단계로 전달 (설정 시 열 형식 파일로도 저장)
+    festival_df = _build_festival_frame(full_details)
+    _persist_intermediate(festival_df)
 
     # 4. 트렌드 분석 실행
-    trend_output_dir = r"C:\Users\SBA\github\TourLens\naver_trend"
-    return _run_analysis_from_file(intermediate_csv_path, trend_output_dir, progress)
\ No newline at end of file
+    return _run_analysis_from_frame(festival_df, TREND_OUTPUT_DIR, progress)
+
+# --- 저장된 중간 데이터로 트렌드 단계만 다시 실행 ---
+@job_summary("generate_trends_from_file")
+def generate_trends_from_file(tour_api_path=None, progress=gr.Progress()):
+    """저장된 중간 데이터(.parquet, .feather 또는 이전 형식의 .csv)로 트렌드 분석만 다시 실행합니다.
+
+    경로를 주지 않으면 TOURLENS_INTERMEDIATE_FORMAT 설정으로 마지막에 저장한 파일을 읽습니다.
+    """
+    if not tour_api_path:
+        if INTERMEDIATE_FORMAT not in ("parquet", "feather"):
+            return "오류: 중간 파일 경로를 지정하거나 TOURLENS_INTERMEDIATE_FORMAT을 설정해주세요."
+        tour_api_path = os.path.join(TOUR_API_DATA_DIR, f"TourAPI_Festival.{INTERMEDIATE_FORMAT}")
+    try:
+        festival_df = _load_intermediate(tour_api_path)
+    except FileNotFoundError:
+        return f"오류: 중간 파일 {tour_api_path}를 찾을 수 없습니다."
+    except Exception as e:
+        return f"오류: 중간 파일을 읽는 중 문제가 발생했습니다: {e}"
+    return _run_analysis_from_frame(festival_df, TREND_OUTPUT_DIR, progress)
+
+
+if __name__ == '__main__':
+    # 수집 단계 없이 저장된 중간 데이터로 트렌드 분석만 실행: python -m modules.trend_analyzer [중간 파일 경로]
+    import sys
+    print(generate_trends_from_file(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -1,16 +1,16 @@
-import requests
-import requests.adapters
 import urllib3
 import os
 import re
 from urllib.parse import quote
-import pandas as pd
-import matplotlib.pyplot as plt
-import io
-import base64
+from functools import lru_cache
+
+from modules.http_client import ThrottledAdapter, get_upstream
+from modules.api_cache import CachedSession, ResponseCache, ENDPOINT_TTLS, CACHE_DIR, TOUR_API_CACHE_MAX_BYTES
+from modules.plot_cache import cached_trend_png, plot_url
+from modules.metrics import metrics
 
 # --- TourAPI 기본 설정 ---
-class CustomAdapter(requests.adapters.HTTPAdapter):
+class CustomAdapter(ThrottledAdapter):
     def init_poolmanager(self, *args, **kwargs):
         context = urllib3.util.ssl_.create_urllib3_context(ciphers='DEFAULT@SECLEVEL=1')
         kwargs['ssl_context'] = context
@@ -18,9 +18,23 @@ class CustomAdapter(requests.adapters.HTTPAdapter):
 
 TOUR_API_KEY = os.getenv("TOUR_API_KTY")
 API_KEY = quote(TOUR_API_KEY) if TOUR_API_KEY else ""
-BASE_URL = "https://apis.data.go.kr/B551011/KorService2/"
-session = requests.Session()
-session.mount("https://", CustomAdapter())
+# 벤치마크 등에서 로컬 대역 서버를 쓰도록 환경 변수로 바꿀 수 있음
+BASE_URL = os.getenv("TOUR_API_BASE_URL", "https://apis.data.go.kr/B551011/KorService2/")
+
+# --- 동시 요청 설정 ---
+# 상세 정보 수집 시 사용할 작업 스레드 수. 실제 동시 요청 수는 TourAPI 호출 정책
+# (토큰 버킷 + AIMD 적응형 동시성, modules/http_client.py)이 제한합니다.
+DETAIL_FETCH_WORKERS = int(os.getenv("TOURLENS_DETAIL_WORKERS", "8"))
+tour_api_upstream = get_upstream("tourapi")
+
+# TourAPI 응답 캐시 (엔드포인트 + 파라미터 기준, serviceKey 제외)
+tour_api_cache = ResponseCache(os.path.join(CACHE_DIR, "tourapi.sqlite3"), TOUR_API_CACHE_MAX_BYTES, ttls=ENDPOINT_TTLS)
+metrics.register_stats("response_cache", tour_api_cache.stats, counters=("hits", "misses", "evictions"))
+
+session = CachedSession(tour_api_cache)
+tour_api_adapter = CustomAdapter(tour_api_upstream, pool_connections=4, pool_maxsize=tour_api_upstream.limiter.maximum)
+session.mount("https://", tour_api_adapter)
+session.mount("http://", tour_api_adapter)
 
 common_params = {
     "_type": "json",
@@ -61,13 +75,17 @@ def get_api_items(response_json):
         
     return []
 
+# HTML 태그와 홈페이지 링크(href) 추출용 정규식 (모듈 로드 시 한 번만 컴파일)
+HTML_TAG_PATTERN = re.compile('<.*?>')
+HOMEPAGE_HREF_PATTERN = re.compile("href=([\"'])(.*?)\\1")
+
 def clean_html(raw_html):
     if not raw_html:
         return ""
-    cleanr = re.compile('<.*?>')
-    cleantext = re.sub(cleanr, '', raw_html)
+    cleantext = HTML_TAG_PATTERN.sub('', raw_html)
     return cleantext.strip()
 
+@lru_cache(maxsize=None)
 def is_key_excluded(key):
     if key == 'eventenddate':
         return False
@@ -81,7 +99,6 @@ def format_json_to_clean_string(json_data):
         return "표시할 정보가 없습니다."
 
     output_lines = []
-    homepage_regex = "href=([\"'])(.*?)\\1"
 
     for item in items:
         image_keys = ['firstimage', 'firstimage2']
@@ -96,7 +113,7 @@ def format_json_to_clean_string(json_data):
             if not is_key_excluded(key) and value and str(value).strip():
                 cleaned_value = ""
                 if key == 'homepage':
-                    match = re.search(homepage_regex, str(value))
+                    match = HOMEPAGE_HREF_PATTERN.search(str(value))
                     cleaned_value = match.group(2) if match else clean_html(str(value))
                 else:
                     cleaned_value = clean_html(str(value))
@@ -112,37 +129,14 @@ def format_json_to_clean_string(json_data):
 
 # --- 트렌드 그래프 생성 ---
 def create_trend_plot(trend_data, keyword):
-    """트렌드 데이터로 그래프를 그리고 Base64 데이터 URI를 반환합니다."""
+    """트렌드 그래프를 그래프 캐시에 저장(이미 있으면 재사용)하고 브라우저에서 불러올 URL을 반환합니다."""
     if not trend_data:
         return None
     
     try:
-        plt.rcParams['font.family'] = 'Malgun Gothic'
-        plt.rcParams['axes.unicode_minus'] = False
-
-        df = pd.DataFrame(trend_data)
-        df['period'] = pd.to_datetime(df['period'])
-        df['ratio'] = df['ratio'].astype(float)
-
-        plt.figure(figsize=(10, 5))
-        plt.plot(df['period'], df['ratio'], marker='o', linestyle='-')
-        plt.title(f"'{keyword}' 검색어 트렌드 (최근 90일)")
-        plt.xlabel("날짜")
-        plt.ylabel("상대적 검색량")
-        plt.grid(True)
-        plt.tight_layout()
-
-        # 이미지를 메모리 버퍼에 저장
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        plt.close()
-        buf.seek(0);
-
-        # Base64로 인코딩하여 데이터 URI 생성
-        data = base64.b64encode(buf.read()).decode('utf-8')
-        return f"data:image/png;base64,{data}"
+        # 데이터 URI 대신 캐시 파일 URL을 사용해 응답 크기를 줄이고 브라우저 캐시를 활용
+        return plot_url(cached_trend_png(keyword, trend_data, f"'{keyword}' 검색어 트렌드 (최근 90일)"))
 
     except Exception as e:
         print(f"트렌드 그래프 생성 중 오류: {e}")
-        plt.close()
         return None